@@ -0,0 +1,151 @@
+# core/ble_manager.py
+import asyncio
+from PyQt6.QtCore import QTimer
+from core.device_node import DeviceNode
+from core.ble_thread import ble_thread
+
+
+class KnownDevice:
+    """config.json 中保存的设备 (只有地址与名称)，用于不扫描直接连接"""
+
+    def __init__(self, address, name=None):
+        self.address = address
+        self.name = name or "Saved"
+
+
+def create_node(ble_device):
+    """按地址创建设备节点：relay:// 地址为经中继接入的远端设备，其余为本机 BLE 设备"""
+    if ble_device.address.startswith("relay://"):
+        from core.relay import relay_hub
+        return relay_hub.create_node(ble_device)
+    return DeviceNode(ble_device)
+
+
+class BleManager:
+    """
+    BLE 会话池：按设备地址持有 DeviceNode (及其 BleakClient 连接)。
+
+    - 向导通过 lease() 租用节点，看板通过 connect() 建立连接 (已连接则直接复用)
+    - 离开看板时 release() 归还节点，连接保持 idle_timeout 秒，
+      期间重新配置或切换组别可直接复用活动链路，无需再花数秒重连
+    - warm_start() 预连接的节点在向导租用或 release_warm() 之前不计空闲超时
+    - 池状态只在 GUI 线程读写，实际 I/O 通过 ble_thread 执行
+    """
+
+    def __init__(self, idle_timeout=120.0):
+        self.idle_timeout = idle_timeout
+        self._nodes = {}  # address -> DeviceNode
+        self._leased = set()  # 已被租用的地址
+        self._release_gen = {}  # address -> 归还次数，用于作废过期的空闲断开定时器
+        self._warm = set()  # 预连接、等待向导租用的地址
+
+    def lease(self, ble_device):
+        """按地址取出 (或新建) 设备节点"""
+        addr = ble_device.address
+        node = self._nodes.get(addr)
+        if node is None:
+            node = create_node(ble_device)
+            self._nodes[addr] = node
+        elif not node.is_connected:
+            node.ble_device = ble_device  # 未连接时换用最新扫描到的句柄
+
+        self._leased.add(addr)
+        self._warm.discard(addr)
+        self._release_gen[addr] = self._release_gen.get(addr, 0) + 1
+        return node
+
+    def is_leased(self, address):
+        """设备是否正被某个赛场使用 (同一设备不能同时分给两个赛场)"""
+        return address in self._leased
+
+    def is_connected(self, address):
+        """池中是否有该地址的已连接会话"""
+        node = self._nodes.get(address)
+        return node is not None and node.is_connected
+
+    def release(self, node):
+        """归还节点：连接保持，空闲超时后才断开"""
+        addr = node.ble_device.address
+        if addr not in self._leased: return
+        self._leased.discard(addr)
+
+        self._schedule_expire(addr)
+
+    def _schedule_expire(self, addr):
+        gen = self._release_gen.get(addr, 0) + 1
+        self._release_gen[addr] = gen
+        QTimer.singleShot(int(self.idle_timeout * 1000), lambda: self._expire(addr, gen))
+
+    def _expire(self, addr, gen):
+        if addr in self._leased or addr in self._warm or self._release_gen.get(addr) != gen: return
+        node = self._nodes.pop(addr, None)
+        if node:
+            print(f"BLE session {node.name} idle, disconnecting")
+            ble_thread.spawn(node.disconnect(), name=f"disconnect-{addr}")
+
+    def connect(self, node):
+        """连接节点；已在池中连接的直接复用，只刷新状态显示"""
+        if node.is_connected:
+            node.status_changed.emit("Connected")
+            return None
+        return ble_thread.spawn(node.connect(), name=f"connect-{node.ble_device.address}")
+
+    def warm_start(self, known, timeout=6.0):
+        """
+        并行直连已保存地址的设备 (不扫描)，连上的会话放入池中等待向导租用，
+        向导结束时调用 release_warm() 回收未用到的会话。
+        known: [(address, name)]
+        返回 concurrent Future，结果为连接成功的地址集合。
+        """
+        nodes = []
+        for addr, name in known:
+            node = self._nodes.get(addr)
+            if node is None:
+                node = create_node(KnownDevice(addr, name))
+                self._nodes[addr] = node
+            if addr not in self._leased:
+                self._warm.add(addr)
+                self._release_gen[addr] = self._release_gen.get(addr, 0) + 1  # 作废归还时的空闲定时器
+            nodes.append(node)
+
+        async def _connect(node):
+            if node.is_connected: return
+            try:
+                await asyncio.wait_for(node.connect(), timeout)
+            except asyncio.TimeoutError:
+                await node.disconnect()
+
+        async def _connect_all():
+            t0 = asyncio.get_running_loop().time()
+            await asyncio.gather(*(_connect(n) for n in nodes))
+            ok = {n.ble_device.address for n in nodes if n.is_connected}
+            print(f"Warm start: {len(ok)}/{len(nodes)} devices connected in "
+                  f"{asyncio.get_running_loop().time() - t0:.1f} s")
+            return ok
+
+        return ble_thread.spawn(_connect_all(), name="warm-start")
+
+    def release_warm(self):
+        """向导已租用所需设备 (或放弃配置)：其余预连接会话按空闲会话回收"""
+        for addr in self._warm - self._leased:
+            if addr in self._nodes:
+                self._schedule_expire(addr)
+        self._warm.clear()
+
+    def connected_devices(self):
+        """池中仍连接的设备 (已连接的外设通常不再广播，扫描结果里会缺少它们)"""
+        return [n.ble_device for n in self._nodes.values() if n.is_connected]
+
+    def disconnect_all(self):
+        """退出程序时断开池中全部连接"""
+        if not self._nodes: return
+        print("Disconnecting all devices...")
+        for addr, node in self._nodes.items():
+            ble_thread.spawn(node.disconnect(), name=f"disconnect-{addr}")
+        self._nodes.clear()
+        self._leased.clear()
+        self._warm.clear()
+
+
+# 全局单例
+ble_manager = BleManager()
@@ -0,0 +1,108 @@
+# core/ble_thread.py
+import asyncio
+import concurrent.futures
+import threading
+
+
+class BleLoopThread:
+    """
+    专用的 BLE I/O 线程，运行独立的 asyncio 事件循环。
+    所有 Bleak 操作 (扫描、连接、通知、写入) 都在这里执行，
+    Qt 重绘、布局或模态对话框不会再拖慢蓝牙回调。
+
+    - spawn(): 从任意线程提交协程，返回 concurrent.futures.Future
+    - run():   在调用方的事件循环 (qasync) 中 await 提交的协程
+    - 所有任务都登记在案，异常统一打印，shutdown() 时统一取消
+    """
+
+    def __init__(self, name="BLE-IO"):
+        self.name = name
+        self.loop = None
+        self._thread = None
+        self._tasks = set()
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.is_running: return
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    def in_ble_thread(self):
+        return threading.current_thread() is self._thread
+
+    def spawn(self, coro, name=None):
+        """在 BLE 线程中以受管任务运行协程 (线程安全)"""
+        self.start()
+        result = concurrent.futures.Future()
+
+        def _create():
+            task = self.loop.create_task(coro, name=name)
+            self._tasks.add(task)
+            task.add_done_callback(lambda t: self._on_task_done(t, result))
+            # 调用方取消 Future 时同步取消任务
+            result.add_done_callback(lambda f: f.cancelled() and self.loop.call_soon_threadsafe(task.cancel))
+
+        self.loop.call_soon_threadsafe(_create)
+        return result
+
+    def run(self, coro, name=None):
+        """返回可在当前 (调用方) 事件循环中 await 的对象"""
+        return asyncio.wrap_future(self.spawn(coro, name))
+
+    def _on_task_done(self, task, result):
+        self._tasks.discard(task)
+        if result.done():
+            return
+        if task.cancelled():
+            result.cancel()
+            return
+        exc = task.exception()
+        if exc is not None:
+            print(f"BLE task '{task.get_name()}' failed: {exc!r}")
+            result.set_exception(exc)
+        else:
+            result.set_result(task.result())
+
+    def shutdown(self, grace=2.0, timeout=5.0):
+        """
+        停止线程：先给进行中的任务 (如断开连接) grace 秒完成，
+        剩余任务统一取消。
+        """
+        if not self.is_running: return
+
+        async def _drain():
+            tasks = [t for t in self._tasks if not t.done()]
+            if not tasks: return
+            _, pending = await asyncio.wait(tasks, timeout=grace)
+            for t in pending:
+                t.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(_drain(), self.loop).result(timeout)
+        except Exception as e:
+            print(f"BLE thread shutdown error: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
+
+
+# 全局单例
+ble_thread = BleLoopThread()
@@ -0,0 +1,291 @@
+# core/broadcast_server.py
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import struct
+import time
+from collections import deque
+
+WS_MAGIC = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "web")
+MAX_CLIENT_BUFFER = 256 * 1024  # 发送缓冲超过此值的观众视为卡死，直接断开
+MAX_CLIENT_FRAME = 64 * 1024
+
+
+class BroadcastState:
+    """
+    悬浮窗状态 (裁判分数、选手名、曲线点) 及其增量记录。
+    take_delta() 只返回自上次调用以来变化的字段和新增的曲线点。
+    """
+
+    def __init__(self, max_points=2000):
+        self.max_points = max_points
+        self.seq = 0
+        self.contestant = ""
+        self.referees = {}  # { index: {"name", "total", "plus", "minus"} }
+        self.points = {}  # { index: deque([[elapsed, total], ...], maxlen=max_points) }
+        self.start_time = None
+
+        self._sent = {}  # 上次已发送的裁判字段
+        self._new_points = {}
+        self._full_reset = True
+
+    def set_referees(self, referees):
+        """referees: [(index, name), ...]"""
+        self.referees = {idx: {"name": name, "total": 0, "plus": 0, "minus": 0} for idx, name in referees}
+        self._clear_curve()
+
+    def set_contestant(self, name):
+        self.contestant = name
+        self._clear_curve()
+
+    def _clear_curve(self):
+        self.points = {}
+        self.start_time = None
+        self._new_points = {}
+        self._full_reset = True
+
+    def update_referee(self, index, name, total, plus, minus):
+        self.referees[index] = {"name": name, "total": total, "plus": plus, "minus": minus}
+
+        # 与悬浮窗曲线一致：从第一个非零分开始计时
+        now = time.monotonic()
+        if self.start_time is None:
+            if total == 0: return
+            self.start_time = now
+        pt = [round(now - self.start_time, 3), total]
+
+        pts = self.points.get(index)
+        if pts is None:
+            pts = self.points[index] = deque(maxlen=self.max_points)
+        pts.append(pt)  # 满了自动丢弃最旧的点，O(1)
+        self._new_points.setdefault(index, []).append(pt)
+
+    def is_dirty(self):
+        return self._full_reset or bool(self._new_points) or any(
+            self._sent.get(idx) != data for idx, data in self.referees.items())
+
+    def snapshot(self):
+        return {
+            "type": "snapshot",
+            "seq": self.seq,
+            "contestant": self.contestant,
+            "max_points": self.max_points,
+            "referees": {str(idx): dict(data) for idx, data in self.referees.items()},
+            "points": {str(idx): list(pts) for idx, pts in self.points.items()},
+        }
+
+    def take_delta(self):
+        if not self.is_dirty():
+            return None
+        self.seq += 1
+
+        if self._full_reset:
+            # 选手或裁判组变化：客户端整体替换
+            msg = self.snapshot()
+        else:
+            changed = {}
+            for idx, data in self.referees.items():
+                old = self._sent.get(idx, {})
+                diff = {k: v for k, v in data.items() if old.get(k) != v}
+                if diff:
+                    changed[str(idx)] = diff
+            msg = {"type": "delta", "seq": self.seq}
+            if changed:
+                msg["referees"] = changed
+            if self._new_points:
+                msg["points"] = {str(idx): pts for idx, pts in self._new_points.items()}
+
+        self._sent = {idx: dict(data) for idx, data in self.referees.items()}
+        self._new_points = {}
+        self._full_reset = False
+        return msg
+
+
+def encode_ws_frame(payload, opcode=0x1):
+    """服务端 -> 客户端帧 (不加掩码)"""
+    header = bytearray([0x80 | opcode])
+    length = len(payload)
+    if length < 126:
+        header.append(length)
+    elif length < 65536:
+        header.append(126)
+        header += struct.pack(">H", length)
+    else:
+        header.append(127)
+        header += struct.pack(">Q", length)
+    return bytes(header) + payload
+
+
+async def read_ws_frame(reader):
+    b1, b2 = await reader.readexactly(2)
+    opcode = b1 & 0x0F
+    length = b2 & 0x7F
+    if length == 126:
+        length = struct.unpack(">H", await reader.readexactly(2))[0]
+    elif length == 127:
+        length = struct.unpack(">Q", await reader.readexactly(8))[0]
+    if length > MAX_CLIENT_FRAME:
+        raise ValueError(f"Frame too large: {length}")
+    mask = await reader.readexactly(4) if b2 & 0x80 else b""
+    payload = await reader.readexactly(length)
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return opcode, payload
+
+
+class BroadcastServer:
+    """
+    本地直播输出服务 (HTTP + WebSocket)，运行在 qasync 事件循环中：
+    - GET /        内置的 OBS 浏览器源页面 (web/overlay.html)
+    - GET /state   当前完整状态 (JSON)
+    - GET /ws      WebSocket：连接时推送 snapshot，之后推送增量 delta
+    高频分数变化在 flush_interval 内合并，JSON 只编码一次后发给所有观众。
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, flush_interval=0.05):
+        self.host = host
+        self.port = port
+        self.flush_interval = flush_interval
+        self.state = BroadcastState()
+        self.clients = set()
+        self._server = None
+        self._flush_handle = None
+
+    @property
+    def is_running(self):
+        return self._server is not None
+
+    async def start(self):
+        try:
+            self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+            print(f"Broadcast server running at http://{self.host}:{self.port}/")
+        except OSError as e:
+            print(f"Broadcast server failed to start: {e}")
+            self._server = None
+
+    async def stop(self):
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for writer in list(self.clients):
+            writer.close()
+        self.clients.clear()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    # --- 发布接口 ---
+    def set_referees(self, referees):
+        self.state.set_referees(referees)
+        self._schedule_flush()
+
+    def set_contestant(self, name):
+        self.state.set_contestant(name)
+        self._schedule_flush()
+
+    def update_referee(self, index, name, total, plus, minus):
+        self.state.update_referee(index, name, total, plus, minus)
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._flush_handle is None and self.clients:
+            loop = asyncio.get_event_loop()
+            self._flush_handle = loop.call_later(self.flush_interval, self.flush)
+
+    def flush(self):
+        # 显式调用时取消等待中的定时 flush，避免紧接着再空跑一次
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        msg = self.state.take_delta()
+        if msg is None or not self.clients: return
+
+        frame = encode_ws_frame(json.dumps(msg, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+        for writer in list(self.clients):
+            if writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                self.clients.discard(writer)
+                writer.close()
+            else:
+                writer.write(frame)
+
+    # --- 连接处理 ---
+    async def _handle_client(self, reader, writer):
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+            lines = request.decode('latin-1').split("\r\n")
+            method, path, _ = lines[0].split(" ", 2)
+            headers = {}
+            for line in lines[1:]:
+                if ':' in line:
+                    k, v = line.split(':', 1)
+                    headers[k.strip().lower()] = v.strip()
+
+            path = path.split('?', 1)[0]
+            if method != "GET":
+                self._send_http(writer, 405, b"Method Not Allowed")
+            elif path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                await self._serve_websocket(reader, writer, headers)
+                return
+            elif path == "/state":
+                body = json.dumps(self.state.snapshot(), ensure_ascii=False).encode('utf-8')
+                self._send_http(writer, 200, body, "application/json; charset=utf-8")
+            elif path in ("/", "/overlay.html"):
+                self._send_file(writer, os.path.join(STATIC_DIR, "overlay.html"))
+            else:
+                self._send_http(writer, 404, b"Not Found")
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            if writer not in self.clients:
+                writer.close()
+
+    def _send_http(self, writer, status, body, content_type="text/plain; charset=utf-8"):
+        reason = {200: "OK", 404: "Not Found", 405: "Method Not Allowed"}.get(status, "")
+        head = (f"HTTP/1.1 {status} {reason}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Cache-Control: no-cache\r\n"
+                "Connection: close\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+
+    def _send_file(self, writer, file_path):
+        try:
+            with open(file_path, 'rb') as f:
+                body = f.read()
+            self._send_http(writer, 200, body, "text/html; charset=utf-8")
+        except OSError:
+            self._send_http(writer, 404, b"Not Found")
+
+    async def _serve_websocket(self, reader, writer, headers):
+        key = headers.get("sec-websocket-key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WS_MAGIC).encode('latin-1')).digest()).decode('latin-1')
+        writer.write((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode('latin-1'))
+
+        # 先把积压的增量发给老观众，再给新观众完整快照，保证序号连续
+        self.flush()
+        snapshot = json.dumps(self.state.snapshot(), separators=(',', ':'), ensure_ascii=False)
+        writer.write(encode_ws_frame(snapshot.encode('utf-8')))
+        self.clients.add(writer)
+
+        try:
+            while True:
+                opcode, payload = await read_ws_frame(reader)
+                if opcode == 0x8:  # close
+                    writer.write(encode_ws_frame(payload[:2], opcode=0x8))
+                    break
+                elif opcode == 0x9:  # ping
+                    writer.write(encode_ws_frame(payload, opcode=0xA))
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
@@ -0,0 +1,87 @@
+# core/clock_sync.py
+from collections import deque
+
+
+class DeviceClock:
+    """
+    单个设备的时钟模型：host ≈ offset + (1 + drift) * device
+
+    主机收到通知的时刻 = 点击时刻 + 连接间隔等待 + 排队延迟 (恒为正)，
+    因此用“最小延迟下包络”拟合，而不是对所有点做最小二乘：
+    - 按设备时间每 bucket_s 秒分桶，只保留 host - device 的最小值
+    - 桶结束时对最近 max_buckets 个桶的最小值做 Theil-Sen 斜率估计 (对个别偏大的桶不敏感)
+    - 截距取所有桶最小值在该斜率下的下包络，保证校正后的点击时刻不晚于收到时刻
+    每个事件只做 O(1) 更新，拟合只在换桶时进行。
+    """
+
+    WRAP = 1 << 32  # timestamp_ms 为 uint32，约 49.7 天回绕一次
+
+    def __init__(self, bucket_s=5.0, max_buckets=60):
+        self.bucket_s = bucket_s
+        self.max_buckets = max_buckets
+        self.reset()
+
+    def reset(self):
+        self._buckets = deque()  # [bucket_key, device_s, min_delta]
+        self._last_raw = None
+        self._wrap_base = 0
+        self.drift = 0.0
+        self.offset = None
+        self.last_latency_ms = 0.0
+
+    @property
+    def drift_ppm(self):
+        return self.drift * 1e6
+
+    def _unwrap(self, device_ms):
+        if self._last_raw is not None and device_ms < self._last_raw:
+            if self._last_raw - device_ms > self.WRAP // 2:
+                self._wrap_base += self.WRAP  # 计数器回绕
+            elif self._last_raw - device_ms > 1000:
+                self.reset()  # 时间戳大幅后退：设备重启，重新建模
+        self._last_raw = device_ms
+        return (self._wrap_base + device_ms) / 1000.0
+
+    def update(self, device_ms, host_s):
+        """加入一对 (设备时间戳, 主机收到时刻)，返回校正后的点击时刻 (主机时间，秒)"""
+        device_s = self._unwrap(device_ms)
+        delta = host_s - device_s
+        key = int(device_s // self.bucket_s)
+
+        if self._buckets and self._buckets[-1][0] == key:
+            bucket = self._buckets[-1]
+            if delta < bucket[2]:
+                bucket[1], bucket[2] = device_s, delta
+        else:
+            if self._buckets:
+                self._fit()  # 上一个桶已结束
+            self._buckets.append([key, device_s, delta])
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popleft()
+
+        # 截距只会被更小的延迟拉低；换桶重新拟合时再整体更新
+        candidate = delta - self.drift * device_s
+        if self.offset is None or candidate < self.offset:
+            self.offset = candidate
+
+        click_s = self.to_host_seconds(device_s)
+        self.last_latency_ms = (host_s - click_s) * 1000
+        return click_s
+
+    def to_host_seconds(self, device_s):
+        return device_s + self.offset + self.drift * device_s
+
+    def to_host(self, device_ms):
+        """按当前模型把设备时间戳换算为主机时间 (不更新模型)"""
+        if self.offset is None: return None
+        return self.to_host_seconds((self._wrap_base + device_ms) / 1000.0)
+
+    def _fit(self):
+        pts = [(b[1], b[2]) for b in self._buckets]
+        if len(pts) >= 3:
+            slopes = sorted((d2 - d1) / (x2 - x1)
+                            for i, (x1, d1) in enumerate(pts)
+                            for (x2, d2) in pts[i + 1:] if x2 > x1)
+            if slopes:
+                self.drift = slopes[len(slopes) // 2]
+        self.offset = min(d - self.drift * x for x, d in pts)
@@ -1,14 +1,23 @@
 # core/device_node.py
 import asyncio
+import time
 from bleak import BleakClient
+from bleak.backends.device import BLEDevice
 from PyQt6.QtCore import QObject, pyqtSignal
 from core.protocol import parse_notification_data
+from core.notify_watchdog import NotifyWatchdog
+from core.clock_sync import DeviceClock
 from config import CHARACTERISTIC_UUID
 
 
 class DeviceNode(QObject):
-    # 信号定义：传递基础数据类型 (current, type, plus, minus, timestamp)
-    data_received = pyqtSignal(int, int, int, int, int)
+    """
+    单个 BLE 计分器。connect / disconnect / send_reset_command 均为协程，
+    需通过 ble_thread.spawn() 在 BLE 线程中执行；信号跨线程自动排队到 GUI 线程。
+    """
+    # 信号定义：传递基础数据类型 (current, type, plus, minus, timestamp, click_time)
+    # click_time: 经时钟模型校正后的点击时刻 (主机时间戳，秒)
+    data_received = pyqtSignal(int, int, int, int, int, float)
     status_changed = pyqtSignal(str)
 
     def __init__(self, ble_device):
@@ -16,13 +25,23 @@ class DeviceNode(QObject):
         self.ble_device = ble_device
         self.client = None
         self.is_connected = False
+        self._zero_waiters = []  # 等待清零通知的 Future (仅在 BLE 线程访问)
+        self.last_event = None
+        self.watchdog = NotifyWatchdog(self)
+        self.clock = DeviceClock()
+
+    @property
+    def name(self):
+        return getattr(self.ble_device, "name", None) or "?"
 
     async def connect(self):
         self.status_changed.emit("Connecting...")
         try:
             # 构造时传入断开回调
+            # 扫描得到的 BLEDevice 直接使用；已保存的设备 (KnownDevice) 按地址直连
+            target = self.ble_device if isinstance(self.ble_device, BLEDevice) else self.ble_device.address
             self.client = BleakClient(
-                self.ble_device,
+                target,
                 disconnected_callback=self._on_disconnected
             )
 
@@ -31,6 +50,7 @@ class DeviceNode(QObject):
             self.status_changed.emit("Connected")
 
             await self.client.start_notify(CHARACTERISTIC_UUID, self._notification_handler)
+            self.watchdog.start()
 
         except Exception as e:
             self.is_connected = False
@@ -45,6 +65,7 @@ class DeviceNode(QObject):
 
     # 【修复点】增强的 disconnect 方法
     async def disconnect(self):
+        self.watchdog.stop()
         if self.client:
             try:
                 # 只有当 Bleak 认为已连接时才尝试断开，且捕获所有异常
@@ -70,17 +91,69 @@ class DeviceNode(QObject):
         except Exception as e:
             print(f"Failed to send reset command: {e}")
 
+    async def reset_and_confirm(self, timeout=1.0):
+        """
+        发送复位 (0x01) 并等待设备在随后的通知中上报 plus/minus 均为 0。
+        超时未收到通知时，直接读取一次特征值确认；返回是否已确认归零。
+        """
+        if not self.client or not self.is_connected:
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._zero_waiters.append(waiter)
+        try:
+            await self.client.write_gatt_char(CHARACTERISTIC_UUID, b'\x01', response=True)
+            await asyncio.wait_for(waiter, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return await self._read_is_zero()
+        except Exception as e:
+            print(f"Reset failed on {self.ble_device.name}: {e}")
+            return False
+        finally:
+            if waiter in self._zero_waiters:
+                self._zero_waiters.remove(waiter)
+
+    async def _read_is_zero(self):
+        event = await self.read_current_event()
+        if event is None or event.total_plus != 0 or event.total_minus != 0:
+            return False
+        # 清零通知丢失：按读到的值发布，更新 last_event，否则看门狗会把这次归零误判为停滞
+        self.publish_event(event)
+        return True
+
+    async def read_current_event(self):
+        """直接读取特征值中的当前计数，失败返回 None"""
+        try:
+            return parse_notification_data(await self.client.read_gatt_char(CHARACTERISTIC_UUID))
+        except Exception:
+            return None
+
+    def publish_event(self, event, click_time=None):
+        if click_time is None:
+            click_time = self.clock.to_host(event.timestamp_ms) or time.time()
+        self.last_event = event
+        self.data_received.emit(
+            event.current_total,
+            event.event_type,
+            event.total_plus,
+            event.total_minus,
+            event.timestamp_ms,
+            click_time
+        )
+
     def _notification_handler(self, sender, data):
         """运行在蓝牙后台线程，只负责转发信号"""
+        host_time = time.time()  # 尽早取收到时刻，排除后续排队延迟
         try:
             event = parse_notification_data(data)
+            self.watchdog.on_notify()
+            if self._zero_waiters and event.total_plus == 0 and event.total_minus == 0:
+                for waiter in self._zero_waiters:
+                    if not waiter.done():
+                        waiter.set_result(event)
+                self._zero_waiters.clear()
             # 发射解包后的基础数据
-            self.data_received.emit(
-                event.current_total,
-                event.event_type,
-                event.total_plus,
-                event.total_minus,
-                event.timestamp_ms
-            )
+            self.publish_event(event, self.clock.update(event.timestamp_ms, host_time))
         except Exception as e:
             print(f"Callback Error: {e}")
\ No newline at end of file
@@ -0,0 +1,130 @@
+# core/notify_watchdog.py
+import asyncio
+import time
+from config import CHARACTERISTIC_UUID
+
+
+class NotifyWatchdog:
+    """
+    通知流看门狗 (每个 DeviceNode 一个，运行在 BLE 线程)。
+
+    计分器只在点击时发通知，长时间无通知既可能是裁判没按，也可能是链路“假连接”。
+    - 记录通知到达间隔，用 EWMA 估计均值与偏差，阈值 = mean + 4 * dev (限制在 min/max 之间)
+    - 超过阈值无通知时读取一次特征值：计数与最后一次通知一致 => 只是空闲，退避后再查；
+      不一致或读取失败 => 通知流停滞
+    - 恢复顺序：stop_notify/start_notify 重新订阅 -> 断开重连，每一步计时并上报
+    """
+
+    def __init__(self, node, min_threshold=3.0, max_threshold=30.0, check_interval=0.5):
+        self.node = node
+        self.min_threshold = min_threshold
+        self.max_threshold = max_threshold
+        self.check_interval = check_interval
+
+        self.last_arrival = None
+        self.mean_interval = None
+        self.dev_interval = 0.0
+        self.idle_backoff = 1.0  # 空闲确认后阈值倍数，收到通知后复位
+        self._task = None
+
+    @property
+    def threshold(self):
+        if self.mean_interval is None:
+            base = self.min_threshold
+        else:
+            base = self.mean_interval + 4 * self.dev_interval
+        return min(self.max_threshold, max(self.min_threshold, base) * self.idle_backoff)
+
+    def on_notify(self):
+        """由 DeviceNode 的通知回调调用 (BLE 线程)"""
+        now = time.perf_counter()
+        if self.last_arrival is not None:
+            interval = now - self.last_arrival
+            if self.mean_interval is None:
+                self.mean_interval = interval
+            else:
+                self.dev_interval += 0.25 * (abs(interval - self.mean_interval) - self.dev_interval)
+                self.mean_interval += 0.25 * (interval - self.mean_interval)
+        self.last_arrival = now
+        self.idle_backoff = 1.0
+
+    def start(self):
+        if self._task and not self._task.done(): return
+        self.last_arrival = time.perf_counter()
+        self._task = asyncio.get_running_loop().create_task(self._run(), name=f"watchdog-{self.node.name}")
+
+    def stop(self):
+        # 恢复流程内部的重连不能取消自己
+        if self._task and self._task is not asyncio.current_task():
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            if not self.node.is_connected or self.node.client is None:
+                continue
+
+            silent = time.perf_counter() - self.last_arrival
+            if silent < self.threshold:
+                continue
+
+            try:
+                await self._check(silent)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[Watchdog] {self.node.name}: check error {e}")
+            self.last_arrival = time.perf_counter()
+
+    async def _check(self, silent):
+        t0 = time.perf_counter()
+        event = await self.node.read_current_event()
+        read_ms = (time.perf_counter() - t0) * 1000
+        last = self.node.last_event
+
+        if event is not None and (last is None or
+                                  (event.total_plus, event.total_minus) == (last.total_plus, last.total_minus)):
+            # 计数未变化：只是空闲，放宽阈值
+            self.idle_backoff = min(self.idle_backoff * 2, self.max_threshold / self.min_threshold)
+            return
+
+        print(f"[Watchdog] {self.node.name}: no notifications for {silent:.1f} s "
+              f"(threshold {self.threshold:.1f} s), read {read_ms:.0f} ms -> stalled")
+        self.node.status_changed.emit("Stalled")
+        if event is not None:
+            # 先把漏掉的计数补上
+            self.node.publish_event(event)
+        else:
+            # 特征值不可读时无法区分空闲与停滞，重复恢复需退避
+            self.idle_backoff = min(self.idle_backoff * 2, self.max_threshold / self.min_threshold)
+
+        t1 = time.perf_counter()
+        if await self._resubscribe():
+            ms = (time.perf_counter() - t1) * 1000
+            print(f"[Watchdog] {self.node.name}: resubscribed in {ms:.0f} ms")
+            self.node.status_changed.emit(f"Recovered: resubscribe {ms:.0f} ms")
+            return
+
+        t2 = time.perf_counter()
+        await self.node.disconnect()
+        await self.node.connect()
+        ms = (time.perf_counter() - t2) * 1000
+        if self.node.is_connected:
+            print(f"[Watchdog] {self.node.name}: reconnected in {ms:.0f} ms")
+            self.node.status_changed.emit(f"Recovered: reconnect {ms:.0f} ms")
+        else:
+            print(f"[Watchdog] {self.node.name}: reconnect failed after {ms:.0f} ms")
+            self.node.status_changed.emit("Recovery Failed")
+
+    async def _resubscribe(self):
+        try:
+            try:
+                await self.node.client.stop_notify(CHARACTERISTIC_UUID)
+            except Exception:
+                pass  # 订阅可能已失效，继续重新订阅
+            await self.node.client.start_notify(CHARACTERISTIC_UUID, self.node._notification_handler)
+            return True
+        except Exception as e:
+            print(f"[Watchdog] {self.node.name}: resubscribe failed: {e}")
+            return False
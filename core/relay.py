@@ -0,0 +1,550 @@
+# core/relay.py
+"""
+计分器事件中继：把一台主机采集到的 ClickerEvent 与设备连接状态通过 TCP 转发到另一台主机。
+
+- 采集端 RelayServer (python main.py --headless --project X --relay-port 8766 --relay-host 192.168.1.20)
+  订阅本机 DeviceNode 的信号，按序号缓存最近的事件并推送给所有界面端
+- 中继没有认证，任何能连上端口的主机都能读取事件并复位设备：默认只监听 127.0.0.1，
+  供其他主机接入时由操作员用 --relay-host 指定比赛局域网网卡的地址，不要监听在不可信的网络上
+- 界面端 RelayClient 为每个远端设备提供一个 RemoteDeviceNode，信号与协程接口同 DeviceNode，
+  Referee / ble_manager / reset_coordinator 不区分本地与远端设备；
+  设备地址写作 relay://主机:端口/设备地址，保存到项目配置后同样可以直接重连
+
+帧格式 (小端)：type u8 | length u32 | payload
+  HELLO    c->s  magic "CLKR", version u8, session u64, last_seq u64 (续传起点)
+  DEVICES  s->c  session u64, count u16, [slot u16, connected u8, addr_len u8, addr, name_len u8, name]
+  EVENTS   s->c  first_seq u64, sent_at f64, count u16, [slot u16, 设备原始 17 字节结构体, click_time f64]
+  STATUS   s->c  slot u16, connected u8, status (utf-8)
+  RESET    c->s  request_id u32, slot u16, timeout_ms u16
+  RESET_OK s->c  request_id u32, ok u8
+每条事件 27 字节，flush_interval 内的事件合并为一帧。序号在一次采集会话 (session) 内连续，
+采集端保留最近 backlog 条事件，界面端断线重连后从最后收到的序号续传，期间的事件不会丢失。
+所有网络 I/O 都在 ble_thread 的事件循环中执行 (与 DeviceNode 同一线程)。
+"""
+import asyncio
+import os
+import struct
+import time
+from collections import deque
+from itertools import islice
+from PyQt6.QtCore import QObject, pyqtSignal, Qt
+from config import STRUCT_FORMAT
+from core.protocol import ClickerEvent
+
+RELAY_SCHEME = "relay://"
+DEFAULT_RELAY_HOST = "127.0.0.1"
+DEFAULT_RELAY_PORT = 8766
+
+MAGIC = b"CLKR"
+VERSION = 1
+
+T_HELLO, T_DEVICES, T_EVENTS, T_STATUS, T_RESET, T_RESET_OK = range(1, 7)
+
+FRAME_HEADER = struct.Struct("<BI")
+HELLO = struct.Struct("<4sBQQ")
+DEVICES_HEAD = struct.Struct("<QH")
+DEVICE_ENTRY = struct.Struct("<HBB")  # 之后是地址；名称长度 u8 + 名称
+EVENTS_HEAD = struct.Struct("<QdH")
+# 事件记录直接复用设备上报的结构体 (STRUCT_FORMAT)，前加 slot、后加校正后的点击时刻
+EVENT_RECORD = struct.Struct("<H" + STRUCT_FORMAT.lstrip("<=!>@") + "d")
+STATUS_HEAD = struct.Struct("<HB")
+RESET = struct.Struct("<IHH")
+RESET_OK = struct.Struct("<IB")
+
+MAX_FRAME = 1 << 20
+MAX_BATCH = 1024  # 每个 EVENTS 帧最多的事件数 (约 27 KB)
+MAX_CLIENT_BUFFER = 1 << 20  # 界面端来不及接收时暂停推送，积压的事件留在 backlog 中
+
+
+def encode_frame(frame_type, payload=b""):
+    return FRAME_HEADER.pack(frame_type, len(payload)) + payload
+
+
+async def read_frame(reader):
+    frame_type, length = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+    if length > MAX_FRAME:
+        raise ValueError(f"Relay frame too large: {length}")
+    return frame_type, await reader.readexactly(length)
+
+
+def parse_relay_address(address):
+    """relay://host:port/设备地址 -> (host, port, 设备地址)"""
+    if not address.startswith(RELAY_SCHEME):
+        raise ValueError(f"Not a relay address: {address}")
+    endpoint, _, remote = address[len(RELAY_SCHEME):].partition("/")
+    host, _, port = endpoint.rpartition(":")
+    return host, int(port), remote
+
+
+def parse_sources(text):
+    """设置项 relay_sources ("host:port, host2") -> [(host, port)]"""
+    sources = []
+    for item in (text or "").replace(";", ",").split(","):
+        item = item.strip()
+        if not item: continue
+        host, sep, port = item.rpartition(":")
+        try:
+            sources.append((host, int(port)) if sep else (item, DEFAULT_RELAY_PORT))
+        except ValueError:
+            print(f"Invalid relay source: {item}")
+    return sources
+
+
+def _pack_str(text, limit=255):
+    data = text.encode('utf-8')[:limit]
+    return bytes([len(data)]) + data
+
+
+# ---------------------------------------------------------------- 采集端
+class RelayServer:
+    """
+    把本机设备节点的事件与状态推送给界面端。
+    add_nodes() 在 GUI 线程调用 (连接设备之前)，start()/stop() 需在 ble_thread 中运行。
+    """
+
+    def __init__(self, host=DEFAULT_RELAY_HOST, port=DEFAULT_RELAY_PORT, flush_interval=0.02, backlog=65536):
+        self.host = host
+        self.port = port
+        self.flush_interval = flush_interval
+        self.session = int.from_bytes(os.urandom(8), "little") or 1
+        self.nodes = []  # slot -> DeviceNode
+        self._status = []  # slot -> (connected, 最近状态)
+        self._seq = 0  # 最后一个事件的序号
+        self._backlog = deque(maxlen=backlog)  # 最近的事件记录，序号为 _seq - len + 1 .. _seq
+        self.clients = {}  # writer -> 已发送的最后序号
+        self.events_sent = 0
+        self._connections = []
+        self._server = None
+        self._flush_handle = None
+        self.loop = None
+
+    @property
+    def is_running(self):
+        return self._server is not None
+
+    def add_nodes(self, nodes):
+        from core.ble_thread import ble_thread
+        ble_thread.start()
+        self.loop = ble_thread.loop
+        for node in nodes:
+            slot = len(self.nodes)
+            self.nodes.append(node)
+            self._status.append((node.is_connected, "Connected" if node.is_connected else "Disconnected"))
+            # 信号可能从 BLE 线程或 GUI 线程发出，统一转到 BLE 事件循环处理
+            conn = node.data_received.connect(
+                lambda *args, s=slot: self.loop.call_soon_threadsafe(self._on_event, s, args),
+                Qt.ConnectionType.DirectConnection)
+            self._connections.append((node.data_received, conn))
+            conn = node.status_changed.connect(
+                lambda status, s=slot: self.loop.call_soon_threadsafe(self._on_status, s, status),
+                Qt.ConnectionType.DirectConnection)
+            self._connections.append((node.status_changed, conn))
+
+    async def start(self):
+        try:
+            self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+            print(f"Relay server listening on {self.host}:{self.port} ({len(self.nodes)} devices)")
+            if self.host in ("", "0.0.0.0", "::"):
+                print("Relay server: listening on all interfaces without authentication; "
+                      "any host that can reach this port can reset the clickers")
+        except OSError as e:
+            print(f"Relay server failed to start: {e}")
+            self._server = None
+
+    async def stop(self):
+        for signal, conn in self._connections:
+            try:
+                signal.disconnect(conn)
+            except TypeError:
+                pass
+        self._connections.clear()
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self.flush()  # 尽量把最后的事件发出去
+        for writer in list(self.clients):
+            writer.close()
+        self.clients.clear()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    # --- 事件来源 (BLE 线程) ---
+    def _on_event(self, slot, args):
+        current, evt_type, plus, minus, ts, click_time = args
+        self._seq += 1
+        self._backlog.append(EVENT_RECORD.pack(slot, current, evt_type, plus, minus, ts, click_time))
+        if self._flush_handle is None and self.clients:
+            self._flush_handle = self.loop.call_later(self.flush_interval, self.flush)
+
+    def _on_status(self, slot, status):
+        node = self.nodes[slot]
+        self._status[slot] = (node.is_connected, status)
+        if self._flush_handle:
+            self._flush_handle.cancel()
+        self.flush()  # 状态之前的事件先发出，保持先后顺序
+        frame = encode_frame(T_STATUS, STATUS_HEAD.pack(slot, node.is_connected) + status.encode('utf-8'))
+        for writer in self.clients:
+            writer.write(frame)
+
+    # --- 推送 ---
+    def flush(self):
+        self._flush_handle = None
+        for writer, sent in list(self.clients.items()):
+            if sent >= self._seq: continue
+            if writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                # 对方接收慢：本轮跳过，事件留在 backlog 中稍后再发
+                self._flush_handle = self._flush_handle or self.loop.call_later(self.flush_interval, self.flush)
+                continue
+            self.clients[writer] = self._send_since(writer, sent)
+
+    def _send_since(self, writer, last_seq):
+        """发送 last_seq 之后的全部事件，返回已发送的最后序号"""
+        oldest = self._seq - len(self._backlog) + 1
+        if last_seq + 1 < oldest:
+            print(f"Relay: client fell behind the backlog, events {last_seq + 1}..{oldest - 1} lost")
+            last_seq = oldest - 1
+        start = last_seq + 1 - oldest
+        now = time.time()
+        records = list(islice(self._backlog, start, None))
+        for i in range(0, len(records), MAX_BATCH):
+            batch = records[i:i + MAX_BATCH]
+            head = EVENTS_HEAD.pack(last_seq + 1 + i, now, len(batch))
+            writer.write(encode_frame(T_EVENTS, head + b"".join(batch)))
+        self.events_sent += len(records)
+        return self._seq
+
+    def _devices_frame(self):
+        parts = [DEVICES_HEAD.pack(self.session, len(self.nodes))]
+        for slot, node in enumerate(self.nodes):
+            connected, _ = self._status[slot]
+            address = node.ble_device.address.encode('utf-8')[:255]
+            parts.append(DEVICE_ENTRY.pack(slot, connected, len(address)) + address + _pack_str(node.name))
+        return encode_frame(T_DEVICES, b"".join(parts))
+
+    # --- 连接处理 ---
+    async def _handle_client(self, reader, writer):
+        peer = writer.get_extra_info("peername")
+        try:
+            frame_type, payload = await read_frame(reader)
+            if frame_type != T_HELLO:
+                raise ValueError("expected HELLO")
+            magic, version, session, last_seq = HELLO.unpack(payload)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"incompatible client {magic!r} v{version}")
+            if session == 0:
+                last_seq = self._seq  # 首次连接：只接收之后的实时事件
+            elif session != self.session:
+                last_seq = self._seq - len(self._backlog)  # 采集端已重启：补发本次会话缓存的全部事件
+
+            writer.write(self._devices_frame())
+            for slot, (connected, status) in enumerate(self._status):
+                writer.write(encode_frame(T_STATUS, STATUS_HEAD.pack(slot, connected) + status.encode('utf-8')))
+            self.clients[writer] = self._send_since(writer, min(last_seq, self._seq))
+            print(f"Relay client {peer} connected, resuming after #{last_seq}")
+
+            while True:
+                frame_type, payload = await read_frame(reader)
+                if frame_type == T_RESET:
+                    request_id, slot, timeout_ms = RESET.unpack(payload)
+                    asyncio.get_running_loop().create_task(self._reset(writer, request_id, slot, timeout_ms / 1000))
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError, struct.error) as e:
+            if not isinstance(e, (asyncio.IncompleteReadError, ConnectionError)):
+                print(f"Relay client {peer} rejected: {e}")
+        finally:
+            self.clients.pop(writer, None)
+            writer.close()
+
+    async def _reset(self, writer, request_id, slot, timeout):
+        ok = False
+        if slot < len(self.nodes):
+            ok = await self.nodes[slot].reset_and_confirm(timeout)
+        if writer in self.clients:
+            writer.write(encode_frame(T_RESET_OK, RESET_OK.pack(request_id, ok)))
+
+
+# ---------------------------------------------------------------- 界面端
+class RemoteDevice:
+    """远端设备句柄，对应扫描得到的 BLEDevice / 已保存的 KnownDevice"""
+
+    def __init__(self, host, port, remote_address, name=None):
+        self.host = host
+        self.port = port
+        self.remote_address = remote_address
+        self.address = f"{RELAY_SCHEME}{host}:{port}/{remote_address}"
+        self.name = name or "Remote"
+
+
+class RemoteDeviceNode(QObject):
+    """
+    经中继接入的远端计分器，接口与 DeviceNode 相同。
+    connect / disconnect / reset_and_confirm 为协程，需在 ble_thread 中执行。
+    """
+    data_received = pyqtSignal(int, int, int, int, int, float)
+    status_changed = pyqtSignal(str)
+
+    def __init__(self, ble_device, client):
+        super().__init__()
+        self.ble_device = ble_device
+        self.client = client
+        self.remote_address = parse_relay_address(ble_device.address)[2]
+        self.is_connected = False
+        self.last_event = None
+
+    @property
+    def name(self):
+        return getattr(self.ble_device, "name", None) or "?"
+
+    async def connect(self, timeout=5.0):
+        self.status_changed.emit("Connecting...")
+        try:
+            await self.client.attach(self, timeout)
+        except Exception as e:
+            self.client.detach(self)
+            self.status_changed.emit(f"Conn Error: {e}")
+
+    async def disconnect(self):
+        # 只断开本机的订阅，远端设备保持连接继续采集
+        self.client.detach(self)
+        self.is_connected = False
+
+    async def send_reset_command(self):
+        await self.reset_and_confirm()
+
+    async def reset_and_confirm(self, timeout=1.0):
+        if not self.is_connected:
+            return False
+        return await self.client.request_reset(self.remote_address, timeout)
+
+
+class RelayClient:
+    """到一个采集端的连接：断线按退避间隔重连，并从最后收到的序号续传"""
+
+    RECONNECT_DELAYS = (1, 2, 5, 10)  # 秒
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.session = 0
+        self.last_seq = 0
+        self._synced = False  # 是否已从本会话的事件中得知续传起点
+        self.devices = {}  # 远端设备地址 -> [slot, 名称, connected, 最近状态]
+        self._slots = {}  # slot -> 远端设备地址
+        self.nodes = {}  # 远端设备地址 -> 已接入的 RemoteDeviceNode
+        self.clock_offset = None  # 本机时间 - 采集端时间 (含最小网络延迟)
+        self.events_received = 0
+        self._writer = None
+        self._task = None
+        self._ready = None  # 收到 DEVICES 帧后置位
+        self._resets = {}  # request_id -> Future
+        self._next_request = 0
+
+    @property
+    def is_linked(self):
+        return self._writer is not None
+
+    def _ensure_running(self):
+        if self._ready is None:
+            self._ready = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), name=f"relay-{self.host}:{self.port}")
+
+    async def discover(self, timeout=3.0):
+        """连接采集端并返回其设备列表 [RemoteDevice]"""
+        self._ensure_running()
+        await asyncio.wait_for(self._ready.wait(), timeout)
+        return [RemoteDevice(self.host, self.port, addr, f"{info[1]}@{self.host}")
+                for addr, info in self.devices.items()]
+
+    async def attach(self, node, timeout):
+        self.nodes[node.remote_address] = node
+        self._ensure_running()
+        await asyncio.wait_for(self._ready.wait(), timeout)
+        info = self.devices.get(node.remote_address)
+        if info is None:
+            raise ConnectionError("device not on relay")
+        self._update_node(node, info[2], info[3])
+
+    def detach(self, node):
+        if self.nodes.get(node.remote_address) is node:
+            del self.nodes[node.remote_address]
+        if not self.nodes:
+            self.close()
+
+    def close(self):
+        """停止订阅；之后再接入视为新的连接 (只接收实时事件，不续传)"""
+        self.session = self.last_seq = 0
+        self._synced = False
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+        if self._ready:
+            self._ready.clear()
+
+    async def request_reset(self, remote_address, timeout):
+        info = self.devices.get(remote_address)
+        if info is None or self._writer is None:
+            return False
+        self._next_request = (self._next_request + 1) & 0xFFFFFFFF
+        request_id = self._next_request
+        future = asyncio.get_running_loop().create_future()
+        self._resets[request_id] = future
+        try:
+            self._writer.write(encode_frame(T_RESET, RESET.pack(request_id, info[0], min(int(timeout * 1000), 0xFFFF))))
+            # 远端确认可能要读一次特征值，额外留出网络往返的时间
+            return await asyncio.wait_for(future, timeout + 1.0)
+        except (asyncio.TimeoutError, ConnectionError):
+            return False
+        finally:
+            self._resets.pop(request_id, None)
+
+    # --- 连接循环 ---
+    async def _run(self):
+        attempt = 0
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError as e:
+                delay = self.RECONNECT_DELAYS[min(attempt, len(self.RECONNECT_DELAYS) - 1)]
+                attempt += 1
+                print(f"Relay {self.host}:{self.port} unreachable ({e}), retry in {delay} s")
+                await asyncio.sleep(delay)
+                continue
+
+            attempt = 0
+            self._writer = writer
+            self.clock_offset = None  # 每条连接重新估计
+            try:
+                # 尚未收到本会话的事件时按首次连接处理 (last_seq 还不是有效的续传起点)
+                session = self.session if self._synced else 0
+                writer.write(encode_frame(T_HELLO, HELLO.pack(MAGIC, VERSION, session, self.last_seq)))
+                while True:
+                    frame_type, payload = await read_frame(reader)
+                    self._on_frame(frame_type, payload)
+            except (asyncio.IncompleteReadError, ConnectionError, ValueError, struct.error) as e:
+                print(f"Relay {self.host}:{self.port} link lost: {e!r}")
+            finally:
+                self._writer = None
+                writer.close()
+                self._ready.clear()
+                for future in self._resets.values():
+                    if not future.done(): future.set_result(False)
+                for node in self.nodes.values():
+                    if node.is_connected:
+                        node.is_connected = False
+                        node.status_changed.emit("Relay Lost")
+            await asyncio.sleep(self.RECONNECT_DELAYS[0])
+
+    def _on_frame(self, frame_type, payload):
+        if frame_type == T_EVENTS:
+            self._on_events(payload)
+        elif frame_type == T_STATUS:
+            slot, connected = STATUS_HEAD.unpack_from(payload)
+            addr = self._slots.get(slot)
+            if addr is None: return
+            status = payload[STATUS_HEAD.size:].decode('utf-8', 'replace')
+            info = self.devices[addr]
+            info[2], info[3] = bool(connected), status
+            node = self.nodes.get(addr)
+            if node: self._update_node(node, info[2], status)
+        elif frame_type == T_DEVICES:
+            self._on_devices(payload)
+        elif frame_type == T_RESET_OK:
+            request_id, ok = RESET_OK.unpack(payload)
+            future = self._resets.get(request_id)
+            if future and not future.done(): future.set_result(bool(ok))
+
+    def _on_devices(self, payload):
+        session, count = DEVICES_HEAD.unpack_from(payload)
+        if session != self.session:
+            if self.session:
+                print(f"Relay {self.host}:{self.port}: collector restarted, sequence reset")
+            # 首次连接时服务端从其当前序号之后开始发送，起点以收到的第一个 EVENTS 帧为准
+            self.session, self.last_seq, self._synced = session, 0, False
+        pos = DEVICES_HEAD.size
+        self.devices, self._slots = {}, {}
+        for _ in range(count):
+            slot, connected, addr_len = DEVICE_ENTRY.unpack_from(payload, pos)
+            pos += DEVICE_ENTRY.size
+            addr = payload[pos:pos + addr_len].decode('utf-8', 'replace')
+            pos += addr_len
+            name_len = payload[pos]
+            name = payload[pos + 1:pos + 1 + name_len].decode('utf-8', 'replace')
+            pos += 1 + name_len
+            self.devices[addr] = [slot, name, bool(connected), "Connected" if connected else "Disconnected"]
+            self._slots[slot] = addr
+        self._ready.set()
+
+    def _on_events(self, payload):
+        first_seq, sent_at, count = EVENTS_HEAD.unpack_from(payload)
+        # 与 DeviceClock 相同的思路：收到时刻 - 发送时刻的最小值作为两台主机的时钟差
+        offset = time.time() - sent_at
+        if self.clock_offset is None or offset < self.clock_offset:
+            self.clock_offset = offset
+
+        if not self._synced:
+            self.last_seq = first_seq - 1  # 加入会话时的起点：之前的事件不属于本连接，不算丢失
+            self._synced = True
+        seq = first_seq - 1
+        for record in EVENT_RECORD.iter_unpack(payload[EVENTS_HEAD.size:EVENTS_HEAD.size + count * EVENT_RECORD.size]):
+            seq += 1
+            if seq <= self.last_seq: continue  # 续传时的重复事件
+            if seq > self.last_seq + 1:
+                print(f"Relay {self.host}:{self.port}: events {self.last_seq + 1}..{seq - 1} missing")
+            self.last_seq = seq
+            self.events_received += 1
+            slot, current, evt_type, plus, minus, ts, click_time = record
+            node = self.nodes.get(self._slots.get(slot))
+            if node is None: continue
+            node.last_event = ClickerEvent(current, evt_type, plus, minus, ts)
+            node.data_received.emit(current, evt_type, plus, minus, ts, click_time + self.clock_offset)
+
+    @staticmethod
+    def _update_node(node, connected, status):
+        node.is_connected = connected
+        node.status_changed.emit(status)
+
+
+class RelayHub:
+    """按 (主机, 端口) 复用 RelayClient；节点在 GUI 线程创建，网络操作在 ble_thread 中执行"""
+
+    def __init__(self):
+        self.clients = {}
+
+    def client(self, host, port):
+        key = (host, port)
+        if key not in self.clients:
+            self.clients[key] = RelayClient(host, port)
+        return self.clients[key]
+
+    def create_node(self, ble_device):
+        host, port, _ = parse_relay_address(ble_device.address)
+        return RemoteDeviceNode(ble_device, self.client(host, port))
+
+    async def discover(self, sources, timeout=3.0):
+        """查询多个采集端的设备列表，连不上的跳过"""
+        async def _one(host, port):
+            client = self.client(host, port)
+            try:
+                return await client.discover(timeout)
+            except (asyncio.TimeoutError, OSError) as e:
+                print(f"Relay {host}:{port} discovery failed: {e!r}")
+                return []
+            finally:
+                if not client.nodes:
+                    client.close()  # 只查询设备列表，不保持连接
+
+        results = await asyncio.gather(*(_one(h, p) for h, p in sources))
+        return [dev for devs in results for dev in devs]
+
+    def close_all(self):
+        for client in self.clients.values():
+            client.close()
+
+
+# 全局单例
+relay_hub = RelayHub()
@@ -0,0 +1,250 @@
+# core/results_server.py
+"""
+成绩汇总服务：多个赛场 (多台电脑) 的 ProjectStorage 把成绩实时推送到这里，合并后提供综合排名。
+
+    python main.py --results-server [--results-port 8767] [--results-dir results_hub]
+
+- POST /results            {"records": [...]}，按记录 id 去重 (重复推送只算一条)；有格式错误的记录时整批返回 400
+- GET  /projects           各项目的组别与成绩数
+- GET  /standings?project=X[&group=G][&since=版本]
+                           合并后的排名；带 since 时若无新成绩则挂起等待 (长轮询)，有变化立即返回
+接收的记录追加写入 results.jsonl，重启时回放重建索引。只依赖标准库，不需要 Qt。
+"""
+import asyncio
+import json
+import os
+from urllib.parse import urlsplit, parse_qs
+
+DEFAULT_RESULTS_PORT = 8767
+MAX_BODY = 8 * 1024 * 1024
+LONG_POLL_TIMEOUT = 25.0  # 秒
+TEXT_FIELDS = ("project", "group", "contestant", "timestamp")
+OPTIONAL_TEXT_FIELDS = ("contestant_id", "station", "folder")
+
+
+def validate_record(record):
+    """检查一条记录的格式，返回错误说明；合法返回 None"""
+    if not isinstance(record, dict):
+        return "record is not an object"
+    if not isinstance(record.get("id"), str) or not record["id"]:
+        return "id must be a non-empty string"
+    score = record.get("final_score", 0)
+    if isinstance(score, bool) or not isinstance(score, (int, float)):
+        return "final_score must be a number"
+    for key in TEXT_FIELDS:
+        if not isinstance(record.get(key, ""), str):
+            return f"{key} must be a string"
+    for key in OPTIONAL_TEXT_FIELDS:
+        if not isinstance(record.get(key), (str, type(None))):
+            return f"{key} must be a string"
+    if not isinstance(record.get("ref_scores", {}), dict):
+        return "ref_scores must be an object"
+    return None
+
+
+class ResultsStore:
+    """
+    合并后的成绩库。
+    - by_id:     记录 id -> 记录，用于去重
+    - standings: (项目名, 组别) -> {选手 id: 最新记录}；同一选手重新打分时以时间戳较新的为准
+    version 在每次有新成绩时递增，供长轮询判断是否有变化。
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.by_id = {}
+        self.standings = {}
+        self.version = 0
+        self._log = None
+        if path:
+            self._load()
+            self._log = open(path, 'a', encoding='utf-8')
+
+    def _load(self):
+        if not os.path.exists(self.path): return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # 写到一半的最后一行
+                if validate_record(record) is None:
+                    self._index(record)
+        self.version = len(self.by_id)
+        print(f"Results store: loaded {len(self.by_id)} records from {self.path}")
+
+    def add(self, records):
+        """合并一批记录 (格式已由 validate_record 检查)，返回 (新增数, 重复数)"""
+        accepted = duplicates = 0
+        for record in records:
+            rid = record["id"]
+            if rid in self.by_id:
+                duplicates += 1
+                continue
+            self._index(record)
+            if self._log:
+                self._log.write(json.dumps(record, ensure_ascii=False) + "\n")
+            accepted += 1
+        if accepted:
+            if self._log: self._log.flush()
+            self.version += 1
+        return accepted, duplicates
+
+    def _index(self, record):
+        self.by_id[record["id"]] = record
+        table = self.standings.setdefault((record.get("project", ""), record.get("group", "")), {})
+        cid = record.get("contestant_id") or record.get("contestant", "")
+        current = table.get(cid)
+        if current is None or current.get("timestamp", "") <= record.get("timestamp", ""):
+            table[cid] = record
+
+    def projects(self):
+        result = {}
+        for (project, group), table in self.standings.items():
+            result.setdefault(project, {})[group] = len(table)
+        return [{"project": p, "groups": groups} for p, groups in sorted(result.items())]
+
+    def ranking(self, project, group=None):
+        """{组别: [按总分排序的成绩]}，同分同名次"""
+        groups = {}
+        for (p, g), table in self.standings.items():
+            if p != project or (group is not None and g != group): continue
+            rows = sorted(table.values(), key=lambda r: (-r.get("final_score", 0), r.get("timestamp", "")))
+            ranked, rank, last = [], 0, None
+            for i, r in enumerate(rows):
+                if r.get("final_score") != last:
+                    rank, last = i + 1, r.get("final_score")
+                ranked.append({"rank": rank, "contestant": r.get("contestant"),
+                               "contestant_id": r.get("contestant_id"), "final_score": r.get("final_score"),
+                               "ref_scores": r.get("ref_scores", {}), "station": r.get("station"),
+                               "timestamp": r.get("timestamp")})
+            groups[g] = ranked
+        return groups
+
+    def close(self):
+        if self._log:
+            self._log.close()
+            self._log = None
+
+
+class ResultsServer:
+    """基于 asyncio 的最小 HTTP 服务 (与 BroadcastServer 相同的写法，不依赖第三方框架)"""
+
+    def __init__(self, store, host="0.0.0.0", port=DEFAULT_RESULTS_PORT):
+        self.store = store
+        self.host = host
+        self.port = port
+        self._server = None
+        self._changed = None  # 有新成绩时置位并替换，唤醒所有长轮询
+
+    async def start(self):
+        self._changed = asyncio.Event()
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        print(f"Results server running at http://{self.host}:{self.port}/ "
+              f"({len(self.store.by_id)} records)")
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle_client(self, reader, writer):
+        # 保持连接：ResultUploader 复用同一条连接连续推送
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                lines = request.decode('latin-1').split("\r\n")
+                method, target, _ = lines[0].split(" ", 2)
+                headers = {}
+                for line in lines[1:]:
+                    if ':' in line:
+                        k, v = line.split(':', 1)
+                        headers[k.strip().lower()] = v.strip()
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY:
+                    self._send(writer, 413, {"error": "body too large"})
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                url = urlsplit(target)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                status, reply = await self._route(method, url.path, query, body)
+                self._send(writer, status, reply)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close": break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, query, body):
+        if method == "POST" and path == "/results":
+            try:
+                records = json.loads(body).get("records", [])
+            except (ValueError, AttributeError):
+                return 400, {"error": "invalid JSON"}
+            if not isinstance(records, list):
+                return 400, {"error": "records must be a list"}
+            # 整批检查后再合并：格式错误的批次整体拒绝，不会只写入一部分
+            for i, record in enumerate(records):
+                error = validate_record(record)
+                if error:
+                    return 400, {"error": f"records[{i}]: {error}"}
+            accepted, duplicates = self.store.add(records)
+            if accepted:
+                self._changed.set()
+                self._changed = asyncio.Event()
+            return 200, {"accepted": accepted, "duplicates": duplicates, "version": self.store.version}
+
+        if method != "GET":
+            return 405, {"error": "method not allowed"}
+        if path == "/projects":
+            return 200, {"version": self.store.version, "projects": self.store.projects()}
+        if path == "/standings":
+            project = query.get("project")
+            if project is None:
+                return 400, {"error": "project is required"}
+            since = query.get("since")
+            if since is not None and since.isdigit() and int(since) >= self.store.version:
+                try:
+                    await asyncio.wait_for(self._changed.wait(), LONG_POLL_TIMEOUT)
+                except asyncio.TimeoutError:
+                    pass
+            return 200, {"version": self.store.version, "project": project,
+                         "groups": self.store.ranking(project, query.get("group"))}
+        return 404, {"error": "not found"}
+
+    def _send(self, writer, status, payload):
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                  413: "Payload Too Large"}.get(status, "")
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {reason}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Cache-Control: no-cache\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+
+
+def run_results_server(port=DEFAULT_RESULTS_PORT, data_dir="results_hub", host="0.0.0.0"):
+    os.makedirs(data_dir, exist_ok=True)
+    store = ResultsStore(os.path.join(data_dir, "results.jsonl"))
+    server = ResultsServer(store, host, port)
+
+    async def _serve():
+        await server.start()
+        try:
+            await asyncio.Event().wait()  # 一直运行到 Ctrl+C
+        finally:
+            await server.stop()
+
+    try:
+        asyncio.run(_serve())
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Results server failed to start: {e}")
+        return 1
+    finally:
+        store.close()
+    return 0
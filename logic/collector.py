@@ -0,0 +1,210 @@
+# logic/collector.py
+"""
+无界面采集模式：在场边的小主机上只连接计分器并记录事件，不创建任何窗口。
+
+    python main.py --headless --project <项目文件夹或项目名> [--stats-interval 10] [--relay-port 8766 [--relay-host IP]]
+
+复用已保存项目的 config.json (裁判与设备地址)、ble_manager 的连接逻辑、
+Referee 的计分与 ProjectStorage 的原始日志；只依赖 QtCore (QCoreApplication)，
+不加载 QtWidgets 与界面模块，内存占用最小。
+指定 --relay-port 时同时启动事件中继 (core.relay)，界面端可把这里的设备当作本机设备使用。
+"""
+import signal
+import sys
+import time
+from PyQt6.QtCore import QCoreApplication, QTimer
+from core.ble_manager import ble_manager, KnownDevice
+from core.ble_thread import ble_thread
+from logic.match_manager import MatchManager
+from logic.referee import Referee
+from utils.app_settings import app_settings
+from utils.csv_writer import csv_writer
+from utils.result_sync import result_uploader
+from utils.logger import instrumentation
+from utils.storage import ProjectStorage
+
+try:
+    import resource  # 仅 Unix：用于统计内存峰值
+except ImportError:
+    resource = None
+
+
+def find_project(store, name):
+    """按文件夹名或项目名查找项目 (同名取最近更新的)，返回文件夹名或 None"""
+    projects = store.list_projects()
+    for p in projects:
+        if p["folder"] == name:
+            return p["folder"]
+    for p in projects:  # list_projects 已按更新时间倒序
+        if p["name"] == name:
+            return p["folder"]
+    return None
+
+
+def build_referees(referees_config):
+    """按项目配置创建裁判并从会话池租用设备节点 (按已保存地址直连，不扫描)"""
+    referees = []
+    for cfg in referees_config:
+        ref = Referee(cfg["index"], cfg["name"], cfg.get("mode", "SINGLE"))
+        pri_addr = cfg.get("primary_device")
+        if not pri_addr or pri_addr == "N/A":
+            print(f"Referee {cfg['name']}: no saved device, skipped")
+            continue
+        primary = ble_manager.lease(KnownDevice(pri_addr, cfg.get("primary_name")))
+        secondary = None
+        sec_addr = cfg.get("secondary_device")
+        if ref.mode == "DUAL" and sec_addr and sec_addr != "N/A":
+            secondary = ble_manager.lease(KnownDevice(sec_addr, cfg.get("secondary_name")))
+        ref.set_devices(primary, secondary)
+        referees.append(ref)
+    return referees
+
+
+class HeadlessCollector:
+    """连接设备、记录事件并定期打印统计；断线后按退避间隔自动重连"""
+
+    RECONNECT_DELAYS = (2, 5, 10, 30)  # 秒
+
+    def __init__(self, store, stats_interval=10.0, relay_port=None, relay_host=None):
+        self.store = store
+        self.relay_port = relay_port
+        self.relay_host = relay_host
+        self.relay = None
+        self.match = MatchManager(store=store)
+        self.score_table = None
+        self.stats_interval = stats_interval
+        self.nodes = []
+        self.status = {}  # node -> 最近状态
+        self._retries = {}  # node -> 连续重连次数
+        self._started = time.monotonic()
+        self._last_events = 0
+        self._last_time = self._started
+
+        self.stats_timer = QTimer()
+        self.stats_timer.timeout.connect(self.print_stats)
+
+    def start(self, folder):
+        config = self.match.open_project(folder)
+        if not config:
+            print(f"Failed to load project config: {folder}")
+            return False
+
+        referees = build_referees(config.get("referees", []))
+        if not referees:
+            print("No referees with saved devices in this project")
+            return False
+
+        if app_settings.get("shared_scores_enabled"):
+            from utils.score_table import SharedScoreTable, HEADLESS_BLOCK_NAME
+            try:
+                # 与同一台主机上界面的赛场 1 ("clicker_scores") 区分开
+                self.score_table = SharedScoreTable(HEADLESS_BLOCK_NAME)
+            except OSError as e:
+                print(f"Shared score table unavailable: {e}")
+            else:
+                print(f"Shared score table published as '{self.score_table.name}'")
+                self.match.score_table = self.score_table  # setup() 时写入裁判
+
+        project_name = config.get("project_name", folder)
+        self.match.setup(project_name, referees, config.get("tournament_data", {}))
+        idx, all_scored = self.match.initial_index()
+        if all_scored:
+            print("All contestants already scored; recording under the first contestant")
+        self.match.load_contestant(idx)
+        print(f"Recording project '{project_name}' ({self.store.current_project_path}), "
+              f"contestant: {self.match.current_name}")
+
+        for ref in referees:
+            self.nodes += [n for n in (ref.primary_device, ref.secondary_device) if n is not None]
+
+        if self.relay_port:
+            from core.relay import RelayServer, DEFAULT_RELAY_HOST
+            self.relay = RelayServer(host=self.relay_host or DEFAULT_RELAY_HOST, port=self.relay_port)
+            self.relay.add_nodes(self.nodes)  # 在连接之前订阅，连接状态也会转发
+            ble_thread.spawn(self.relay.start(), name="relay-server")
+
+        for node in self.nodes:
+            node.status_changed.connect(lambda s, n=node: self.on_status(n, s))
+            ble_manager.connect(node)
+
+        self.stats_timer.start(int(self.stats_interval * 1000))
+        return True
+
+    def on_status(self, node, status):
+        self.status[node] = status
+        print(f"[{node.name} {node.ble_device.address}] {status}")
+        if status == "Connected":
+            self._retries[node] = 0
+        elif status == "Disconnected" or status.startswith("Conn Error"):
+            attempt = self._retries.get(node, 0)
+            self._retries[node] = attempt + 1
+            delay = self.RECONNECT_DELAYS[min(attempt, len(self.RECONNECT_DELAYS) - 1)]
+            QTimer.singleShot(delay * 1000, lambda: self.reconnect(node))
+
+    def reconnect(self, node):
+        if node.is_connected or node not in self.nodes: return
+        ble_manager.connect(node)
+
+    def print_stats(self):
+        now = time.monotonic()
+        events = instrumentation.counters.get("ble_events", 0)
+        rate = (events - self._last_events) / max(now - self._last_time, 1e-6)
+        self._last_events, self._last_time = events, now
+
+        connected = sum(1 for n in self.nodes if n.is_connected)
+        scores = " | ".join(f"{r.name}={r.last_total}:{r.last_plus}:{r.last_minus}" for r in self.match.referees)
+        mem = ""
+        if resource is not None:
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # Linux 为 KB，macOS 为字节
+            mem = f", peak RSS {peak / (1024 * 1024 if sys.platform == 'darwin' else 1024):.0f} MB"
+        relay = ""
+        if self.relay is not None:
+            relay = f", relay clients {len(self.relay.clients)} (sent {self.relay.events_sent})"
+        print(f"[Stats] up {now - self._started:.0f} s, devices {connected}/{len(self.nodes)}, "
+              f"events {events} ({rate:.1f}/s){relay}{mem} | {self.match.current_name}: {scores}")
+
+    def stop(self):
+        self.stats_timer.stop()
+        self.print_stats()
+        if self.relay is not None:
+            try:
+                ble_thread.spawn(self.relay.stop(), name="relay-stop").result(timeout=2)
+            except Exception as e:
+                print(f"Relay server stop failed: {e!r}")
+            self.relay = None
+        if self.score_table is not None:
+            self.match.set_score_table(None)
+            self.score_table.close()
+            self.score_table = None
+        nodes, self.nodes = self.nodes, []
+        for node in nodes:
+            ble_thread.spawn(node.disconnect(), name=f"disconnect-{node.ble_device.address}")
+
+
+def run_headless(project, stats_interval=10.0, argv=None, relay_port=None, relay_host=None):
+    app = QCoreApplication(argv or sys.argv)
+    store = ProjectStorage()
+    folder = find_project(store, project)
+    if folder is None:
+        print(f"Project not found: {project}")
+        return 1
+
+    collector = HeadlessCollector(store, stats_interval, relay_port, relay_host)
+    if not collector.start(folder):
+        return 1
+
+    # Ctrl+C / SIGTERM 退出；Python 信号处理需要事件循环定期回到解释器
+    signal.signal(signal.SIGINT, lambda *_: app.quit())
+    signal.signal(signal.SIGTERM, lambda *_: app.quit())
+    wakeup = QTimer()
+    wakeup.timeout.connect(lambda: None)
+    wakeup.start(500)
+
+    app.exec()
+
+    collector.stop()
+    ble_thread.shutdown()
+    csv_writer.shutdown()
+    result_uploader.shutdown()
+    return 0
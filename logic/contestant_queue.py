@@ -0,0 +1,181 @@
+# logic/contestant_queue.py
+"""
+选手名单与未打分队列 (纯 Python，无 Qt 依赖)。
+
+- 每位选手有稳定 id，随名单保存在 config.json (group_configs[组别]["ids"])：
+  新选手的 id 就是名字本身，已被占用时依次为 "名字#2"、"名字#3"...
+  编辑名单时按 reconcile_ids() 对齐旧名单，插入或删除前面的同名选手不会改变其他选手的 id
+- 旧项目没有保存 id：按名单位置生成 (同一规则)，与只按名字记录的旧日志兼容
+- 未打分位置用 Fenwick 树维护：标记、下一位未打分、剩余数量均为 O(log n)
+"""
+import difflib
+
+
+def contestant_ids(names):
+    """按名单顺序生成 id (同名选手加 #序号)，只用于没有保存 id 的旧项目"""
+    seen = {}
+    used = set()
+    ids = []
+    for name in names:
+        cid, seen[name] = _next_id(name, seen.get(name, 0), used)
+        used.add(cid)
+        ids.append(cid)
+    return ids
+
+
+def _next_id(name, count, used):
+    # 名单里本身就有 "名字#2" 这类名字时继续加序号，避免撞 id
+    while True:
+        count += 1
+        cid = name if count == 1 else f"{name}#{count}"
+        if cid not in used:
+            return cid, count
+
+
+def roster_ids(names, ids=None):
+    """配置中保存的 id 与名单一致时直接使用，否则 (旧项目) 按名单位置生成"""
+    if ids is not None and len(ids) == len(names) and len(set(ids)) == len(ids):
+        return list(ids)
+    return contestant_ids(names)
+
+
+def reconcile_ids(old_names, old_ids, new_names):
+    """
+    编辑名单后为新名单分配 id：
+    1. 与旧名单按最长公共子序列对齐，未变动的选手保留原 id
+    2. 剩下的按名字取一个未对齐的旧 id (调整顺序的选手)
+    3. 仍没有 id 的是新增选手，取未被占用的新 id
+    """
+    old_ids = roster_ids(old_names, old_ids)
+    ids = [None] * len(new_names)
+    matched = set()
+    matcher = difflib.SequenceMatcher(None, old_names, new_names, autojunk=False)
+    for block in matcher.get_matching_blocks():
+        for k in range(block.size):
+            ids[block.b + k] = old_ids[block.a + k]
+            matched.add(block.a + k)
+
+    spare = {}  # 名字 -> 未对齐的旧 id (按原顺序)
+    for i, name in enumerate(old_names):
+        if i not in matched:
+            spare.setdefault(name, []).append(old_ids[i])
+    for j, name in enumerate(new_names):
+        if ids[j] is None and spare.get(name):
+            ids[j] = spare[name].pop(0)
+
+    # 删掉的选手的 id 也不复用：其成绩仍在 results.csv 中
+    used = set(old_ids) | {cid for cid in ids if cid is not None}
+    for j, name in enumerate(new_names):
+        if ids[j] is None:
+            ids[j], _ = _next_id(name, 0, used)
+            used.add(ids[j])
+    return ids
+
+
+class UnscoredIndex:
+    """按位置记录未打分选手的 Fenwick 树 (树中 1 表示未打分)"""
+
+    def __init__(self, size, scored_positions=()):
+        scored = set(scored_positions)
+        self._flags = bytearray(0 if i in scored else 1 for i in range(size))
+        self._build()
+
+    def _build(self):
+        size = len(self._flags)
+        tree = [0] * (size + 1)
+        for i, flag in enumerate(self._flags, 1):
+            tree[i] += flag
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self._tree = tree
+        self._count = sum(self._flags)
+        self._top = 1 << size.bit_length() if size else 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, scored=False):
+        # 只在自由模式追加选手时使用，重建为 O(n)
+        self._flags.append(0 if scored else 1)
+        self._build()
+
+    def is_unscored(self, pos):
+        return bool(self._flags[pos])
+
+    def set_scored(self, pos, scored=True):
+        flag = 0 if scored else 1
+        if self._flags[pos] == flag: return
+        self._flags[pos] = flag
+        delta = 1 if flag else -1
+        self._count += delta
+        i = pos + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, end):
+        """位置 [0, end) 内未打分人数"""
+        total = 0
+        while end > 0:
+            total += self._tree[end]
+            end -= end & -end
+        return total
+
+    def _kth(self, k):
+        """第 k 个 (从 1 开始) 未打分选手的位置"""
+        pos = 0
+        step = self._top
+        while step:
+            nxt = pos + step
+            if nxt < len(self._tree) and self._tree[nxt] < k:
+                pos = nxt
+                k -= self._tree[nxt]
+            step >>= 1
+        return pos
+
+    def first(self):
+        return self._kth(1) if self._count else -1
+
+    def next_after(self, pos):
+        """pos 之后 (循环) 的下一位未打分选手，不包括 pos 本身；没有返回 -1"""
+        if not self._count: return -1
+        before = self._prefix(pos + 1) if pos >= 0 else 0
+        result = self._kth(before + 1) if before < self._count else self._kth(1)
+        return -1 if result == pos else result
+
+
+class Roster:
+    """一个组别的选手名单：位置 <-> 稳定 id，以及未打分队列"""
+
+    def __init__(self, names, scored_ids=(), ids=None):
+        self.names = list(names)
+        self.ids = roster_ids(self.names, ids)
+        self._name_counts = {}
+        for name in self.names:
+            self._name_counts[name] = self._name_counts.get(name, 0) + 1
+        self._pos = {cid: i for i, cid in enumerate(self.ids)}
+        scored_ids = set(scored_ids)
+        self.unscored = UnscoredIndex(len(self.ids), (i for i, cid in enumerate(self.ids) if cid in scored_ids))
+
+    def __len__(self):
+        return len(self.names)
+
+    def append(self, name):
+        cid, self._name_counts[name] = _next_id(name, self._name_counts.get(name, 0), self._pos)
+        self.names.append(name)
+        self.ids.append(cid)
+        self._pos[cid] = len(self.ids) - 1
+        self.unscored.append()
+
+    def position(self, contestant_id):
+        return self._pos.get(contestant_id, -1)
+
+    def is_scored(self, pos):
+        return not self.unscored.is_unscored(pos)
+
+    def mark_scored(self, pos):
+        self.unscored.set_scored(pos, True)
+
+    def all_scored(self):
+        return len(self.unscored) == 0
@@ -0,0 +1,297 @@
+# logic/match_manager.py
+"""
+比赛流程控制 (不依赖任何界面部件)：
+裁判、选手名单、已打分集合、结果保存与连赛自动跳转都在 MatchManager 中，
+MainWindow 只负责显示与确认框，因此可以在无界面环境下完整模拟整场比赛。
+
+模拟/基准:
+    python -m logic.match_manager --simulate 5000 [--referees 3]
+"""
+import random
+import shutil
+import tempfile
+import time
+from PyQt6.QtCore import QObject, pyqtSignal
+from logic.referee import Referee
+from logic.contestant_queue import Roster
+from logic.reset_coordinator import reset_coordinator
+from utils.storage import storage, ProjectStorage
+
+
+class MatchManager(QObject):
+    # 信号：切换到新选手 (idx, name)
+    contestant_changed = pyqtSignal(int, str)
+    # 信号：自由模式自动追加了新选手
+    contestant_added = pyqtSignal(str)
+
+    def __init__(self, store=None, reset_devices=None):
+        super().__init__()
+        self.storage = store or storage
+        # 设备复位入口，缺省交给 reset_coordinator (无设备时直接清零本地缓存)
+        self.reset_devices_fn = reset_devices or reset_coordinator.reset
+
+        self.referees = []
+        self.project_name = ""
+        self.tournament_data = {}
+        self.active_group_name = None
+        self.roster = Roster([])
+        self.current_idx = -1
+        self.is_free_mode = False
+        self.auto_next = True
+        self.score_table = None  # 共享内存分数表 (可选)
+
+    @property
+    def contestants(self):
+        """当前组别的选手名 (显示用，可能重名)"""
+        return self.roster.names
+
+    # --- 项目 ---
+    def new_project(self):
+        self.storage.current_project_path = None
+
+    def open_project(self, folder_name):
+        """打开已有项目，返回其 config (失败返回 None)"""
+        self.storage.set_current_project(folder_name)
+        return self.storage.load_project_config(folder_name)
+
+    def setup(self, project_name, referees, tournament_data):
+        """向导完成：载入裁判与名单，并写入项目配置"""
+        for ref in self.referees:
+            try:
+                ref.score_updated.disconnect(self.mark_current_scored)
+            except TypeError:
+                pass
+
+        self.project_name = project_name
+        self.referees = referees
+        self.tournament_data = tournament_data
+
+        active_group_val = tournament_data.get("active_group")
+
+        ids = None
+        if active_group_val:
+            self.is_free_mode = False
+            self.active_group_name = active_group_val
+            names = tournament_data.get("groups", {}).get(active_group_val, [])
+            ids = tournament_data.get("group_configs", {}).get(active_group_val, {}).get("ids")
+        else:
+            self.is_free_mode = True
+            self.active_group_name = "Free Mode"
+            names = ["Player 1"]
+
+        self.current_idx = -1
+        self.auto_next = self.is_free_mode or len(names) > 0
+
+        for ref in referees:
+            ref.storage = self.storage
+            ref.score_table = self.score_table
+            ref.score_updated.connect(self.mark_current_scored)
+        if self.score_table is not None:
+            self.score_table.set_referees(referees)
+
+        scored_ids = set()
+        try:
+            referees_config = self.referees_config()
+            if not self.storage.current_project_path:
+                self.storage.create_project(project_name, referees_config, tournament_data)
+            else:
+                self.storage.update_project_config(project_name, referees_config, tournament_data)
+                scored_ids = self.storage.get_existing_contestants(self.active_group_name)
+        except Exception as e:
+            print(f"Storage Init Failed: {e}")
+
+        self.roster = Roster(names, scored_ids, ids)
+
+    def set_score_table(self, table):
+        """启用/停用共享内存分数表 (table 为 None 即停用)，已载入的裁判与选手立即写入"""
+        self.score_table = table
+        for ref in self.referees:
+            ref.score_table = table
+        if table is not None:
+            table.set_referees(self.referees)
+            if self.current_id is not None:
+                table.set_contestant(self.current_id)
+
+    def referees_config(self):
+        referees_config = []
+        for ref in self.referees:
+            pri_addr = ref.primary_device.ble_device.address if ref.primary_device else "N/A"
+            sec_addr = "N/A"
+            if ref.secondary_device:
+                sec_addr = ref.secondary_device.ble_device.address
+            ref_data = {"index": ref.index, "name": ref.name, "mode": ref.mode, "primary_device": pri_addr,
+                        "secondary_device": sec_addr}
+            # 设备名称用于下次打开项目时直连 (warm start) 的显示
+            if ref.primary_device: ref_data["primary_name"] = ref.primary_device.name
+            if ref.secondary_device: ref_data["secondary_name"] = ref.secondary_device.name
+            referees_config.append(ref_data)
+        return referees_config
+
+    # --- 选手 ---
+    @property
+    def current_name(self):
+        if 0 <= self.current_idx < len(self.roster):
+            return self.roster.names[self.current_idx]
+        return None
+
+    @property
+    def current_id(self):
+        """当前选手的稳定 id (同名选手可区分)，用于日志、成绩与曲线历史"""
+        if 0 <= self.current_idx < len(self.roster):
+            return self.roster.ids[self.current_idx]
+        return None
+
+    def initial_index(self):
+        """开赛时的第一位选手：返回 (idx, all_scored)"""
+        if self.is_free_mode or not len(self.roster):
+            return 0, False
+        first = self.roster.unscored.first()
+        return (first, False) if first >= 0 else (0, True)
+
+    def needs_overwrite_confirm(self, idx):
+        """切换到已打分的其他选手时需要确认覆盖"""
+        return 0 <= idx < len(self.roster) and idx != self.current_idx and self.roster.is_scored(idx)
+
+    def load_contestant(self, idx):
+        """切换到第 idx 位选手并复位设备 (确认已由调用方完成)"""
+        if not (0 <= idx < len(self.roster)): return False
+
+        self.current_idx = idx
+        for ref in self.referees:
+            ref.set_contestant(self.roster.ids[idx])
+        if self.score_table is not None:
+            self.score_table.set_contestant(self.roster.ids[idx])
+
+        self.contestant_changed.emit(idx, self.roster.names[idx])
+        self.reset_devices()
+        return True
+
+    def mark_current_scored(self, *args):
+        if 0 <= self.current_idx < len(self.roster):
+            self.roster.mark_scored(self.current_idx)
+
+    def has_unsaved_scores(self):
+        return sum(ref.last_total for ref in self.referees) != 0
+
+    def save_current_result(self):
+        name = self.current_name
+        if name is None: return
+
+        total_score = 0
+        details = []
+        for ref in self.referees:
+            score = ref.last_total
+            total_score += score
+            details.append(f"{ref.name}={score}:{ref.last_plus}:{ref.last_minus}")
+
+        self.storage.save_result(self.active_group_name, name, total_score, " | ".join(details), self.current_id)
+
+    def reset_devices(self):
+        self.reset_devices_fn(self.referees)
+
+    # --- 切换逻辑 ---
+    def resolve_switch(self, delta):
+        """
+        计算前后切换的目标选手。
+        返回目标 idx；-1 表示不切换；None 表示赛事模式下全部选手都已打分。
+        """
+        if not len(self.roster): return -1
+
+        # --- 自由模式 ---
+        if self.is_free_mode:
+            new_idx = self.current_idx + delta
+            if new_idx < 0: return -1
+            if new_idx >= len(self.roster):
+                new_name = f"Player {new_idx + 1}"
+                self.roster.append(new_name)
+                self.contestant_added.emit(new_name)
+            return new_idx
+
+        # --- 赛事模式 ---
+        if delta < 0:
+            return (self.current_idx + delta) % len(self.roster)
+
+        next_idx = self.find_next_unscored_idx()
+        return next_idx if next_idx >= 0 else None
+
+    def find_next_unscored_idx(self):
+        """从当前位置向后循环查找下一位未打分选手 (O(log n))，找不到返回 -1"""
+        return self.roster.unscored.next_after(self.current_idx)
+
+    def all_scored(self):
+        return self.roster.all_scored()
+
+    def advance(self):
+        """连赛复位：保存当前成绩，返回下一位的 idx (含义同 resolve_switch)"""
+        self.save_current_result()
+        return self.resolve_switch(1)
+
+    def prefetch_ids(self):
+        """连赛模式下预测下一位选手 (id)，供悬浮窗预加载历史曲线"""
+        if not self.auto_next or not len(self.roster):
+            return []
+        if self.is_free_mode:
+            next_idx = self.current_idx + 1
+        else:
+            next_idx = self.find_next_unscored_idx()
+        if 0 <= next_idx < len(self.roster):
+            return [self.roster.ids[next_idx]]
+        return []
+
+
+def simulate(contestant_count, referee_count=3, base_dir=None, seed=0):
+    """
+    无界面模拟整场赛事：每位选手随机打分、保存成绩、自动跳到下一位。
+    返回 (完成选手数, 耗时秒)。
+    """
+    rng = random.Random(seed)
+    names = [f"Player {i + 1}" for i in range(contestant_count)]
+    referees = [Referee(i + 1, f"Referee {i + 1}") for i in range(referee_count)]
+    tournament_data = {
+        "groups": {"Simulation": names},
+        "group_configs": {"Simulation": {"ref_count": referee_count}},
+        "active_group": "Simulation",
+    }
+
+    manager = MatchManager(store=ProjectStorage(base_dir or tempfile.mkdtemp(prefix="sim_")))
+    manager.setup("Simulation", referees, tournament_data)
+    idx, _ = manager.initial_index()
+
+    done = 0
+    start = time.perf_counter()
+    manager.load_contestant(idx)
+    while True:
+        for ref in referees:
+            plus, minus = rng.randint(0, 40), rng.randint(0, 5)
+            ref._on_primary_data(plus - minus, 1, plus, minus, done, time.time())
+        done += 1
+
+        next_idx = manager.advance()
+        if next_idx is None or next_idx < 0:
+            break
+        manager.load_contestant(next_idx)
+    return done, time.perf_counter() - start
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Headless tournament simulation / benchmark")
+    parser.add_argument("--simulate", type=int, default=1000, help="选手人数")
+    parser.add_argument("--referees", type=int, default=3, help="裁判人数")
+    parser.add_argument("--keep", action="store_true", help="保留生成的项目目录")
+    args = parser.parse_args(argv)
+
+    base_dir = tempfile.mkdtemp(prefix="sim_")
+    try:
+        done, elapsed = simulate(args.simulate, args.referees, base_dir)
+        print(f"Simulated {done} contestants x {args.referees} referees in {elapsed:.3f} s "
+              f"({done / elapsed:.0f} contestants/s)")
+    finally:
+        if args.keep:
+            print(f"Project kept in {base_dir}")
+        else:
+            shutil.rmtree(base_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,13 @@
 # logic/referee.py
-import asyncio
+from typing import TYPE_CHECKING
 from PyQt6.QtCore import QObject, pyqtSignal, Qt
-from core.device_node import DeviceNode
+from logic.reset_coordinator import reset_coordinator
 from utils.storage import storage
+from utils.logger import instrumentation
+
+if TYPE_CHECKING:
+    # 仅用于类型标注：device_node 会导入 bleak，启动时不必加载
+    from core.device_node import DeviceNode
 
 
 class Referee(QObject):
@@ -15,8 +20,8 @@ class Referee(QObject):
         self.name = name
         self.mode = mode
 
-        self.primary_device: DeviceNode = None
-        self.secondary_device: DeviceNode = None
+        self.primary_device: "DeviceNode" = None
+        self.secondary_device: "DeviceNode" = None
 
         # 最终显示的数值
         self.last_total = 0
@@ -31,6 +36,13 @@ class Referee(QObject):
 
         # 上下文：当前选手
         self.current_contestant = ""
+        # 原始日志写入的项目 (多赛场时由各自的 MatchManager 指定)
+        self.storage = storage
+        # 共享内存分数表 (utils.score_table)，未启用时为 None
+        self.score_table = None
+
+        # 最近一次点击的校正时刻 (主机时间，秒)；本地归零等非点击更新时为 None
+        self.last_click_time = None
 
     def set_devices(self, primary, secondary=None):
         self.primary_device = primary
@@ -40,39 +52,53 @@ class Referee(QObject):
             self.secondary_device = secondary
             self.secondary_device.data_received.connect(self._on_secondary_data, Qt.ConnectionType.QueuedConnection)
 
+    def release_devices(self):
+        """断开与设备节点的信号连接，节点本身归还给 ble_manager 复用"""
+        for dev, slot in ((self.primary_device, self._on_primary_data),
+                          (self.secondary_device, self._on_secondary_data)):
+            if dev:
+                try:
+                    dev.data_received.disconnect(slot)
+                except TypeError:
+                    pass
+        devices = [d for d in (self.primary_device, self.secondary_device) if d]
+        self.primary_device = None
+        self.secondary_device = None
+        return devices
+
     def set_contestant(self, name):
         """更新当前执裁的选手名称，用于日志记录"""
         self.current_contestant = name
 
     def request_reset(self):
-        async def _do_reset():
-            coros = []
-            if self.primary_device:
-                coros.append(self.primary_device.send_reset_command())
-            if self.secondary_device:
-                coros.append(self.secondary_device.send_reset_command())
-            if coros:
-                await asyncio.gather(*coros, return_exceptions=True)
-
-            # 重置本地缓存
-            self.pri_plus = 0;
-            self.pri_minus = 0
-            self.sec_plus = 0;
-            self.sec_minus = 0
-            self._update_score_output()
-
-        asyncio.create_task(_do_reset())
-
-    def _on_primary_data(self, current, evt_type, plus, minus, ts):
+        # 设备确认归零后由 reset_coordinator 回调 apply_local_reset
+        reset_coordinator.reset([self])
+
+    def apply_local_reset(self):
+        # 重置本地缓存
+        self.pri_plus = 0;
+        self.pri_minus = 0
+        self.sec_plus = 0;
+        self.sec_minus = 0
+        self.last_click_time = None
+        self._update_score_output()
+
+    def _on_primary_data(self, current, evt_type, plus, minus, ts, click_time):
         # 记录原始日志 (包含 current_total 供调试)
-        storage.log_data(self.index, "PRIMARY", (current, evt_type, plus, minus, ts), self.current_contestant)
+        self.storage.log_data(self.index, "PRIMARY", (current, evt_type, plus, minus, ts), self.current_contestant,
+                         click_time)
+        instrumentation.count("ble_events")
+        self.last_click_time = click_time
 
         self.pri_plus = plus
         self.pri_minus = minus
         self._update_score_output()
 
-    def _on_secondary_data(self, current, evt_type, plus, minus, ts):
-        storage.log_data(self.index, "SECONDARY", (current, evt_type, plus, minus, ts), self.current_contestant)
+    def _on_secondary_data(self, current, evt_type, plus, minus, ts, click_time):
+        self.storage.log_data(self.index, "SECONDARY", (current, evt_type, plus, minus, ts), self.current_contestant,
+                         click_time)
+        instrumentation.count("ble_events")
+        self.last_click_time = click_time
 
         self.sec_plus = plus
         self.sec_minus = minus
@@ -102,4 +128,6 @@ class Referee(QObject):
 
             self.last_minus = self.pri_minus + self.sec_minus  # 重点扣分
 
+        if self.score_table is not None:
+            self.score_table.update_score(self)
         self.score_updated.emit(self.last_total, self.last_plus, self.last_minus)
\ No newline at end of file
@@ -0,0 +1,102 @@
+# logic/reset_coordinator.py
+import asyncio
+import time
+from dataclasses import dataclass
+from PyQt6.QtCore import QObject, pyqtSignal
+from core.ble_thread import ble_thread
+
+
+@dataclass
+class ResetResult:
+    referee_index: int
+    device_name: str
+    confirmed: bool
+    attempts: int
+    latency_ms: float  # 从发起复位到收到清零确认的往返时间 (含重试)
+    error: str = ""
+
+
+class ResetCoordinator(QObject):
+    """
+    全场复位协调器：
+    1. 一次 gather 并发向所有设备写入 0x01
+    2. 等待每台设备在后续通知中上报清零 (DeviceNode.reset_and_confirm)
+    3. 未确认的设备重试，最终报告每台设备的往返延迟
+    只有设备确认归零后才清零对应裁判的本地缓存，未归零的设备在 ScorePanel 中标红。
+    """
+    # 信号：list[ResetResult]，在 GUI 线程中发出
+    reset_finished = pyqtSignal(object)
+    # 内部信号：(referees, results)，从 BLE 线程排队回到 GUI 线程
+    _results_ready = pyqtSignal(object, object)
+
+    def __init__(self, timeout=1.0, retries=2):
+        super().__init__()
+        self.timeout = timeout
+        self.retries = retries
+        self._results_ready.connect(self._on_results_ready)
+
+    def reset(self, referees):
+        """对给定裁判的全部设备发起复位 (GUI 线程调用，立即返回)"""
+        refs = {ref.index: ref for ref in referees}
+        targets = []
+        for ref in referees:
+            for dev in (ref.primary_device, ref.secondary_device):
+                if dev:
+                    targets.append((ref.index, dev))
+
+        if not targets:
+            # 无设备 (离线调试)：直接清零本地显示
+            for ref in referees:
+                ref.apply_local_reset()
+            return
+
+        def _done(f):
+            # 异常已由 ble_thread 打印
+            if not f.cancelled() and f.exception() is None:
+                self._results_ready.emit(refs, f.result())
+
+        fut = ble_thread.spawn(self._reset_all(targets), name="reset-all")
+        fut.add_done_callback(_done)
+
+    async def _reset_all(self, targets):
+        # 运行在 BLE 线程
+        start = time.perf_counter()
+        return await asyncio.gather(*(self._reset_device(idx, dev, start) for idx, dev in targets))
+
+    async def _reset_device(self, referee_index, device, start):
+        name = device.name
+        attempt = 0
+        while attempt <= self.retries:
+            if not device.is_connected:
+                device.status_changed.emit("Reset Failed: not connected")
+                return ResetResult(referee_index, name, False, attempt, 0.0, "not connected")
+
+            attempt += 1
+            if await device.reset_and_confirm(self.timeout):
+                latency = (time.perf_counter() - start) * 1000
+                device.status_changed.emit(f"Reset OK: {latency:.0f}")
+                return ResetResult(referee_index, name, True, attempt, latency)
+
+            print(f"Reset not confirmed by {name} (attempt {attempt})")
+
+        device.status_changed.emit("Reset Failed: no zero report")
+        return ResetResult(referee_index, name, False, attempt, (time.perf_counter() - start) * 1000,
+                           "no zero report")
+
+    def _on_results_ready(self, refs, results):
+        failed_refs = {r.referee_index for r in results if not r.confirmed}
+        for idx, ref in refs.items():
+            if idx not in failed_refs:
+                ref.apply_local_reset()
+
+        confirmed = [r.latency_ms for r in results if r.confirmed]
+        worst = f"{max(confirmed):.0f} ms" if confirmed else "-"
+        print(f"[Perf] reset {len(confirmed)}/{len(results)} devices confirmed, worst round trip {worst}")
+        for r in results:
+            if not r.confirmed:
+                print(f"  Referee {r.referee_index} device {r.device_name} NOT at zero: {r.error}")
+        self.reset_finished.emit(results)
+
+
+# 全局单例
+reset_coordinator = ResetCoordinator()
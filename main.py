@@ -1,25 +1,140 @@
 # main.py
+import time
+_T_START = time.perf_counter()  # 启动基准的起点 (尽量早)
+
 import sys
+import argparse
 import asyncio
+import threading
 import faulthandler  # 1. 导入模块
 
-from PyQt6.QtWidgets import QApplication
-from qasync import QEventLoop
-from ui.main_window import MainWindow
+from PyQt6.QtCore import QObject, QEvent, QTimer
+
+# 界面相关模块在 run_gui() 中导入，无界面采集模式 (--headless) 不加载 QtWidgets
+_T_IMPORTED = None
+
+# 启动时不加载、但进入向导/悬浮窗时一定会用到的重模块 (不创建 Qt 对象，可在后台线程导入)
+PRELOAD_MODULES = ("bleak", "pygetwindow")
+# 基准中检查这些模块是否被提前加载
+LAZY_MODULES = ("bleak", "pygetwindow", "ui.setup_wizard", "ui.report_page", "ui.overlay_window",
+                "core.broadcast_server")
+
+
+class FirstFrameProbe(QObject):
+    """记录窗口第一次绘制完成的时刻"""
+
+    def __init__(self, widget, on_frame):
+        super().__init__(widget)
+        self.on_frame = on_frame
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint:
+            obj.removeEventFilter(self)
+            # 绘制事件处理完 (本轮事件循环结束) 才算出帧
+            QTimer.singleShot(0, self.on_frame)
+        return False
+
+
+def preload_in_background():
+    """首帧之后在后台线程预导入重模块，用户进入向导时不再等待"""
+    def _run():
+        for name in PRELOAD_MODULES:
+            try:
+                __import__(name)
+            except Exception:
+                pass
+
+    threading.Thread(target=_run, name="Preload", daemon=True).start()
+
+
+def report_startup(t_window):
+    t_frame = time.perf_counter()
+    loaded = [m for m in LAZY_MODULES if m in sys.modules]
+    print(f"[Perf] startup: imports {(_T_IMPORTED - _T_START) * 1000:.0f} ms, "
+          f"window {(t_window - _T_IMPORTED) * 1000:.0f} ms, "
+          f"first frame {(t_frame - _T_START) * 1000:.0f} ms, "
+          f"lazy modules loaded: {', '.join(loaded) or 'none'}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Electronic Clicker System")
+    parser.add_argument("--headless", action="store_true", help="无界面采集模式：只连接设备并记录事件")
+    parser.add_argument("--project", help="无界面模式下使用的项目 (文件夹名或项目名)")
+    parser.add_argument("--stats-interval", type=float, default=10.0, help="无界面模式统计输出间隔 (秒)")
+    parser.add_argument("--relay-port", type=int, help="无界面模式下启动事件中继，供其他主机的界面接入设备")
+    parser.add_argument("--relay-host", default="127.0.0.1",
+                        help="事件中继监听地址 (默认仅本机)；供其他主机接入时填比赛局域网网卡的地址，中继没有认证")
+    parser.add_argument("--results-server", action="store_true", help="运行成绩汇总服务 (多赛场成绩合并与综合排名)")
+    parser.add_argument("--results-port", type=int, default=8767, help="成绩汇总服务端口")
+    parser.add_argument("--results-dir", default="results_hub", help="成绩汇总服务的数据目录")
+    parser.add_argument("--startup-bench", action="store_true", help="打印导入耗时与首帧时间后退出")
+    # 未识别的参数 (如 Qt 自带的 -platform) 原样交给 QApplication
+    return parser.parse_known_args(argv)
+
 
 def main():
     # 2. 启用错误处理，如果再崩溃，控制台会打印具体是哪行代码导致的
     faulthandler.enable()
 
-    app = QApplication(sys.argv)
+    args, qt_args = parse_args()
+    if args.results_server:
+        from core.results_server import run_results_server
+        return run_results_server(args.results_port, args.results_dir)
+    if args.headless:
+        if not args.project:
+            print("--headless requires --project")
+            return 2
+        from logic.collector import run_headless
+        return run_headless(args.project, args.stats_interval, [sys.argv[0]] + qt_args, args.relay_port,
+                            args.relay_host)
+
+    run_gui(args.startup_bench, [sys.argv[0]] + qt_args)
+    return 0
+
+
+def run_gui(bench=False, qt_argv=None):
+    global _T_IMPORTED
+    from PyQt6.QtWidgets import QApplication
+    from qasync import QEventLoop
+    from ui.main_window import MainWindow
+    from core.ble_thread import ble_thread
+    from utils.csv_writer import csv_writer
+    from utils.result_sync import result_uploader
+    from utils.app_settings import app_settings
+    from utils.logger import instrumentation, LoopLagMonitor
+    _T_IMPORTED = time.perf_counter()
+
+    app = QApplication(qt_argv or sys.argv)
     loop = QEventLoop(app)
     asyncio.set_event_loop(loop)
 
+    # 事件循环延迟采样 (所有赛场共用一个 GUI 循环)，确认框期间的停顿可在 [Perf] 日志中看到
+    loop_monitor = LoopLagMonitor(instrumentation)
+    loop_monitor.start(loop)
+
     window = MainWindow()
+    t_window = time.perf_counter()
+
+    def on_first_frame():
+        report_startup(t_window)
+        if bench:
+            app.quit()
+        else:
+            preload_in_background()
+
+    FirstFrameProbe(window.home_page, on_first_frame)
     window.show()
 
     with loop:
         loop.run_forever()
 
+    # 等待断开连接等收尾任务完成，再停止 BLE 线程
+    ble_thread.shutdown()
+    # 写完共享写入线程中剩余的日志与成绩，以及尚未落盘的配置
+    csv_writer.shutdown()
+    result_uploader.shutdown()
+    app_settings.flush()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,17 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+# 无显示环境下运行 Qt；测试从仓库根目录导入模块
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    # 用 QApplication：部件测试也能共用 (同一进程只能有一个应用对象)
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    yield app
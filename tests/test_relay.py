@@ -0,0 +1,114 @@
+# tests/test_relay.py
+import asyncio
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from core.relay import DEFAULT_RELAY_HOST, RelayClient, RelayServer, RemoteDevice, RemoteDeviceNode
+
+
+class FakeDevice:
+    def __init__(self, address, name):
+        self.address = address
+        self.name = name
+
+
+class FakeNode(QObject):
+    """采集端的本机设备节点：只需要 RelayServer 读取的属性"""
+    data_received = pyqtSignal(int, int, int, int, int, float)
+    status_changed = pyqtSignal(str)
+
+    def __init__(self, address="AA:BB:CC:DD:EE:01", name="Clicker-1"):
+        super().__init__()
+        self.ble_device = FakeDevice(address, name)
+        self.name = name
+        self.is_connected = True
+
+
+def test_server_listens_on_loopback_by_default():
+    assert RelayServer().host == DEFAULT_RELAY_HOST == "127.0.0.1"
+
+
+async def _resume_after_abort(total, abort_at):
+    loop = asyncio.get_running_loop()
+    server = RelayServer(host="127.0.0.1", port=0, flush_interval=0.001)
+    # 不经 add_nodes (会启动 ble_thread)：直接在本循环中登记节点并注入事件
+    node = FakeNode()
+    server.loop = loop
+    server.nodes.append(node)
+    server._status.append((True, "Connected"))
+    await server.start()
+    port = server._server.sockets[0].getsockname()[1]
+
+    client = RelayClient("127.0.0.1", port)
+    client.RECONNECT_DELAYS = (0.01,)
+    remote = RemoteDeviceNode(RemoteDevice("127.0.0.1", port, node.ble_device.address, node.name), client)
+    received, statuses = [], []
+    remote.data_received.connect(lambda current, t, plus, minus, ts, click: received.append(plus))
+    remote.status_changed.connect(statuses.append)
+    await remote.connect()
+    assert remote.is_connected
+
+    try:
+        aborted = False
+        for i in range(1, total + 1):
+            server._on_event(0, (i, 1, i, 0, i, 1000.0 + i))
+            if i % 50 == 0:
+                await asyncio.sleep(0)
+            if i == abort_at:
+                # 强制断开 (RST)：之后产生的事件留在 backlog 中，重连后续传
+                client._writer.transport.abort()
+                aborted = True
+        assert aborted
+
+        deadline = loop.time() + 10
+        while len(received) < total and loop.time() < deadline:
+            await asyncio.sleep(0.01)
+        return received, statuses, client.last_seq
+    finally:
+        client.close()
+        await server.stop()
+
+
+def test_resume_after_forced_abort_delivers_every_event_once(qapp):
+    total = 4999
+    received, statuses, last_seq = asyncio.run(_resume_after_abort(total, abort_at=2000))
+    assert "Relay Lost" in statuses  # 确实断线重连过
+    assert last_seq == total
+    assert received == list(range(1, total + 1))
+
+
+async def _join_running_session(before, after):
+    loop = asyncio.get_running_loop()
+    server = RelayServer(host="127.0.0.1", port=0, flush_interval=0.001)
+    node = FakeNode()
+    server.loop = loop
+    server.nodes.append(node)
+    server._status.append((True, "Connected"))
+    await server.start()
+    port = server._server.sockets[0].getsockname()[1]
+    # 界面端接入之前采集端已产生的事件
+    for i in range(1, before + 1):
+        server._on_event(0, (i, 1, i, 0, i, 1000.0 + i))
+
+    client = RelayClient("127.0.0.1", port)
+    remote = RemoteDeviceNode(RemoteDevice("127.0.0.1", port, node.ble_device.address, node.name), client)
+    received = []
+    remote.data_received.connect(lambda current, t, plus, minus, ts, click: received.append(plus))
+    try:
+        await remote.connect()
+        for i in range(before + 1, before + after + 1):
+            server._on_event(0, (i, 1, i, 0, i, 1000.0 + i))
+        deadline = loop.time() + 5
+        while len(received) < after and loop.time() < deadline:
+            await asyncio.sleep(0.01)
+        return received, client.last_seq
+    finally:
+        client.close()
+        await server.stop()
+
+
+def test_first_connect_to_running_collector_reports_no_gap(qapp, capsys):
+    received, last_seq = asyncio.run(_join_running_session(before=300, after=20))
+    assert received == list(range(301, 321))  # 只接收实时事件
+    assert last_seq == 320
+    assert "missing" not in capsys.readouterr().out
@@ -0,0 +1,95 @@
+# tests/test_results_server.py
+import asyncio
+import csv
+import json
+import os
+
+import pytest
+
+from core.results_server import ResultsServer, ResultsStore
+
+
+def record(rid, contestant="A", score=10, **extra):
+    return dict({"id": rid, "project": "P", "group": "G", "contestant": contestant, "contestant_id": contestant,
+                 "final_score": score, "ref_scores": {}, "timestamp": "2024-01-01 10:00:00"}, **extra)
+
+
+def post(server, payload):
+    async def _post():
+        server._changed = asyncio.Event()
+        return await server._route("POST", "/results", {}, json.dumps(payload).encode('utf-8'))
+    return asyncio.run(_post())
+
+
+@pytest.fixture
+def server():
+    return ResultsServer(ResultsStore())
+
+
+def test_duplicates_are_counted_once(server):
+    assert post(server, {"records": [record("r1"), record("r2", "B", 12)]})[1]["accepted"] == 2
+    status, reply = post(server, {"records": [record("r1")]})
+    assert status == 200 and reply["accepted"] == 0 and reply["duplicates"] == 1
+    ranking = server.store.ranking("P")["G"]
+    assert [(r["rank"], r["contestant"]) for r in ranking] == [(1, "B"), (2, "A")]
+
+
+@pytest.mark.parametrize("payload", [
+    {"records": "r1"},
+    {"records": ["r1"]},
+    {"records": [record("r1", score="12")]},
+    {"records": [record("r1", score=True)]},
+    {"records": [record("")]},
+    {"records": [record("r1", timestamp=None)]},
+    {"records": [record("r1", ref_scores=[])]},
+    [record("r1")],
+])
+def test_malformed_records_are_rejected(server, payload):
+    status, reply = post(server, payload)
+    assert status == 400 and "error" in reply
+    assert not server.store.by_id  # 整批拒绝，不写入任何一条
+
+
+def test_upgrade_rewrites_results_atomically(tmp_path):
+    from utils.storage import ProjectStorage, RESULT_HEADERS
+    store = ProjectStorage(str(tmp_path))
+    path = store.create_project("T", [{"index": 1}])
+    results = os.path.join(path, "results.csv")
+    with open(results, 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f).writerows([["Group", "Contestant", "FinalScore", "Details", "Timestamp"],
+                                 ["G", "A", "3", "", "2024-01-01 10:00:00"]])
+
+    store.set_current_project(os.path.basename(path))
+    with open(results, 'r', encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == RESULT_HEADERS and rows[0]["ResultId"]
+    assert not os.path.exists(results + ".tmp")
+
+
+def test_uploader_discards_only_the_rejected_record(capsys):
+    from core.results_server import validate_record
+    from utils.result_sync import FAILED, REJECTED, SENT, ResultUploader
+
+    store = ResultsStore()
+    uploader = ResultUploader()
+    posts = []
+
+    def fake_post(records):
+        # 与服务端一致：整批检查，有一条格式错误即整批 400
+        posts.append(len(records))
+        if any(validate_record(r) for r in records):
+            uploader._last_error = "bad record"
+            return REJECTED
+        store.add(records)
+        return SENT
+
+    uploader._post = fake_post
+    records = [record(f"r{i}", f"C{i}") for i in range(7)]
+    records[4]["final_score"] = "oops"
+    assert uploader._post_all(records)
+    assert sorted(store.by_id) == ["r0", "r1", "r2", "r3", "r5", "r6"]
+    assert "rejected record r4" in capsys.readouterr().out
+
+    # 网络错误不丢弃：返回 False 由 _run 稍后整批重试
+    uploader._post = lambda records: FAILED
+    assert not uploader._post_all(records)
@@ -0,0 +1,52 @@
+# tests/test_score_panel.py
+import pytest
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from logic.referee import Referee
+from utils.i18n import i18n
+
+
+class FakeNode(QObject):
+    data_received = pyqtSignal(int, int, int, int, int, float)
+    status_changed = pyqtSignal(str)
+
+    def __init__(self, connected):
+        super().__init__()
+        self.is_connected = connected
+
+
+def make_referee(index, connected):
+    ref = Referee(index, f"R{index}")
+    ref.set_devices(primary=FakeNode(connected))
+    return ref
+
+
+@pytest.fixture
+def referees(qapp):
+    return make_referee(1, False), make_referee(2, True)
+
+
+def test_rebound_panel_shows_connected_device(referees):
+    from ui.score_panel import ScorePanel
+    disconnected, connected = referees
+    panel = ScorePanel(disconnected)
+    panel.update_status_primary("Disconnected")
+    assert panel.lbl_status_pri.property("statusLevel") == "error"
+
+    # 复用面板换绑到设备已连接的裁判 (看板中途重新布局)，不会再收到 Connected 状态
+    panel.bind(connected)
+    assert panel.lbl_status_pri.text() == f"{i18n.tr('device_primary')}: {i18n.tr('status_connected')}"
+    assert panel.lbl_status_pri.property("statusLevel") == "ok"
+
+    panel.bind(disconnected)
+    assert panel.lbl_status_pri.property("statusLevel") == "pending"
+    panel.unbind()
+
+
+def test_compact_board_seeds_connected_devices(referees):
+    from ui.compact_dashboard import CompactScoreBoard
+    board = CompactScoreBoard()
+    board.set_referees(list(referees))
+    assert [cell.raw_status for cell in board.cells] == [[None], ["Connected"]]
+    assert [cell.level for cell in board.cells] == ["pending", "ok"]
+    board.set_referees([])
@@ -0,0 +1,64 @@
+# tests/test_score_table.py
+import struct
+import subprocess
+import sys
+import uuid
+from multiprocessing import resource_tracker, shared_memory
+
+import pytest
+
+from utils.score_table import HEADER, TABLE_SIZE, SharedScoreTable
+
+
+@pytest.fixture
+def name():
+    return f"clicker_test_{uuid.uuid4().hex[:8]}"
+
+
+def _exists(name):
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return False
+    shm.close()
+    if sys.platform != "win32":
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return True
+
+
+def test_live_block_is_not_taken_over(qapp, name):
+    first = SharedScoreTable(name)
+    first.set_contestant("Alice")
+    seq = first._seq
+    second = SharedScoreTable(name)
+    try:
+        assert first.name == name
+        assert second.name == f"{name}-2"
+        # 第一个写入方的块未被清零，序号也没有被第二个写入方改动
+        assert struct.unpack_from("<Q", first.buf, 8)[0] == seq
+        assert bytes(first.buf[32:37]) == b"Alice"
+    finally:
+        second.close()
+    assert _exists(name)  # 关闭第二个实例不会删除第一个实例的块
+    first.close()
+    assert not _exists(name)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Windows 上没有写入方的块会被系统释放")
+def test_stale_block_is_replaced(qapp, name):
+    # 模拟异常退出：块由一个已结束的进程写入，未删除
+    dead = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+    pid = int(dead.stdout)
+    shm = shared_memory.SharedMemory(name=name, create=True, size=TABLE_SIZE)
+    HEADER.pack_into(shm.buf, 0, b"CSCR", 1, 32, 8, 0, 0.0, b"Old", pid)
+    shm.close()
+    resource_tracker.unregister(shm._name, "shared_memory")
+
+    table = SharedScoreTable(name)
+    try:
+        assert table.name == name
+        assert struct.unpack_from("<I", table.buf, 96)[0] != pid
+        assert bytes(table.buf[32:35]) == b"\0\0\0"
+    finally:
+        table.close()
+    assert not _exists(name)
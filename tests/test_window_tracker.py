@@ -0,0 +1,87 @@
+# tests/test_window_tracker.py
+import pytest
+from ui.window_tracker import WindowProvider, WindowTracker
+
+
+class FakeWindowProvider(WindowProvider):
+    """测试用提供者：几何信息由外部直接设置"""
+
+    def __init__(self, x=0, y=0, w=800, h=600):
+        self.rect = (x, y, w, h)
+        self.closed = False
+        self.read_count = 0
+
+    def move_to(self, x, y, w=None, h=None):
+        _, _, old_w, old_h = self.rect
+        self.rect = (x, y, old_w if w is None else w, old_h if h is None else h)
+
+    def geometry(self):
+        self.read_count += 1
+        if self.closed:
+            raise RuntimeError("Window closed")
+        return self.rect
+
+
+@pytest.fixture
+def tracker(qapp):
+    provider = FakeWindowProvider(10, 20)
+    tracker = WindowTracker(provider, fast_interval=16, slow_interval=500)
+    emitted = []
+    tracker.geometry_changed.connect(lambda *geo: emitted.append(geo))
+    yield tracker, provider, emitted
+    tracker.stop()
+
+
+def test_provider_interface_is_abstract():
+    with pytest.raises(TypeError):
+        WindowProvider()
+
+
+def test_idle_target_backs_off_to_slow_interval(tracker):
+    tracker, provider, emitted = tracker
+    tracker.poll()
+    assert emitted == [(10, 20, 800, 600)]
+    assert tracker.interval == 16
+
+    intervals = []
+    for _ in range(8):
+        tracker.poll()
+        intervals.append(tracker.interval)
+    # 静止时间隔逐步翻倍，封顶 slow_interval，且不重复发射信号
+    assert intervals == [32, 64, 128, 256, 500, 500, 500, 500]
+    assert len(emitted) == 1
+
+
+def test_movement_restores_fast_polling(tracker):
+    tracker, provider, emitted = tracker
+    for _ in range(6):
+        tracker.poll()
+    assert tracker.interval == 500
+
+    provider.move_to(100, 200)
+    tracker.poll()
+    assert tracker.interval == 16
+    assert emitted[-1] == (100, 200, 800, 600)
+
+
+def test_lost_target_stops_polling(tracker):
+    tracker, provider, emitted = tracker
+    lost = []
+    tracker.target_lost.connect(lambda: lost.append(True))
+    tracker.start()
+    provider.closed = True
+    tracker.poll()
+    assert lost == [True]
+    assert not tracker.is_active()
+
+
+def test_timer_drives_polling(tracker, qapp):
+    from PyQt6.QtCore import QEventLoop, QTimer
+    tracker, provider, emitted = tracker
+    tracker.start()
+    loop = QEventLoop()
+    QTimer.singleShot(300, loop.quit)
+    loop.exec()
+    # 16+32+64+128 ms 内约 5 次读取；固定 16 ms 轮询会有约 19 次
+    assert 3 <= provider.read_count <= 8
+    assert emitted == [(10, 20, 800, 600)]
@@ -0,0 +1,240 @@
+# ui/compact_dashboard.py
+import math
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import Qt, QRect, QRectF, QPointF, QSize
+from PyQt6.QtGui import QPainter, QPixmap, QColor, QFont, QStaticText, QPen
+from utils.i18n import i18n
+from ui.score_panel import describe_status
+
+# 裁判数达到该值时 (看板布局为“自动”) 使用紧凑视图
+COMPACT_AUTO_MIN_REFEREES = 7
+
+LEVEL_COLORS = {"ok": QColor("#27ae60"), "pending": QColor("#f39c12"), "error": QColor("#c0392b")}
+
+
+class _CellState:
+    """一个裁判格子的显示状态 (看板的共享状态数组中的一项)"""
+    __slots__ = ("referee", "devices", "title", "total", "plus", "minus", "status", "level", "raw_status")
+
+    def __init__(self, referee):
+        self.referee = referee
+        self.devices = (referee.primary_device, referee.secondary_device)
+        self.title = None  # QStaticText，语言切换时重建
+        self.total = referee.last_total
+        self.plus = referee.last_plus
+        self.minus = referee.last_minus
+        self.raw_status = []  # [主设备状态, 副设备状态]
+        self.status = None  # QStaticText
+        self.level = "pending"
+
+
+class CompactScoreBoard(QWidget):
+    """
+    紧凑计分看板：一个自绘部件画出所有裁判。
+
+    - 不为每个裁判创建 QFrame/QLabel/阴影特效，20+ 裁判时也只有一个部件参与布局与绘制
+    - 卡片背景 (圆角 + 阴影) 按格子尺寸预渲染为像素图，标题/状态文字用 QStaticText 缓存
+    - 分数变化只刷新对应格子的区域
+    """
+
+    CELL_ASPECT = 1.6  # 格子宽高比 (宽/高) 的目标值
+    GAP = 12
+    SHADOW = 4
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cells = []  # [_CellState]，与 referees 顺序一致
+        self._connections = []  # [(signal, connection)]，换绑时逐个断开
+        self._cols = 1
+        self._cell_size = QSize(0, 0)
+        self._card_pixmap = None
+        self._detail_labels = ("", "")
+
+        self.title_font = QFont("Microsoft YaHei", 11, QFont.Weight.Bold)
+        self.score_font = QFont("Arial", 40, QFont.Weight.Bold)
+        self.detail_font = QFont("Microsoft YaHei", 9)
+        self.status_font = QFont("Microsoft YaHei", 8, QFont.Weight.Bold)
+
+        self.setMinimumHeight(200)
+        i18n.language_changed.connect(self.retranslate)
+
+    # --- 绑定 ---
+    def set_referees(self, referees):
+        """换绑一组裁判 (空列表即解绑)，部件本身跨场次复用"""
+        # 设备节点在会话池中复用，必须显式断开上一场的连接
+        for signal, conn in self._connections:
+            try:
+                signal.disconnect(conn)
+            except TypeError:
+                pass
+        self._connections.clear()
+        self.cells = [_CellState(ref) for ref in referees]
+
+        for i, cell in enumerate(self.cells):
+            signal = cell.referee.score_updated
+            conn = signal.connect(lambda t, p, m, i=i: self.update_score(i, t, p, m),
+                                  Qt.ConnectionType.QueuedConnection)
+            self._connections.append((signal, conn))
+            for dev in cell.devices:
+                if not dev: continue
+                role = len(cell.raw_status)
+                # 已连接的设备 (会话池复用、看板中途换布局) 不会再上报一次 Connected
+                cell.raw_status.append("Connected" if dev.is_connected else None)
+                conn = dev.status_changed.connect(lambda s, i=i, r=role: self.update_status(i, r, s),
+                                                  Qt.ConnectionType.QueuedConnection)
+                self._connections.append((dev.status_changed, conn))
+        self.retranslate()
+        self._relayout()
+
+    # --- 状态更新 ---
+    def update_score(self, i, total, plus, minus):
+        if i >= len(self.cells): return
+        cell = self.cells[i]
+        if (cell.total, cell.plus, cell.minus) == (total, plus, minus): return
+        cell.total, cell.plus, cell.minus = total, plus, minus
+        self.update(self.cell_rect(i))
+
+    def update_status(self, i, role, status):
+        if i >= len(self.cells): return
+        cell = self.cells[i]
+        cell.raw_status[role] = status
+        self._render_status(cell)
+        self.update(self.cell_rect(i))
+
+    def _render_status(self, cell):
+        # 多个设备时显示最差的状态
+        parts, worst = [], "ok"
+        rank = {"ok": 0, "pending": 1, "error": 2}
+        for status in cell.raw_status:
+            if status is None:
+                text, level = i18n.tr("status_waiting"), "pending"
+            else:
+                text, level = describe_status(status)
+            parts.append(text)
+            if rank[level] > rank[worst]: worst = level
+        if not parts:
+            parts, worst = [i18n.tr("status_waiting")], "pending"
+        cell.status = self._static(" / ".join(parts), self.status_font)
+        cell.level = worst
+
+    def retranslate(self):
+        mode = {"SINGLE": i18n.tr("mode_single"), "DUAL": i18n.tr("mode_dual")}
+        for cell in self.cells:
+            ref = cell.referee
+            cell.title = self._static(f"{ref.name} ({mode.get(ref.mode, ref.mode)})", self.title_font)
+            self._render_status(cell)
+        self._detail_labels = (i18n.tr("score_plus"), i18n.tr("score_minus"))
+        self.update()
+
+    @staticmethod
+    def _static(text, font):
+        static = QStaticText(text)
+        static.setTextFormat(Qt.TextFormat.PlainText)
+        static.prepare(font=font)
+        return static
+
+    # --- 布局 ---
+    def _relayout(self):
+        n = len(self.cells)
+        w, h = max(self.width(), 1), max(self.height(), 1)
+        if n == 0:
+            self._cols = 1
+            self._cell_size = QSize(0, 0)
+            return
+        # 列数：使格子宽高比最接近 CELL_ASPECT
+        cols = max(1, min(n, round(math.sqrt(n * w / (h * self.CELL_ASPECT)))))
+        rows = math.ceil(n / cols)
+        cell_w = (w - self.GAP * (cols + 1)) // cols
+        cell_h = (h - self.GAP * (rows + 1)) // rows
+        self._cols = cols
+        size = QSize(max(cell_w, 40), max(cell_h, 40))
+        if size != self._cell_size:
+            self._cell_size = size
+            self._card_pixmap = None  # 尺寸变化后重新生成卡片背景
+        self.update()
+
+    def resizeEvent(self, event):
+        self._relayout()
+        super().resizeEvent(event)
+
+    def cell_rect(self, i):
+        row, col = divmod(i, self._cols)
+        cw, ch = self._cell_size.width(), self._cell_size.height()
+        return QRect(self.GAP + col * (cw + self.GAP), self.GAP + row * (ch + self.GAP), cw, ch)
+
+    def reset_rect(self, i):
+        rect = self.cell_rect(i)
+        return QRect(rect.right() - 64, rect.top() + 8, 56, 22)
+
+    # --- 绘制 ---
+    def _card(self):
+        """圆角卡片 + 阴影，按格子尺寸只渲染一次"""
+        if self._card_pixmap is None:
+            dpr = self.devicePixelRatioF()
+            size = self._cell_size
+            pix = QPixmap(int(size.width() * dpr), int(size.height() * dpr))
+            pix.setDevicePixelRatio(dpr)
+            pix.fill(Qt.GlobalColor.transparent)
+            p = QPainter(pix)
+            p.setRenderHint(QPainter.RenderHint.Antialiasing)
+            p.setPen(Qt.PenStyle.NoPen)
+            s = self.SHADOW
+            body = QRectF(0, 0, size.width() - s, size.height() - s)
+            for k in range(s, 0, -1):
+                p.setBrush(QColor(0, 0, 0, 10))
+                p.drawRoundedRect(body.translated(k, k), 10, 10)
+            p.setBrush(QColor("#F7F9FC"))
+            p.setPen(QPen(QColor("#E4E7ED"), 1))
+            p.drawRoundedRect(body, 10, 10)
+            p.end()
+            self._card_pixmap = pix
+        return self._card_pixmap
+
+    def paintEvent(self, event):
+        if not self.cells: return
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+        card = self._card()
+        dirty = event.rect()
+        p_str, m_str = self._detail_labels
+
+        for i, cell in enumerate(self.cells):
+            rect = self.cell_rect(i)
+            if not rect.intersects(dirty): continue
+            painter.drawPixmap(rect.topLeft(), card)
+
+            inner = rect.adjusted(12, 8, -12 - self.SHADOW, -8 - self.SHADOW)
+            painter.setPen(QColor("#2c3e50"))
+            painter.drawStaticText(QPointF(inner.left(), inner.top()), cell.title)
+
+            # 归零按钮
+            btn = self.reset_rect(i)
+            painter.setPen(QColor("#e74c3c"))
+            painter.drawRoundedRect(QRectF(btn), 11, 11)
+            painter.setFont(self.status_font)
+            painter.drawText(btn, Qt.AlignmentFlag.AlignCenter, "RESET")
+
+            painter.setPen(QColor("#2c3e50"))
+            painter.setFont(self.score_font)
+            painter.drawText(inner, Qt.AlignmentFlag.AlignCenter, str(cell.total))
+
+            status_h = int(cell.status.size().height()) if cell.status else 0
+            painter.setPen(QColor("#7f8c8d"))
+            painter.setFont(self.detail_font)
+            detail_rect = QRect(inner.left(), inner.bottom() - status_h - 20, inner.width(), 18)
+            painter.drawText(detail_rect, Qt.AlignmentFlag.AlignCenter,
+                             f"{p_str}: {cell.plus} | {m_str}: {cell.minus}")
+
+            if cell.status:
+                painter.setPen(LEVEL_COLORS[cell.level])
+                x = inner.left() + (inner.width() - cell.status.size().width()) / 2
+                painter.drawStaticText(QPointF(x, inner.bottom() - status_h), cell.status)
+        painter.end()
+
+    def mousePressEvent(self, event):
+        pos = event.position().toPoint()
+        for i, cell in enumerate(self.cells):
+            if self.reset_rect(i).contains(pos):
+                cell.referee.request_reset()
+                return
+        super().mousePressEvent(event)
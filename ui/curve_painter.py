@@ -0,0 +1,73 @@
+# ui/curve_painter.py
+from PyQt6.QtCore import Qt, QPoint
+from PyQt6.QtGui import QColor, QPen, QBrush, QPainterPath, QFont
+
+# 裁判曲线配色，按裁判序号固定
+CURVE_COLORS = ["#e74c3c", "#3498db", "#2ecc71", "#f1c40f", "#9b59b6", "#e67e22"]
+
+
+def curve_color(ref_index):
+    return QColor(CURVE_COLORS[(ref_index - 1) % len(CURVE_COLORS)])
+
+
+def paint_score_curve(painter, rect, series, colors=None):
+    """
+    在 rect 内绘制得分曲线 (悬浮窗实时曲线与离线渲染共用)。
+    series: [(ref_index, times, values), ...]，每条 times 单调递增且非空
+    colors: { ref_index: QColor }，缺省按 curve_color 取色
+    """
+    if not series: return
+
+    w, h = rect.width(), rect.height()
+    x0, y0 = rect.x(), rect.y()
+
+    # 缓冲区内时间单调递增，最大时间即末尾点；起点取各序列首点 (旧点可能已被覆盖)
+    min_time = min(times[0] for _, times, _ in series)
+    max_time = max(max(times[-1] for _, times, _ in series) - min_time, 5.0)
+    min_score = min(min(values) for _, _, values in series)
+    max_score = max(max(values) for _, _, values in series)
+
+    if min_score == max_score:
+        min_score -= 5
+        max_score += 5
+    else:
+        span = max_score - min_score
+        min_score -= span * 0.1
+        max_score += span * 0.1
+
+    def map_x(t):
+        return x0 + ((t - min_time) / max_time) * w
+
+    def map_y(s):
+        ratio = (s - min_score) / (max_score - min_score)
+        return (y0 + h) - (ratio * h)
+
+    if min_score <= 0 <= max_score:
+        zero_y = map_y(0)
+        painter.setPen(QPen(QColor(255, 255, 255, 150), 1, Qt.PenStyle.DashLine))
+        painter.drawLine(int(x0), int(zero_y), int(x0 + w), int(zero_y))
+
+    for ref_index, times, values in series:
+        color = colors.get(ref_index, curve_color(ref_index)) if colors else curve_color(ref_index)
+        pen = QPen(color, 2)
+        pen.setJoinStyle(Qt.PenJoinStyle.RoundJoin)
+        painter.setPen(pen)
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+
+        path = QPainterPath()
+        path.moveTo(map_x(times[0]), map_y(values[0]))
+
+        for i in range(1, len(times)):
+            path.lineTo(map_x(times[i]), map_y(values[i]))
+
+        painter.drawPath(path)
+
+        cx, cy = map_x(times[-1]), map_y(values[-1])
+
+        painter.setBrush(QBrush(color))
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.drawEllipse(QPoint(int(cx), int(cy)), 4, 4)
+
+        painter.setPen(QColor("white"))
+        painter.setFont(QFont("Arial", 10, QFont.Weight.Bold))
+        painter.drawText(int(cx) + 8, int(cy) + 5, str(int(values[-1])))
@@ -1,5 +1,7 @@
 # ui/main_window.py
 import asyncio
+import sys
+from collections import deque
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QGridLayout, QStackedWidget,
                              QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QMessageBox,
                              QDialog, QComboBox, QCheckBox, QFrame)
@@ -7,35 +9,42 @@ from PyQt6.QtGui import QAction, QActionGroup, QFont, QKeySequence, QShortcut
 from PyQt6.QtCore import Qt, QTimer
 from utils.i18n import i18n
 from utils.app_settings import app_settings
-from ui.preferences_dialog import PreferencesDialog
 from ui.home_page import HomePage
-from ui.setup_wizard import SetupWizard
-from ui.score_panel import ScorePanel
-from ui.window_selector import WindowSelectorDialog
-from ui.overlay_window import OverlayWindow
-from ui.report_page import ReportPage
-from utils.storage import storage
+from utils.logger import instrumentation
+from logic.match_manager import MatchManager
+from utils.storage import ProjectStorage
+
+# 启动只加载首页所需模块；向导 (bleak)、报告、悬浮窗 (pygetwindow)、直播服务等
+# 在第一次用到时才导入并构建，见 wizard_page / report_page 属性及各入口函数内的 import
 
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    """
+    一个赛场 (court) 一个窗口：各自的组别、裁判、设备、项目存储与悬浮窗。
+    同一进程中的多个赛场共享 BLE 线程/会话池 (ble_manager) 与 CSV 写入线程 (csv_writer)。
+    """
+    courts = []  # 当前打开的所有赛场窗口
+
+    def __init__(self, court_no=None):
         super().__init__()
+        self.court_no = court_no or self.next_court_no()
+        MainWindow.courts.append(self)
         self.resize(1100, 800)
         self.setStyleSheet("QMainWindow { background-color: #2b2b2b; }")
 
-        # 1. 数据初始化
-        self.referees = []
-        self.project_name = ""
+        # 1. 数据初始化：比赛流程在 MatchManager 中，窗口只负责显示与确认
+        # 每个赛场独立的项目存储 (当前项目路径互不影响)
+        self.match = MatchManager(store=ProjectStorage())
+        self.match.contestant_changed.connect(self.on_contestant_changed)
+        self.match.contestant_added.connect(lambda name: self.combo_players.addItem(name))
+
         self.overlay = None
         self.selector_dialog = None
         self.prefs_dialog = None
-
-        self.tournament_data = {}
-        self.active_group_name = None
-        self.contestants = []
-        self.current_idx = -1
-        self.is_free_mode = False
-        self.scored_contestants = set()
+        self.broadcast_server = None
+        self.score_table = None  # 共享内存分数表 (偏好设置中启用)
+        self.active_prompt = None  # 当前打开的非模态确认框
+        self.pending_prompts = deque()  # 等待显示的确认框 [(name, msg_box, on_finished)]
 
         # 全局快捷键
         saved_shortcut = app_settings.get("reset_shortcut")
@@ -57,20 +66,63 @@ class MainWindow(QMainWindow):
         self.home_page.view_report_requested.connect(self.show_report_page)
         self.stack.addWidget(self.home_page)
 
-        self.wizard_page = SetupWizard()
-        self.wizard_page.setup_finished.connect(self.on_setup_finished)
-        self.wizard_page.back_to_home_requested.connect(self.go_to_home)
-        self.stack.addWidget(self.wizard_page)
+        # 向导与报告页先放占位部件，第一次显示时再构建
+        self._wizard_page = None
+        self.stack.addWidget(QWidget())
 
         self.dashboard_page = QWidget()
         self.stack.addWidget(self.dashboard_page)
 
-        self.report_page = ReportPage()
-        self.report_page.back_requested.connect(self.go_to_home)
-        self.stack.addWidget(self.report_page)
+        self._report_page = None
+        self.stack.addWidget(QWidget())
 
         self.stack.setCurrentIndex(0)
         self.update_texts()
+        self.apply_score_table_settings()
+
+    # --- 按需构建的页面 ---
+    @property
+    def wizard_page(self):
+        if self._wizard_page is None:
+            from ui.setup_wizard import SetupWizard
+            page = SetupWizard()
+            page.setup_finished.connect(self.on_setup_finished)
+            page.back_to_home_requested.connect(self.go_to_home)
+            self._replace_page(1, page)
+            self._wizard_page = page
+        return self._wizard_page
+
+    @property
+    def report_page(self):
+        if self._report_page is None:
+            from ui.report_page import ReportPage
+            page = ReportPage()
+            page.back_requested.connect(self.go_to_home)
+            self._replace_page(3, page)
+            self._report_page = page
+        return self._report_page
+
+    def _replace_page(self, index, page):
+        placeholder = self.stack.widget(index)
+        current = self.stack.currentIndex()
+        self.stack.removeWidget(placeholder)
+        self.stack.insertWidget(index, page)
+        self.stack.setCurrentIndex(current)
+        placeholder.deleteLater()
+
+    @staticmethod
+    def next_court_no():
+        used = {w.court_no for w in MainWindow.courts}
+        n = 1
+        while n in used: n += 1
+        return n
+
+    def open_new_court(self):
+        """在同一进程中再开一个赛场窗口"""
+        window = MainWindow()
+        window.show()
+        for court in MainWindow.courts:
+            court.update_texts()
 
     def init_menu(self):
         self.menu_bar = self.menuBar()
@@ -95,29 +147,39 @@ class MainWindow(QMainWindow):
         self.act_preferences.triggered.connect(self.open_preferences_dialog)
         self.menu_settings.addAction(self.act_preferences)
         self.menu_project = self.menu_bar.addMenu("Project")
+        self.act_new_court = QAction("New Court Window", self)
+        self.act_new_court.setShortcut(QKeySequence("Ctrl+Shift+N"))
+        self.act_new_court.triggered.connect(self.open_new_court)
+        self.menu_project.addAction(self.act_new_court)
         self.menu_help = self.menu_bar.addMenu("Help")
 
     def update_texts(self):
         idx = self.stack.currentIndex()
-        if idx == 2 and self.project_name:
-            self.setWindowTitle(f"{i18n.tr('app_title')} - {self.project_name}")
+        app_title = i18n.tr('app_title')
+        # 只有一个赛场时标题保持原样
+        if len(MainWindow.courts) > 1 or self.court_no > 1:
+            app_title = f"{app_title} [{i18n.tr('court_title', self.court_no)}]"
+        if idx == 2 and self.match.project_name:
+            self.setWindowTitle(f"{app_title} - {self.match.project_name}")
         elif idx == 3:
-            self.setWindowTitle(f"{i18n.tr('app_title')} - {i18n.tr('report_title')}")
+            self.setWindowTitle(f"{app_title} - {i18n.tr('report_title')}")
         else:
-            self.setWindowTitle(i18n.tr("app_title"))
+            self.setWindowTitle(app_title)
         self.menu_settings.setTitle(i18n.tr("menu_settings"))
         self.menu_lang.setTitle(i18n.tr("menu_language"))
         self.act_preferences.setText(i18n.tr("menu_preferences"))
         self.menu_project.setTitle(i18n.tr("menu_project"))
+        self.act_new_court.setText(i18n.tr("menu_new_court"))
         self.menu_help.setTitle(i18n.tr("menu_help"))
 
         if self.stack.currentIndex() == 2 and hasattr(self, 'lbl_title_dash'):
-            self.lbl_title_dash.setText(f"{i18n.tr('dash_title')} - {self.project_name}")
+            self.lbl_title_dash.setText(f"{i18n.tr('dash_title')} - {self.match.project_name}")
             self.btn_back_dash.setText(i18n.tr("btn_stop_match"))
             self.chk_auto_next.setText(i18n.tr("chk_auto_next"))
             self.update_overlay_btn_style()
 
     def open_preferences_dialog(self):
+        from ui.preferences_dialog import PreferencesDialog
         self.prefs_dialog = PreferencesDialog(self)
         self.prefs_dialog.setWindowModality(Qt.WindowModality.WindowModal)
         self.prefs_dialog.finished.connect(self.on_preferences_closed)
@@ -125,24 +187,32 @@ class MainWindow(QMainWindow):
 
     def on_preferences_closed(self, result):
         if result == QDialog.DialogCode.Accepted:
-            new_shortcut = app_settings.get("reset_shortcut")
-            self.reset_shortcut.setKey(QKeySequence(new_shortcut))
-            if hasattr(self, 'btn_reset_all'):
-                self.btn_reset_all.setText(f"⚠ RESET ALL ({new_shortcut})")
+            # 偏好设置全局生效，同步到所有赛场
+            for court in MainWindow.courts:
+                court.apply_preferences()
         self.prefs_dialog = None
 
+    def apply_preferences(self):
+        new_shortcut = app_settings.get("reset_shortcut")
+        self.reset_shortcut.setKey(QKeySequence(new_shortcut))
+        if hasattr(self, 'btn_reset_all'):
+            self.btn_reset_all.setText(f"⚠ RESET ALL ({new_shortcut})")
+        if self.stack.currentIndex() == 2:
+            self.show_referees()  # 看板布局偏好可能已改变
+        self.apply_broadcast_settings()
+        self.apply_score_table_settings()
+
     def start_new_project(self):
-        storage.current_project_path = None
-        self.scored_contestants.clear()
+        self.match.new_project()
         self.wizard_page.reset()
         self.stack.setCurrentIndex(1)
         self.go_to_wizard_page1()
 
     def open_existing_project(self, folder_name):
-        storage.set_current_project(folder_name)
-        data = storage.load_project_config(folder_name)
+        data = self.match.open_project(folder_name)
         if data:
             self.wizard_page.restore_state(data)
+            self.wizard_page.warm_start()
             self.stack.setCurrentIndex(1)
             self.go_to_wizard_page1()
         else:
@@ -155,7 +225,7 @@ class MainWindow(QMainWindow):
 
     def go_to_home(self):
         self.stack.setCurrentIndex(0)
-        self.project_name = ""
+        self.match.project_name = ""
         if hasattr(self.home_page, "refresh_list"):
             self.home_page.refresh_list()
         self.update_texts()
@@ -166,11 +236,7 @@ class MainWindow(QMainWindow):
 
     def back_from_dashboard(self):
         # 1. 检查是否有未保存的分数
-        current_total = 0
-        for ref in self.referees:
-            current_total += ref.last_total
-
-        if current_total != 0:
+        if self.match.has_unsaved_scores():
             msg_box = QMessageBox(self)
             msg_box.setWindowTitle(i18n.tr("title_unsaved"))
             msg_box.setText(i18n.tr("msg_unsaved"))
@@ -180,17 +246,23 @@ class MainWindow(QMainWindow):
             btn_discard = msg_box.addButton(i18n.tr("btn_discard_exit"), QMessageBox.ButtonRole.DestructiveRole)
             btn_cancel = msg_box.addButton(i18n.tr("btn_stay"), QMessageBox.ButtonRole.RejectRole)
 
-            msg_box.exec()
+            def on_finished(box):
+                clicked = box.clickedButton()
+                if clicked == btn_cancel:
+                    return  # 取消退出
+                elif clicked == btn_save:
+                    self.match.save_current_result()
+                # elif clicked == btn_discard: pass
+                self.leave_dashboard()
+
+            self.show_prompt("unsaved", msg_box, on_finished)
+            return
 
-            clicked = msg_box.clickedButton()
-            if clicked == btn_cancel:
-                return  # 取消退出
-            elif clicked == btn_save:
-                self.save_current_result()
-            # elif clicked == btn_discard: pass
+        self.leave_dashboard()
 
+    def leave_dashboard(self):
         self.close_overlay_if_active()
-        self.disconnect_all_devices()
+        self.release_devices()
 
         self.stack.setCurrentIndex(1)
         self.wizard_page.stack.setCurrentIndex(1)
@@ -198,64 +270,19 @@ class MainWindow(QMainWindow):
         self.wizard_page.start_scan()
 
     def on_setup_finished(self, project_name, referees, tournament_data):
-        self.project_name = project_name
-        self.referees = referees
-        self.tournament_data = tournament_data
-
-        active_group_val = tournament_data.get("active_group")
-
-        if active_group_val:
-            self.is_free_mode = False
-            self.active_group_name = active_group_val
-            if self.active_group_name in tournament_data["groups"]:
-                self.contestants = tournament_data["groups"][self.active_group_name]
-            else:
-                self.contestants = []
-        else:
-            self.is_free_mode = True
-            self.active_group_name = "Free Mode"
-            self.contestants = ["Player 1"]
-
-        self.current_idx = -1
-
-        try:
-            referees_config = []
-            for ref in referees:
-                pri_addr = ref.primary_device.ble_device.address if ref.primary_device else "N/A"
-                sec_addr = "N/A"
-                if ref.secondary_device:
-                    sec_addr = ref.secondary_device.ble_device.address
-                ref_data = {"index": ref.index, "name": ref.name, "mode": ref.mode, "primary_device": pri_addr,
-                            "secondary_device": sec_addr}
-                referees_config.append(ref_data)
-
-            if not storage.current_project_path:
-                storage.create_project(project_name, referees_config, tournament_data)
-                self.scored_contestants.clear()
-            else:
-                storage.update_project_config(project_name, referees_config, tournament_data)
-                self.scored_contestants = storage.get_existing_contestants()
-
-        except Exception as e:
-            print(f"Storage Init Failed: {e}")
-
+        self.match.setup(project_name, referees, tournament_data)
         QTimer.singleShot(10, self.finalize_setup_ui)
 
     def finalize_setup_ui(self):
         self.setup_dashboard()
 
-        initial_idx = 0
-        if not self.is_free_mode and self.contestants:
-            found_unscored = False
-            for i, name in enumerate(self.contestants):
-                if name not in self.scored_contestants:
-                    initial_idx = i
-                    found_unscored = True
-                    break
-
-            if not found_unscored and len(self.contestants) > 0:
-                QMessageBox.warning(self, i18n.tr("title_warning"), i18n.tr("msg_all_contestants_scored"))
+        initial_idx, all_scored = self.match.initial_index()
+        if all_scored:
+            msg_box = QMessageBox(QMessageBox.Icon.Warning, i18n.tr("title_warning"),
+                                  i18n.tr("msg_all_contestants_scored"), parent=self)
+            self.show_prompt("all_contestants_scored", msg_box)
 
+        self.apply_broadcast_settings()
         self.load_contestant(initial_idx, force=True)
         self.update_texts()
         self.stack.setCurrentIndex(2)
@@ -263,9 +290,78 @@ class MainWindow(QMainWindow):
         QTimer.singleShot(500, self.connect_devices)
 
     def setup_dashboard(self):
-        if self.dashboard_page.layout():
-            QWidget().setLayout(self.dashboard_page.layout())
+        """进入看板：界面骨架只构建一次，之后每场只刷新内容并换绑裁判"""
+        if not self.dashboard_page.layout():
+            self.build_dashboard()
+
+        match = self.match
+        self.lbl_title_dash.setText(f"{i18n.tr('dash_title')} - {match.project_name}")
+        display_group_name = i18n.tr('val_free_mode') if match.is_free_mode else match.active_group_name
+        self.lbl_grp_info.setText(f"{i18n.tr('lbl_curr_group')}: {display_group_name}")
+
+        self.combo_players.clear()
+        self.combo_players.addItems(match.contestants)
+
+        has_list = match.is_free_mode or len(match.contestants) > 0
+        self.btn_prev.setEnabled(has_list)
+        self.btn_next.setEnabled(has_list)
+        self.combo_players.setEnabled(has_list)
+        self.chk_auto_next.setEnabled(has_list)
+        self.chk_auto_next.setChecked(match.auto_next)
+        self.btn_reset_all.setText(f"⚠ RESET ALL ({app_settings.get('reset_shortcut')})")
+
+        self.show_referees()
+        for ref in match.referees:
+            ref.score_updated.connect(lambda t, p, m, r=ref: self.publish_score(r, t, p, m))
+
+    def use_compact_dashboard(self, count):
+        mode = app_settings.get("dashboard_mode")
+        if mode == "compact": return True
+        if mode == "panels": return False
+        from ui.compact_dashboard import COMPACT_AUTO_MIN_REFEREES
+        return count >= COMPACT_AUTO_MIN_REFEREES
+
+    def show_referees(self):
+        """按裁判人数与偏好选择卡片或紧凑视图；卡片面板放回池中跨场次复用"""
+        referees = self.match.referees
+        grid_layout = self.referee_grid
+
+        for panel in self.active_panels:
+            panel.unbind()
+            grid_layout.removeWidget(panel)
+            panel.hide()
+        self.panel_pool.extend(self.active_panels)
+        self.active_panels = []
+
+        if self.use_compact_dashboard(len(referees)):
+            if self.score_board is None:
+                from ui.compact_dashboard import CompactScoreBoard
+                self.score_board = CompactScoreBoard()
+                self.dashboard_content.layout().insertWidget(0, self.score_board, 1)
+            self.score_board.set_referees(referees)
+            self.score_board.show()
+            self.referee_grid_widget.hide()
+            return
+
+        if self.score_board is not None:
+            self.score_board.set_referees([])
+            self.score_board.hide()
+        self.referee_grid_widget.show()
 
+        from ui.score_panel import ScorePanel
+        row, col = 0, 0
+        count = len(referees)
+        max_cols = 1 if count == 1 else (2 if count <= 4 else 3)
+        for ref in referees:
+            panel = self.panel_pool.pop() if self.panel_pool else ScorePanel()
+            panel.bind(ref)
+            grid_layout.addWidget(panel, row, col)
+            panel.show()
+            self.active_panels.append(panel)
+            col += 1
+            if col >= max_cols: col = 0; row += 1
+
+    def build_dashboard(self):
         main_layout = QVBoxLayout(self.dashboard_page)
         main_layout.setContentsMargins(0, 0, 0, 0)
         main_layout.setSpacing(0)
@@ -287,7 +383,7 @@ class MainWindow(QMainWindow):
         self.update_overlay_btn_style()
         self.btn_overlay.clicked.connect(self.toggle_overlay)
 
-        self.lbl_title_dash = QLabel(f"{i18n.tr('dash_title')} - {self.project_name}")
+        self.lbl_title_dash = QLabel()
         self.lbl_title_dash.setFont(QFont("Microsoft YaHei", 16, QFont.Weight.Bold))
         self.lbl_title_dash.setStyleSheet("color: #ecf0f1; border: none;")
 
@@ -306,10 +402,9 @@ class MainWindow(QMainWindow):
         ctrl_layout = QHBoxLayout(control_bar)
         ctrl_layout.setContentsMargins(20, 10, 20, 10)
 
-        display_group_name = i18n.tr('val_free_mode') if self.is_free_mode else self.active_group_name
-        lbl_grp_info = QLabel(f"{i18n.tr('lbl_curr_group')}: {display_group_name}")
-        lbl_grp_info.setFont(QFont("Microsoft YaHei", 11, QFont.Weight.Bold))
-        lbl_grp_info.setStyleSheet("color: #bdc3c7; margin-right: 20px; border: none;")
+        self.lbl_grp_info = QLabel()
+        self.lbl_grp_info.setFont(QFont("Microsoft YaHei", 11, QFont.Weight.Bold))
+        self.lbl_grp_info.setStyleSheet("color: #bdc3c7; margin-right: 20px; border: none;")
 
         btn_style = """
             QPushButton { background-color: #2980b9; color: white; border-radius: 4px; padding: 6px 12px; font-weight: bold; }
@@ -324,7 +419,6 @@ class MainWindow(QMainWindow):
         self.combo_players = QComboBox()
         self.combo_players.setMinimumWidth(250)
         self.combo_players.setMinimumHeight(30)
-        self.combo_players.addItems(self.contestants)
         self.combo_players.setStyleSheet("""
             QComboBox { 
                 background-color: #ecf0f1; color: #2c3e50; border-radius: 4px; padding: 5px; font-size: 14px; font-weight: bold; 
@@ -360,29 +454,16 @@ class MainWindow(QMainWindow):
             }
         """)
 
-        if self.is_free_mode:
-            self.btn_prev.setEnabled(True)
-            self.btn_next.setEnabled(True)
-            self.combo_players.setEnabled(True)
-            self.chk_auto_next.setEnabled(True)
-            self.chk_auto_next.setChecked(True)
-        else:
-            has_list = len(self.contestants) > 0
-            self.btn_prev.setEnabled(has_list)
-            self.btn_next.setEnabled(has_list)
-            self.combo_players.setEnabled(has_list)
-            self.chk_auto_next.setEnabled(has_list)
-            self.chk_auto_next.setChecked(has_list)
-
-        shortcut_text = app_settings.get('reset_shortcut')
-        self.btn_reset_all = QPushButton(f"⚠ RESET ALL ({shortcut_text})")
+        self.chk_auto_next.toggled.connect(lambda checked: setattr(self.match, "auto_next", checked))
+
+        self.btn_reset_all = QPushButton()
         self.btn_reset_all.setStyleSheet("""
             QPushButton { background-color: #c0392b; color: white; font-weight: bold; padding: 8px 16px; border-radius: 4px; font-size: 12px;}
             QPushButton:hover { background-color: #e74c3c; }
         """)
         self.btn_reset_all.clicked.connect(self.on_btn_reset_clicked)
 
-        ctrl_layout.addWidget(lbl_grp_info)
+        ctrl_layout.addWidget(self.lbl_grp_info)
         ctrl_layout.addWidget(self.btn_prev)
         ctrl_layout.addWidget(self.combo_players)
         ctrl_layout.addWidget(self.btn_next)
@@ -392,38 +473,33 @@ class MainWindow(QMainWindow):
 
         main_layout.addWidget(control_bar)
 
-        content_widget = QWidget()
-        content_widget.setStyleSheet("background-color: transparent;")
-        grid_layout = QGridLayout(content_widget)
-        grid_layout.setContentsMargins(40, 40, 40, 40)
-        grid_layout.setSpacing(40)
+        # 裁判区：卡片网格与紧凑视图 (按需创建) 二选一
+        self.dashboard_content = QWidget()
+        self.dashboard_content.setStyleSheet("background-color: transparent;")
+        content_layout = QVBoxLayout(self.dashboard_content)
+        content_layout.setContentsMargins(0, 0, 0, 0)
 
-        row, col = 0, 0
-        count = len(self.referees)
-        max_cols = 1 if count == 1 else (2 if count <= 4 else 3)
-        for ref in self.referees:
-            panel = ScorePanel(ref)
-            grid_layout.addWidget(panel, row, col)
-            ref.score_updated.connect(self.on_score_received_for_tracking)
-            col += 1
-            if col >= max_cols: col = 0; row += 1
-        main_layout.addWidget(content_widget)
-        main_layout.addStretch()
+        self.referee_grid_widget = QWidget()
+        self.referee_grid = QGridLayout(self.referee_grid_widget)
+        self.referee_grid.setContentsMargins(40, 40, 40, 40)
+        self.referee_grid.setSpacing(40)
+        content_layout.addWidget(self.referee_grid_widget)
+        content_layout.addStretch()
 
-    def on_score_received_for_tracking(self):
-        if self.contestants and 0 <= self.current_idx < len(self.contestants):
-            current_name = self.contestants[self.current_idx]
-            if current_name not in self.scored_contestants:
-                self.scored_contestants.add(current_name)
+        self.active_panels = []
+        self.panel_pool = []
+        self.score_board = None
+
+        main_layout.addWidget(self.dashboard_content, 1)
 
     def load_contestant(self, idx, force=False):
-        if not self.contestants: return
+        if not self.match.contestants: return
 
-        if 0 <= idx < len(self.contestants):
-            target_name = self.contestants[idx]
+        if 0 <= idx < len(self.match.contestants):
+            target_name = self.match.contestants[idx]
 
             # 覆盖提醒逻辑
-            if not force and idx != self.current_idx and target_name in self.scored_contestants:
+            if not force and self.match.needs_overwrite_confirm(idx):
                 msg_box = QMessageBox(self)
                 msg_box.setWindowTitle(i18n.tr("title_scored"))
                 msg_box.setText(i18n.tr("msg_want_to_overwrite", target_name))
@@ -433,33 +509,35 @@ class MainWindow(QMainWindow):
                 btn_finish = msg_box.addButton(i18n.tr("btn_finish_match"), QMessageBox.ButtonRole.DestructiveRole)
                 btn_stay = msg_box.addButton(i18n.tr("btn_stay"), QMessageBox.ButtonRole.RejectRole)
 
-                msg_box.exec()
+                def on_finished(box):
+                    clicked = box.clickedButton()
 
-                clicked = msg_box.clickedButton()
+                    if clicked == btn_stay:
+                        self.combo_players.blockSignals(True)
+                        restore_idx = self.match.current_idx if self.match.current_idx >= 0 else 0
+                        self.combo_players.setCurrentIndex(restore_idx)
+                        self.combo_players.blockSignals(False)
 
-                if clicked == btn_stay:
-                    self.combo_players.blockSignals(True)
-                    restore_idx = self.current_idx if self.current_idx >= 0 else 0
-                    self.combo_players.setCurrentIndex(restore_idx)
-                    self.combo_players.blockSignals(False)
-                    return
+                    elif clicked == btn_finish:
+                        self.back_from_dashboard()
 
-                elif clicked == btn_finish:
-                    self.back_from_dashboard()
-                    return
+                    else:
+                        self.match.load_contestant(idx)
 
-            self.current_idx = idx
-            self.combo_players.blockSignals(True)
-            self.combo_players.setCurrentIndex(idx)
-            self.combo_players.blockSignals(False)
+                self.show_prompt("overwrite", msg_box, on_finished)
+                return
 
-            for ref in self.referees:
-                ref.set_contestant(target_name)
+            self.match.load_contestant(idx)
 
-            if self.overlay:
-                self.overlay.update_title(target_name)
+    def on_contestant_changed(self, idx, name):
+        self.combo_players.blockSignals(True)
+        self.combo_players.setCurrentIndex(idx)
+        self.combo_players.blockSignals(False)
 
-            self.reset_devices_only()
+        if self.overlay:
+            self.overlay.update_title(name, self.match.prefetch_ids(), self.match.current_id)
+        if self.broadcast_server:
+            self.broadcast_server.set_contestant(name)
 
     # 1. 按钮点击：强制仅归零，不跳转
     def on_btn_reset_clicked(self):
@@ -471,19 +549,16 @@ class MainWindow(QMainWindow):
 
     # 3. 通用复位逻辑执行者
     def perform_reset_logic(self, force_no_jump=False):
-        auto_jump = (not force_no_jump) and self.chk_auto_next.isChecked() and len(self.contestants) > 0
+        auto_jump = (not force_no_jump) and self.match.auto_next and len(self.match.contestants) > 0
 
-        should_confirm = not app_settings.get("suppress_reset_confirm")
-        proceed = True
-
-        if should_confirm:
+        if not app_settings.get("suppress_reset_confirm"):
             msg_box = QMessageBox(self)
             msg_box.setWindowTitle(i18n.tr("title_reset"))
             msg_box.setIcon(QMessageBox.Icon.Question)
 
             text = i18n.tr("msg_reset_confirm")
             if auto_jump:
-                curr_name = self.contestants[self.current_idx] if self.contestants else "Current"
+                curr_name = self.match.current_name or "Current"
                 text += i18n.tr("msg_reset_auto_suffix", curr_name)
 
             msg_box.setText(text)
@@ -493,65 +568,32 @@ class MainWindow(QMainWindow):
             msg_box.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
             msg_box.setDefaultButton(QMessageBox.StandardButton.No)
 
-            ret = msg_box.exec()
-
-            if ret != QMessageBox.StandardButton.Yes:
-                proceed = False
+            def on_finished(box):
+                if chk_dont_ask.isChecked():
+                    app_settings.set("suppress_reset_confirm", True)
+                if box.standardButton(box.clickedButton()) == QMessageBox.StandardButton.Yes:
+                    self.execute_reset(auto_jump)
 
-            if chk_dont_ask.isChecked():
-                app_settings.set("suppress_reset_confirm", True)
-
-        if proceed:
-            if auto_jump:
-                self.save_current_result()
-                self.switch_contestant(1)
-            else:
-                self.reset_devices_only()
-
-    # 4. 智能切换选手逻辑
-    def switch_contestant(self, delta):
-        if not self.contestants: return
-
-        # --- 自由模式 ---
-        if self.is_free_mode:
-            new_idx = self.current_idx + delta
-            if new_idx < 0: return
-            if new_idx >= len(self.contestants):
-                new_name = f"Player {new_idx + 1}"
-                self.contestants.append(new_name)
-                self.combo_players.addItem(new_name)
-                self.load_contestant(new_idx)
-            else:
-                self.load_contestant(new_idx)
-            return
-
-        # --- 赛事模式 ---
-        count = len(self.contestants)
-
-        if delta < 0:
-            new_idx = (self.current_idx + delta) % count
-            self.load_contestant(new_idx)
+            self.show_prompt("reset", msg_box, on_finished)
             return
 
-        next_idx = -1
-        found_unscored = False
+        self.execute_reset(auto_jump)
 
-        for i in range(1, count + 1):
-            check_idx = (self.current_idx + i) % count
-            name = self.contestants[check_idx]
-
-            if check_idx == self.current_idx:
-                break
+    def execute_reset(self, auto_jump):
+        if auto_jump:
+            self.go_to_target(self.match.advance())
+        else:
+            self.match.reset_devices()
 
-            if name not in self.scored_contestants:
-                next_idx = check_idx
-                found_unscored = True
-                break
+    # 4. 智能切换选手逻辑 (目标由 MatchManager 计算)
+    def switch_contestant(self, delta):
+        self.go_to_target(self.match.resolve_switch(delta))
 
-        if found_unscored:
-            self.load_contestant(next_idx)
-        else:
+    def go_to_target(self, idx):
+        if idx is None:
             self.handle_all_scored()
+        elif idx >= 0:
+            self.load_contestant(idx)
 
     def handle_all_scored(self):
         """处理所有选手都已完赛的情况"""
@@ -564,40 +606,53 @@ class MainWindow(QMainWindow):
         btn_finish = msg_box.addButton(i18n.tr("btn_finish_return"), QMessageBox.ButtonRole.AcceptRole)
         btn_review = msg_box.addButton(i18n.tr("btn_review"), QMessageBox.ButtonRole.RejectRole)
 
-        msg_box.exec()
+        def on_finished(box):
+            if box.clickedButton() == btn_finish:
+                # 执行“保存并返回”逻辑：
+                # 1. 关闭资源
+                self.close_overlay_if_active()
+                self.release_devices()
+
+                # 2. 跳转到向导页 (Index 1) 的配置步 (Index 0)
+                self.stack.setCurrentIndex(1)
+                self.wizard_page.stack.setCurrentIndex(0)
+                self.wizard_page.retranslate_ui()  # 刷新标题状态
+            else:
+                # 留在当前页面回顾，跳回第一位
+                self.load_contestant(0, force=True)
 
-        if msg_box.clickedButton() == btn_finish:
-            # 执行“保存并返回”逻辑：
-            # 1. 关闭资源
-            self.close_overlay_if_active()
-            self.disconnect_all_devices()
+        self.show_prompt("all_scored", msg_box, on_finished)
 
-            # 2. 跳转到向导页 (Index 1) 的配置步 (Index 0)
-            self.stack.setCurrentIndex(1)
-            self.wizard_page.stack.setCurrentIndex(0)
-            self.wizard_page.retranslate_ui()  # 刷新标题状态
-        else:
-            # 留在当前页面回顾，跳回第一位
-            self.load_contestant(0, force=True)
+    def show_prompt(self, name, msg_box, on_finished=None):
+        """
+        非阻塞确认框：open() 立即返回，不像 exec() 那样嵌套事件循环，
+        qasync 循环、裁判信号与 CSV 记录在确认期间照常运行。
+        用户选择后回调 on_finished(msg_box)；打开时长与期间处理的事件数记入 instrumentation。
+        已有确认框时排队，当前确认框关闭后依次显示，每个调用方的回调都会执行。
+        """
+        if self.active_prompt is not None:
+            self.pending_prompts.append((name, msg_box, on_finished))
+            self.active_prompt.raise_()
+            self.active_prompt.activateWindow()
+            return
 
-    def jump_to_contestant(self, idx):
-        self.load_contestant(idx)
+        self.active_prompt = msg_box
+        token = instrumentation.prompt_opened(name)
 
-    def save_current_result(self):
-        total_score = 0
-        details = []
-        for ref in self.referees:
-            score = ref.last_total
-            total_score += score
-            details.append(f"{ref.name}={score}:{ref.last_plus}:{ref.last_minus}")
+        def _finished(_result):
+            self.active_prompt = None
+            instrumentation.prompt_closed(token)
+            msg_box.deleteLater()
+            if on_finished:
+                on_finished(msg_box)
+            if self.active_prompt is None and self.pending_prompts:
+                self.show_prompt(*self.pending_prompts.popleft())
 
-        contestant = self.contestants[self.current_idx]
-        details_str = " | ".join(details)
-        storage.save_result(self.active_group_name, contestant, total_score, details_str)
+        msg_box.finished.connect(_finished)
+        msg_box.open()
 
-    def reset_devices_only(self):
-        for ref in self.referees:
-            ref.request_reset()
+    def jump_to_contestant(self, idx):
+        self.load_contestant(idx)
 
     # --- Overlay / Window Selection ---
     def update_overlay_btn_style(self):
@@ -618,14 +673,16 @@ class MainWindow(QMainWindow):
 
     def start_overlay_flow(self):
         if not self.selector_dialog:
+            from ui.window_selector import WindowSelectorDialog
             self.selector_dialog = WindowSelectorDialog(self)
             self.selector_dialog.window_selected.connect(self.enter_overlay_mode)
         self.selector_dialog.show()
 
     def enter_overlay_mode(self, target_window):
-        self.overlay = OverlayWindow(target_window, self.referees)
-        if self.contestants and 0 <= self.current_idx < len(self.contestants):
-            self.overlay.update_title(self.contestants[self.current_idx])
+        from ui.overlay_window import OverlayWindow
+        self.overlay = OverlayWindow(target_window, self.match.referees, self.match.storage)
+        if self.match.current_name is not None:
+            self.overlay.update_title(self.match.current_name, self.match.prefetch_ids(), self.match.current_id)
         self.overlay.closed_signal.connect(self.on_overlay_closed_passive)
         self.overlay.show()
         self.update_overlay_btn_style()
@@ -640,14 +697,99 @@ class MainWindow(QMainWindow):
         self.overlay = None
         self.update_overlay_btn_style()
 
+    # --- 本地直播输出 ---
+    def apply_broadcast_settings(self):
+        """根据偏好设置启动/停止/重启本地直播输出服务"""
+        enabled = app_settings.get("broadcast_enabled")
+        # 多赛场时各赛场依次使用相邻端口 (赛场 1 为设置中的端口)
+        port = int(app_settings.get("broadcast_port")) + self.court_no - 1
+        old_server = self.broadcast_server
+
+        if old_server and enabled and old_server.port == port:
+            old_server.set_referees([(r.index, r.name) for r in self.match.referees])
+            return
+
+        new_server = None
+        if enabled:
+            from core.broadcast_server import BroadcastServer
+            new_server = BroadcastServer(port=port)
+            new_server.set_referees([(r.index, r.name) for r in self.match.referees])
+            if self.match.current_name is not None:
+                new_server.set_contestant(self.match.current_name)
+        self.broadcast_server = new_server
+
+        async def _restart():
+            # 先关闭旧服务释放端口，再启动新服务
+            if old_server: await old_server.stop()
+            if new_server: await new_server.start()
+
+        if old_server or new_server:
+            asyncio.create_task(_restart())
+
+    def apply_score_table_settings(self):
+        """根据偏好设置创建/关闭共享内存分数表 (块名按赛场区分)"""
+        enabled = app_settings.get("shared_scores_enabled")
+        if enabled == (self.score_table is not None): return
+        if enabled:
+            from utils.score_table import SharedScoreTable, block_name
+            try:
+                self.score_table = SharedScoreTable(block_name(self.court_no))
+            except OSError as e:
+                print(f"Shared score table unavailable: {e}")
+                return
+            print(f"Shared score table published as '{self.score_table.name}'")
+            self.match.set_score_table(self.score_table)
+        else:
+            self.match.set_score_table(None)
+            self.score_table.close()
+            self.score_table = None
+
+    def publish_score(self, ref, total, plus, minus):
+        if self.broadcast_server:
+            self.broadcast_server.update_referee(ref.index, ref.name, total, plus, minus)
+
+    # --- 设备连接 (在 BLE 线程中执行) ---
     def connect_devices(self):
-        for ref in self.referees:
-            if ref.primary_device: asyncio.create_task(ref.primary_device.connect())
-            if ref.secondary_device: asyncio.create_task(ref.secondary_device.connect())
+        from core.ble_manager import ble_manager
+        # 池中已连接的设备直接复用
+        for ref in self.match.referees:
+            if ref.primary_device: ble_manager.connect(ref.primary_device)
+            if ref.secondary_device: ble_manager.connect(ref.secondary_device)
+
+    def release_devices(self):
+        # 离开看板：设备归还会话池，连接保持以便重新配置后复用
+        if not self.match.referees: return
+        from core.ble_manager import ble_manager
+        for ref in self.match.referees:
+            for node in ref.release_devices():
+                ble_manager.release(node)
 
     def disconnect_all_devices(self):
-        if not self.referees: return
-        print("Disconnecting all devices...")
-        for ref in self.referees:
-            if ref.primary_device: asyncio.create_task(ref.primary_device.disconnect())
-            if ref.secondary_device: asyncio.create_task(ref.secondary_device.disconnect())
\ No newline at end of file
+        self.release_devices()
+        # 从未进入向导时 BLE 模块没有加载，也就没有需要断开的连接
+        ble_module = sys.modules.get("core.ble_manager")
+        if ble_module:
+            ble_module.ble_manager.disconnect_all()
+
+    def closeEvent(self, event):
+        self.close_overlay_if_active()
+        if self in MainWindow.courts:
+            MainWindow.courts.remove(self)
+
+        if self.broadcast_server:
+            asyncio.create_task(self.broadcast_server.stop())
+            self.broadcast_server = None
+
+        if self.score_table:
+            self.match.set_score_table(None)
+            self.score_table.close()
+            self.score_table = None
+
+        if MainWindow.courts:
+            # 其他赛场仍在运行：设备只归还会话池，由空闲超时回收
+            self.release_devices()
+            for court in MainWindow.courts:
+                court.update_texts()
+        else:
+            self.disconnect_all_devices()
+        super().closeEvent(event)
\ No newline at end of file
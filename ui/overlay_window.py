@@ -1,15 +1,19 @@
 # ui/overlay_window.py
 import time
-import csv
 import os
-import datetime
-from PyQt6.QtWidgets import (QWidget, QLabel, QGraphicsDropShadowEffect,
-                             QPushButton, QVBoxLayout)
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QPoint, QRect, QSize
-from PyQt6.QtGui import (QFont, QColor, QPainter, QPen, QPainterPath,
-                         QBrush, QCursor)
+import asyncio
+from collections import OrderedDict
+from PyQt6.QtWidgets import QWidget, QPushButton, QVBoxLayout
+from PyQt6.QtCore import Qt, pyqtSignal, QPoint, QPointF, QRect, QSize
+from PyQt6.QtGui import (QFont, QColor, QPainter, QPen, QCursor,
+                         QFontMetrics, QPixmap, QStaticText, QTransform)
 from utils.i18n import i18n
 from utils.storage import storage
+from utils.app_settings import app_settings
+from utils.ring_buffer import RingBuffer
+from utils.history_loader import history_loader, parse_contestant_history
+from ui.window_tracker import WindowTracker, WindowProvider, PyGetWindowProvider
+from ui.curve_painter import paint_score_curve, curve_color
 
 
 # ============================================================================
@@ -159,130 +163,357 @@ class OverlayWidget(QWidget):
             painter.drawLine(w - 14, h - 6, w - 6, h - 14)
 
 
+# ============================================================================
+# 文字渲染缓存：共享字体 + 预渲染阴影
+# ============================================================================
+_shared_fonts = {}
+
+
+def shared_font(size, weight=QFont.Weight.Bold, family="Microsoft YaHei"):
+    """同一规格的字体全局只创建一次"""
+    key = (family, size, weight)
+    font = _shared_fonts.get(key)
+    if font is None:
+        font = QFont(family, size, weight)
+        _shared_fonts[key] = font
+    return font
+
+
+class ShadowTextCache:
+    """
+    文字 + 阴影的像素图缓存 (LRU)。
+    阴影在生成像素图时一次性绘制，之后 paintEvent 只做位图拷贝，
+    不再依赖 QGraphicsDropShadowEffect 每次重绘整块模糊。
+    """
+    SHADOW_OFFSET = 2
+    SHADOW_SPREAD = 1  # 在偏移点周围叠加绘制，近似 blur 效果
+
+    def __init__(self, max_items=512):
+        self.max_items = max_items
+        self._items = OrderedDict()
+
+    def get(self, text, font, dpr=1.0):
+        key = (text, font.key(), dpr)
+        pix = self._items.get(key)
+        if pix is not None:
+            self._items.move_to_end(key)
+            return pix
+
+        pix = self._render(text, font, dpr)
+        self._items[key] = pix
+        if len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+        return pix
+
+    def _render(self, text, font, dpr):
+        static = QStaticText(text)
+        static.setTextFormat(Qt.TextFormat.PlainText)
+        static.prepare(QTransform(), font)
+        size = static.size()
+
+        pad = self.SHADOW_OFFSET + self.SHADOW_SPREAD
+        w = int(size.width()) + 1 + pad
+        h = int(size.height()) + 1 + pad
+
+        pix = QPixmap(int(w * dpr), int(h * dpr))
+        pix.setDevicePixelRatio(dpr)
+        pix.fill(Qt.GlobalColor.transparent)
+
+        painter = QPainter(pix)
+        painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+        painter.setFont(font)
+
+        painter.setPen(QColor(0, 0, 0, 90))
+        for dx in range(-self.SHADOW_SPREAD, self.SHADOW_SPREAD + 1):
+            for dy in range(-self.SHADOW_SPREAD, self.SHADOW_SPREAD + 1):
+                painter.drawStaticText(QPointF(self.SHADOW_OFFSET + dx, self.SHADOW_OFFSET + dy), static)
+
+        painter.setPen(QColor("white"))
+        painter.drawStaticText(QPointF(0, 0), static)
+        painter.end()
+        return pix
+
+
+def wrap_text(text, fm, width):
+    """按像素宽度折行 (与 QLabel 自动换行一致：优先在空格处断开，中文等无空格文本按字符断开)"""
+    if width <= 0 or fm.horizontalAdvance(text) <= width:
+        return [text]
+    lines, current = [], ""
+    for ch in text:
+        if current and fm.horizontalAdvance(current + ch) > width:
+            cut = current.rfind(" ")
+            if cut > 0:
+                lines.append(current[:cut])
+                current = current[cut + 1:]
+            else:
+                lines.append(current)
+                current = ""
+            if ch == " " and not current: continue
+        current += ch
+    if current: lines.append(current)
+    return lines
+
+
 # ============================================================================
 # 具体组件：裁判分显示标签
 # ============================================================================
 class DraggableLabel(OverlayWidget):
+    """
+    自绘文字标签 (替代 QLabel + QGraphicsDropShadowEffect)：
+    文本分为静态行、末行前缀和末行数值三部分，
+    set_value() 只重绘数值所在的矩形区域。
+    """
+    text_cache = ShadowTextCache()
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.resize(250, 100)
 
-        self.label = QLabel(self)
-        self.label.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
-        self.label.setWordWrap(True)
+        # 不能命名为 font：会遮蔽 QWidget.font()
+        self._text_font = shared_font(16)
+        self._raw_lines = []  # set_parts 传入的静态行 (如裁判名)
+        self.lines = []  # 按标签宽度折行后实际绘制的行
+        self.prefix = ""  # 末行静态前缀 (如 "总分: ")
+        self.value = ""  # 末行动态数值
+        self.line_height = 0
+        self.prefix_width = 0
+        self.value_rect = QRect()
 
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(5)
-        shadow.setColor(QColor(0, 0, 0))
-        shadow.setOffset(2, 2)
-        self.label.setGraphicsEffect(shadow)
+    def set_text(self, text, font):
+        self.set_parts(text.split('\n'), "", "", font)
+
+    def set_parts(self, lines, prefix, value, font):
+        self._text_font = font
+        self._raw_lines = list(lines)
+        self.prefix = prefix
+        self.value = value
+
+        fm = QFontMetrics(font)
+        self.line_height = fm.lineSpacing()
+        self.prefix_width = fm.horizontalAdvance(prefix) if prefix else 0
+        self._relayout_text()
+
+    def _relayout_text(self):
+        """长选手名/裁判名按当前宽度折行 (标签宽度固定，不折行会被截掉)"""
+        m = self.main_layout.contentsMargins()
+        width = self.width() - m.left() - m.right()
+        fm = QFontMetrics(self._text_font)
+        self.lines = [part for line in self._raw_lines for part in wrap_text(line, fm, width)]
+        # 折行后放不下时加高标签 (宽度不变，resizeEvent 中再次折行结果相同，不会循环)
+        rows = len(self.lines) + (1 if self.prefix or self.value else 0)
+        needed = m.top() + rows * self.line_height + m.bottom()
+        if needed > self.height():
+            self.resize(self.width(), needed)
+        self.value_rect = self._calc_value_rect()
+        self.update()
 
-        self.main_layout.addWidget(self.label)
-        self.label.setStyleSheet("color: white; border: none; background: transparent;")
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if getattr(self, "_raw_lines", None):
+            self._relayout_text()
 
-    def set_text(self, text, font):
-        self.label.setFont(font)
-        self.label.setText(text)
+    def set_value(self, value):
+        if value == self.value: return
+        old_rect = self.value_rect
+        self.value = value
+        self.value_rect = self._calc_value_rect()
+        self.update(old_rect.united(self.value_rect))
+
+    def _pixmap(self, text):
+        return self.text_cache.get(text, self._text_font, self.devicePixelRatioF())
+
+    def _text_origin(self):
+        m = self.main_layout.contentsMargins()
+        return m.left(), m.top()
+
+    def _calc_value_rect(self):
+        if not self.value: return QRect()
+        x, y = self._text_origin()
+        size = self._pixmap(self.value).deviceIndependentSize().toSize()
+        return QRect(x + self.prefix_width, y + len(self.lines) * self.line_height, size.width(), size.height())
 
     def paintEvent(self, event):
         super().paintEvent(event)
 
+        painter = QPainter(self)
+        x, y = self._text_origin()
+        for i, line in enumerate(self.lines):
+            if line:
+                painter.drawPixmap(x, y + i * self.line_height, self._pixmap(line))
+
+        last_y = y + len(self.lines) * self.line_height
+        if self.prefix:
+            painter.drawPixmap(x, last_y, self._pixmap(self.prefix))
+        if self.value:
+            painter.drawPixmap(self.value_rect.topLeft(), self._pixmap(self.value))
+
 
 # ============================================================================
 # 具体组件：实时曲线控件 (从第一个非零分记录开始)
 # ============================================================================
 class ScoreCurveWidget(OverlayWidget):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, store=None):
         super().__init__(parent)
+        self.storage = store or storage
         self.resize(600, 250)
 
+        # { ref.index: RingBuffer }，按裁判序号而非 Referee 对象存储，避免持有旧会话的引用
         self.history = {}
         self.ref_colors = {}
         self.start_time = None
+        self.capacity = app_settings.get("curve_history_cap")
+
+        self.contestant_name = None
+        self.load_task = None
 
-        self.color_palette = [
-            QColor("#e74c3c"), QColor("#3498db"), QColor("#2ecc71"),
-            QColor("#f1c40f"), QColor("#9b59b6"), QColor("#e67e22"),
-        ]
+    def _get_buffer(self, ref_index):
+        """获取 (或预分配) 某裁判的环形缓冲区，颜色按裁判序号固定"""
+        buf = self.history.get(ref_index)
+        if buf is None:
+            buf = RingBuffer(self.capacity)
+            self.history[ref_index] = buf
+            self.ref_colors[ref_index] = curve_color(ref_index)
+        return buf
 
     def reset_data(self):
-        self.history.clear()
+        # 仅重置游标，保留已分配的缓冲区供下一位选手复用
+        for buf in self.history.values():
+            buf.clear()
         self.start_time = None
         self.update()
 
-    def load_history(self, contestant_name, referees):
-        self.history.clear()
+    def release(self, keep_indices=None):
+        """
+        显式释放缓冲区。
+        keep_indices 为 None 时全部释放 (会话结束)；否则只保留仍在场的裁判。
+        """
+        if keep_indices is None:
+            self.history.clear()
+            self.ref_colors.clear()
+        else:
+            for idx in [i for i in self.history if i not in keep_indices]:
+                del self.history[idx]
+                self.ref_colors.pop(idx, None)
         self.start_time = None
+        self.update()
 
-        project_path = storage.current_project_path
+    def load_history(self, contestant_name, referees):
+        """
+        切换选手时加载历史曲线。
+        命中缓存时立即显示；否则在后台线程解析 CSV，完成后再刷新。
+        """
+        self.release(keep_indices={ref.index for ref in referees})
+        self.reset_data()
+
+        if self.load_task and not self.load_task.done():
+            self.load_task.cancel()
+        self.load_task = None
+
+        # 离开的选手可能刚产生新数据：失效其缓存并在后台重新解析 (供“上一位”使用)
+        previous_name = self.contestant_name
+        self.contestant_name = contestant_name
+
+        project_path = self.storage.current_project_path
         if not project_path or not os.path.exists(project_path):
             return
 
-        # 1. 读取所有原始数据
-        raw_data_map = {}  # { ref: [(ts, score), ...] }
-        for ref in referees:
-            csv_path = os.path.join(project_path, f"referee_{ref.index}.csv")
-            if not os.path.exists(csv_path):
-                continue
-            pts = []
-            try:
-                with open(csv_path, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        if row.get("Contestant") == contestant_name:
-                            ts_str = row.get("SystemTime")
-                            score_str = row.get("CurrentTotal")
-                            if ts_str and score_str:
-                                try:
-                                    if '.' in ts_str and len(ts_str.split('.')[1]) == 3:
-                                        ts_str += "000"
-                                    dt = datetime.datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S.%f")
-                                    ts = dt.timestamp()
-                                    pts.append((ts, int(score_str)))
-                                except:
-                                    pass
-            except:
-                pass
-            if pts:
-                raw_data_map[ref] = pts
+        ref_indices = [ref.index for ref in referees]
+        if previous_name and previous_name != contestant_name:
+            history_loader.invalidate(previous_name)
+            self.prefetch([previous_name], referees)
 
-        # 2. 寻找全局最早的“非零”时间点作为 0 秒
-        min_non_zero_ts = None
-        for pts in raw_data_map.values():
-            for (ts, score) in pts:
-                if score != 0:
-                    if min_non_zero_ts is None or ts < min_non_zero_ts:
-                        min_non_zero_ts = ts
+        cached = history_loader.get_cached(project_path, ref_indices, contestant_name)
+        if cached is not None:
+            self.apply_history(cached)
+            return
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # 没有运行中的事件循环 (离线调用)，直接同步解析
+            self.apply_history(parse_contestant_history(project_path, ref_indices, contestant_name))
+            return
+
+        self.load_task = asyncio.create_task(self._load_async(project_path, ref_indices, contestant_name))
+
+    async def _load_async(self, project_path, ref_indices, contestant_name):
+        try:
+            result = await history_loader.load(project_path, ref_indices, contestant_name)
+        except asyncio.CancelledError:
+            return
+        # 加载期间已切换选手则丢弃；实时数据已先到达则把历史合并到实时点之前
+        if contestant_name != self.contestant_name:
+            return
+        if self.start_time is not None:
+            self.merge_history(result)
+        else:
+            self.apply_history(result)
+
+    def prefetch(self, contestant_names, referees):
+        """后台预取选手历史，切换时直接命中缓存"""
+        project_path = self.storage.current_project_path
+        if not project_path or not os.path.exists(project_path):
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        ref_indices = [ref.index for ref in referees]
+        for name in contestant_names:
+            if name and name != self.contestant_name:
+                history_loader.prefetch(project_path, ref_indices, name)
+
+    def apply_history(self, result):
+        start_time, curves = result
 
         # 如果所有记录都是0，或者没有记录，则保持等待状态
-        if min_non_zero_ts is None:
+        if start_time is None:
             self.update()
             return
 
-        self.start_time = min_non_zero_ts
+        self.start_time = start_time
 
-        # 3. 填充 history (过滤掉起点之前的 0 分记录)
-        for ref, pts in raw_data_map.items():
-            if ref not in self.ref_colors:
-                idx = len(self.ref_colors)
-                self.ref_colors[ref] = self.color_palette[idx % len(self.color_palette)]
+        # 超出容量时只保留最新的点
+        for ref_index, pts in curves.items():
+            buf = self._get_buffer(ref_index)
+            for (elapsed, score) in pts:
+                buf.append(elapsed, score)
 
-            clean_pts = []
-            for (ts, score) in pts:
-                # 只保留 start_time 之后（或同时）的点
-                if ts < self.start_time:
-                    continue
+        self.update()
 
-                elapsed = ts - self.start_time
-                clean_pts.append((elapsed, score))
+    def merge_history(self, result):
+        """
+        历史加载完成前已有实时点：按绝对时刻把历史排在前面，实时点接在其后。
+        解析前会先落盘 CSV，已写入日志的实时点会同时出现在历史中，按时刻去重。
+        """
+        start_time, curves = result
+        if start_time is None:
+            return
 
-            if clean_pts:
-                self.history[ref] = clean_pts
+        live_start = self.start_time
+        live = {idx: [(live_start + t, v) for t, v in buf] for idx, buf in self.history.items()}
+        origin = min(start_time, live_start)
+        self.start_time = origin
+
+        for ref_index in set(curves) | set(live):
+            buf = self._get_buffer(ref_index)
+            buf.clear()
+            last_ts = None
+            for elapsed, score in curves.get(ref_index, ()):
+                last_ts = start_time + elapsed
+                buf.append(last_ts - origin, score)
+            for ts, score in live.get(ref_index, ()):
+                # 日志时刻精确到毫秒
+                if last_ts is not None and ts <= last_ts + 0.001:
+                    continue
+                last = buf.last()
+                buf.append(max(ts - origin, last[0] if last else 0.0), score)
 
         self.update()
 
     def add_point(self, ref, score):
-        current_ts = time.time()
+        # 优先用校正后的点击时刻，使各裁判曲线按真实点击对齐
+        current_ts = getattr(ref, 'last_click_time', None) or time.time()
 
         # 实时数据：只有当分数不为0时，才初始化起点
         if self.start_time is None:
@@ -292,15 +523,14 @@ class ScoreCurveWidget(OverlayWidget):
                 # 依然是 0 分，且未开始，则忽略（继续等待）
                 return
 
-        if ref not in self.history:
-            self.history[ref] = []
-            idx = len(self.history) - 1
-            self.ref_colors[ref] = self.color_palette[idx % len(self.color_palette)]
-
         elapsed = current_ts - self.start_time
         if elapsed < 0: elapsed = 0
 
-        self.history[ref].append((elapsed, score))
+        buffer = self._get_buffer(ref.index)
+        last = buffer.last()
+        if last and elapsed < last[0]:
+            elapsed = last[0]  # 双机模式两台设备的校正时刻可能交错，保持单调
+        buffer.append(elapsed, score)
         self.update()
 
     def paintEvent(self, event):
@@ -310,7 +540,7 @@ class ScoreCurveWidget(OverlayWidget):
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
 
         # 没有数据或未开始时，显示占位框
-        if not self.history or self.start_time is None:
+        if not any(self.history.values()) or self.start_time is None:
             painter.setBrush(QColor(0, 0, 0, 80))
             painter.setPen(QPen(QColor(255, 255, 255, 100), 1, Qt.PenStyle.DashLine))
             rect = self.rect().adjusted(2, 2, -2, -2)
@@ -324,70 +554,8 @@ class ScoreCurveWidget(OverlayWidget):
         # 正常绘制
         margin = 20
         rect = self.rect().adjusted(margin, margin, -margin, -margin)
-        w, h = rect.width(), rect.height()
-        x0, y0 = rect.x(), rect.y()
-
-        all_times = [pt[0] for pts in self.history.values() for pt in pts]
-        all_scores = [pt[1] for pts in self.history.values() for pt in pts]
-
-        if not all_times: return
-
-        max_time = max(max(all_times), 5.0)
-
-        if not all_scores:
-            min_score, max_score = 0, 10
-        else:
-            min_score, max_score = min(all_scores), max(all_scores)
-
-        if min_score == max_score:
-            min_score -= 5
-            max_score += 5
-        else:
-            span = max_score - min_score
-            min_score -= span * 0.1
-            max_score += span * 0.1
-
-        def map_x(t):
-            return x0 + (t / max_time) * w
-
-        def map_y(s):
-            ratio = (s - min_score) / (max_score - min_score)
-            return (y0 + h) - (ratio * h)
-
-        if min_score <= 0 <= max_score:
-            zero_y = map_y(0)
-            painter.setPen(QPen(QColor(255, 255, 255, 150), 1, Qt.PenStyle.DashLine))
-            painter.drawLine(int(x0), int(zero_y), int(x0 + w), int(zero_y))
-
-        for ref, points in self.history.items():
-            if not points: continue
-
-            color = self.ref_colors.get(ref, Qt.GlobalColor.white)
-            pen = QPen(color, 2)
-            pen.setJoinStyle(Qt.PenJoinStyle.RoundJoin)
-            painter.setPen(pen)
-            painter.setBrush(Qt.BrushStyle.NoBrush)
-
-            path = QPainterPath()
-            start_x = map_x(points[0][0])
-            start_y = map_y(points[0][1])
-            path.moveTo(start_x, start_y)
-
-            for t, s in points[1:]:
-                path.lineTo(map_x(t), map_y(s))
-
-            painter.drawPath(path)
-
-            last_pt = points[-1]
-            cx, cy = map_x(last_pt[0]), map_y(last_pt[1])
-
-            painter.setBrush(QBrush(color))
-            painter.setPen(Qt.PenStyle.NoPen)
-            painter.drawEllipse(QPoint(int(cx), int(cy)), 4, 4)
-
-            painter.setPen(QColor("white"))
-            painter.setFont(QFont("Arial", 10, QFont.Weight.Bold))
-            painter.drawText(int(cx) + 8, int(cy) + 5, str(last_pt[1]))
+        series = [(idx, buf.times(), buf.values()) for idx, buf in self.history.items() if buf]
+        paint_score_curve(painter, rect, series, self.ref_colors)
 
 
 # ============================================================================
@@ -396,22 +564,26 @@ class ScoreCurveWidget(OverlayWidget):
 class OverlayWindow(QWidget):
     closed_signal = pyqtSignal()
 
-    def __init__(self, target_window, referees):
+    def __init__(self, target_window, referees, store=None):
         super().__init__()
         self.target_window = target_window
         self.referees = referees
         self.labels = {}
+        self._score_connections = []
 
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.Tool)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
 
-        self.curve_widget = ScoreCurveWidget(self)
+        self.curve_widget = ScoreCurveWidget(self, store)
         self.curve_widget.move(50, 400)
         self.curve_widget.show()
 
+        self.title_font = shared_font(18)
+        self.label_font = shared_font(16)
+
         self.lbl_title = DraggableLabel(self)
         self.lbl_title.resize(400, 80)
-        self.lbl_title.set_text("Waiting...", QFont("Microsoft YaHei", 18, QFont.Weight.Bold))
+        self.lbl_title.set_text("Waiting...", self.title_font)
         self.lbl_title.move(300, 20)
         self.lbl_title.hide()
 
@@ -429,57 +601,70 @@ class OverlayWindow(QWidget):
             lbl.move(start_x, start_y + index * gap_y)
             lbl.show()
             self.labels[ref] = lbl
+            self.refresh_referee_label(ref)
+
+            conn = ref.score_updated.connect(lambda t, p, m, r=ref: self.update_referee_label(r))
+            self._score_connections.append((ref, conn))
 
-            ref.score_updated.connect(lambda t, p, m, r=ref: self.update_referee_label(r))
+    @staticmethod
+    def score_value_text(ref):
+        total = getattr(ref, 'last_total', 0)
+        plus = getattr(ref, 'last_plus', 0)
+        minus = getattr(ref, 'last_minus', 0)
+        return f"{total}   (+{plus} / -{minus})"
 
-    def update_title(self, name):
-        self.lbl_title.set_text(name, QFont("Microsoft YaHei", 18, QFont.Weight.Bold))
+    def refresh_referee_label(self, ref):
+        """完整刷新标签 (名称、前缀与数值)，仅在切换选手/初始化时调用"""
+        prefix = f"{i18n.tr('score_total')}: "
+        self.labels[ref].set_parts([ref.name], prefix, self.score_value_text(ref), self.label_font)
+
+    def update_title(self, name, prefetch_ids=(), contestant_id=None):
+        """name 用于显示；contestant_id (缺省同 name) 对应日志中的选手，用于加载曲线历史"""
+        self.lbl_title.set_text(name, self.title_font)
         self.lbl_title.show()
 
-        self.curve_widget.load_history(name, self.referees)
+        self.curve_widget.load_history(contestant_id or name, self.referees)
+        if prefetch_ids:
+            self.curve_widget.prefetch(prefetch_ids, self.referees)
 
         # 仅更新文字
         for ref in self.referees:
             if ref in self.labels:
-                total = getattr(ref, 'last_total', 0)
-                plus = getattr(ref, 'last_plus', 0)
-                minus = getattr(ref, 'last_minus', 0)
-                text = f"{ref.name}\n{i18n.tr('score_total')}: {total}   (+{plus} / -{minus})"
-                self.labels[ref].set_text(text, QFont("Microsoft YaHei", 16, QFont.Weight.Bold))
+                self.refresh_referee_label(ref)
 
     def update_referee_label(self, ref):
         if ref not in self.labels: return
 
-        total = getattr(ref, 'last_total', 0)
-        plus = getattr(ref, 'last_plus', 0)
-        minus = getattr(ref, 'last_minus', 0)
-
-        text = f"{ref.name}\n{i18n.tr('score_total')}: {total}   (+{plus} / -{minus})"
+        # 高频路径：只替换数值部分
+        self.labels[ref].set_value(self.score_value_text(ref))
 
-        lbl = self.labels[ref]
-        lbl.set_text(text, QFont("Microsoft YaHei", 16, QFont.Weight.Bold))
-
-        self.curve_widget.add_point(ref, total)
+        self.curve_widget.add_point(ref, getattr(ref, 'last_total', 0))
 
     def setup_tracking(self):
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.sync_position)
-        self.timer.start(50)
-
-    def sync_position(self):
-        if not self.target_window: return
-        try:
-            self.setGeometry(
-                self.target_window.left,
-                self.target_window.top,
-                self.target_window.width,
-                self.target_window.height
-            )
-            if self.isHidden(): self.show()
-        except Exception:
-            self.close()
+        provider = self.target_window
+        if not isinstance(provider, WindowProvider):
+            provider = PyGetWindowProvider(self.target_window)
+        self.tracker = WindowTracker(provider, parent=self)
+        self.tracker.geometry_changed.connect(self.sync_position)
+        self.tracker.target_lost.connect(self.close)
+        self.tracker.start()
+
+    def sync_position(self, x, y, w, h):
+        # 仅在目标窗口几何信息变化时由 WindowTracker 触发
+        self.setGeometry(x, y, w, h)
+        if self.isHidden(): self.show()
 
     def closeEvent(self, event):
-        self.timer.stop()
+        self.tracker.stop()
+        # 断开裁判信号并释放曲线缓冲区，避免关闭后的悬浮窗被 Referee 继续引用
+        for ref, conn in self._score_connections:
+            try:
+                ref.score_updated.disconnect(conn)
+            except TypeError:
+                pass
+        self._score_connections.clear()
+        self.curve_widget.release()
+        if self.curve_widget.load_task:
+            self.curve_widget.load_task.cancel()
         self.closed_signal.emit()
         super().closeEvent(event)
\ No newline at end of file
@@ -1,6 +1,7 @@
 # ui/preferences_dialog.py
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
-                             QLabel, QTabWidget, QWidget, QKeySequenceEdit, QFormLayout)
+                             QLabel, QTabWidget, QWidget, QKeySequenceEdit, QFormLayout,
+                             QCheckBox, QSpinBox, QComboBox, QLineEdit)
 from PyQt6.QtGui import QKeySequence
 from utils.app_settings import app_settings
 from utils.i18n import i18n
@@ -24,6 +25,21 @@ class PreferencesDialog(QDialog):
         self.init_shortcuts_tab()
         self.tabs.addTab(self.tab_shortcuts, i18n.tr("tab_shortcuts"))
 
+        # --- 直播输出页签 ---
+        self.tab_broadcast = QWidget()
+        self.init_broadcast_tab()
+        self.tabs.addTab(self.tab_broadcast, i18n.tr("tab_broadcast"))
+
+        # --- 显示页签 ---
+        self.tab_display = QWidget()
+        self.init_display_tab()
+        self.tabs.addTab(self.tab_display, i18n.tr("tab_display"))
+
+        # --- 远端采集 (事件中继) 页签 ---
+        self.tab_relay = QWidget()
+        self.init_relay_tab()
+        self.tabs.addTab(self.tab_relay, i18n.tr("tab_relay"))
+
         # (未来可以在这里添加更多页签)
 
         main_layout.addWidget(self.tabs)
@@ -58,6 +74,68 @@ class PreferencesDialog(QDialog):
 
         layout.addRow(QLabel(i18n.tr("lbl_reset_all_shortcut")), self.key_editor_reset)
 
+    def init_broadcast_tab(self):
+        layout = QFormLayout(self.tab_broadcast)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(15)
+
+        self.chk_broadcast = QCheckBox(i18n.tr("chk_broadcast_enabled"))
+        self.chk_broadcast.setChecked(bool(app_settings.get("broadcast_enabled")))
+        layout.addRow(self.chk_broadcast)
+
+        self.spin_broadcast_port = QSpinBox()
+        self.spin_broadcast_port.setRange(1024, 65535)
+        self.spin_broadcast_port.setValue(int(app_settings.get("broadcast_port")))
+        layout.addRow(QLabel(i18n.tr("lbl_broadcast_port")), self.spin_broadcast_port)
+
+        self.lbl_broadcast_url = QLabel()
+        self.lbl_broadcast_url.setStyleSheet("color: gray;")
+        self.spin_broadcast_port.valueChanged.connect(self.update_broadcast_url)
+        self.update_broadcast_url()
+        layout.addRow(self.lbl_broadcast_url)
+
+        self.chk_shared_scores = QCheckBox(i18n.tr("chk_shared_scores"))
+        self.chk_shared_scores.setChecked(bool(app_settings.get("shared_scores_enabled")))
+        layout.addRow(self.chk_shared_scores)
+
+    def init_display_tab(self):
+        layout = QFormLayout(self.tab_display)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(15)
+
+        self.combo_dashboard_mode = QComboBox()
+        for mode in ("auto", "panels", "compact"):
+            self.combo_dashboard_mode.addItem(i18n.tr(f"val_dashboard_{mode}"), mode)
+        index = self.combo_dashboard_mode.findData(app_settings.get("dashboard_mode"))
+        self.combo_dashboard_mode.setCurrentIndex(max(index, 0))
+        layout.addRow(QLabel(i18n.tr("lbl_dashboard_mode")), self.combo_dashboard_mode)
+
+    def init_relay_tab(self):
+        layout = QFormLayout(self.tab_relay)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(15)
+
+        self.edit_relay_sources = QLineEdit(app_settings.get("relay_sources"))
+        self.edit_relay_sources.setPlaceholderText("192.168.1.20:8766")
+        layout.addRow(QLabel(i18n.tr("lbl_relay_sources")), self.edit_relay_sources)
+
+        hint = QLabel(i18n.tr("lbl_relay_hint"))
+        hint.setWordWrap(True)
+        hint.setStyleSheet("color: gray;")
+        layout.addRow(hint)
+
+        self.edit_results_server = QLineEdit(app_settings.get("results_server"))
+        self.edit_results_server.setPlaceholderText("192.168.1.10:8767")
+        layout.addRow(QLabel(i18n.tr("lbl_results_server")), self.edit_results_server)
+
+        self.edit_station_name = QLineEdit(app_settings.get("station_name"))
+        self.edit_station_name.setPlaceholderText(i18n.tr("lbl_station_default"))
+        layout.addRow(QLabel(i18n.tr("lbl_station_name")), self.edit_station_name)
+
+    def update_broadcast_url(self):
+        url = f"http://127.0.0.1:{self.spin_broadcast_port.value()}/"
+        self.lbl_broadcast_url.setText(i18n.tr("lbl_broadcast_url", url))
+
     def save_settings(self):
         """保存所有设置项并关闭对话框"""
         # 1. 获取快捷键输入
@@ -68,5 +146,18 @@ class PreferencesDialog(QDialog):
         if new_key_str:
             app_settings.set("reset_shortcut", new_key_str)
 
+        # 2. 直播输出设置
+        app_settings.set("broadcast_enabled", self.chk_broadcast.isChecked())
+        app_settings.set("broadcast_port", self.spin_broadcast_port.value())
+        app_settings.set("shared_scores_enabled", self.chk_shared_scores.isChecked())
+
+        # 3. 显示设置
+        app_settings.set("dashboard_mode", self.combo_dashboard_mode.currentData())
+
+        # 4. 远端采集
+        app_settings.set("relay_sources", self.edit_relay_sources.text().strip())
+        app_settings.set("results_server", self.edit_results_server.text().strip())
+        app_settings.set("station_name", self.edit_station_name.text().strip())
+
         # 保存成功，返回 Accepted 状态
         self.accept()
\ No newline at end of file
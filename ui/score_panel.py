@@ -4,26 +4,93 @@ from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont, QColor
 from utils.i18n import i18n
 
+# 状态颜色预先写进面板样式表，标签只切换 statusLevel 动态属性，
+# 不再每次 setStyleSheet (那会让 Qt 重新解析样式并重算整棵子树)
+STATUS_STYLE = """
+    QLabel#status { font-size: 11px; font-weight: bold; color: #f39c12; }
+    QLabel#status[statusLevel="ok"] { color: #27ae60; }
+    QLabel#status[statusLevel="error"] { color: #c0392b; }
+"""
+
+
+def describe_status(status):
+    """设备上报的状态字符串 -> (显示文本, 级别 ok/pending/error)"""
+    if "Connected" in status and "Dis" not in status:
+        return i18n.tr("status_connected"), "ok"
+    if "Disconnected" in status:
+        return i18n.tr("status_disconnected"), "error"
+    if "Connecting" in status:
+        return i18n.tr("status_waiting"), "pending"
+    if status.startswith("Reset OK"):
+        return i18n.tr("status_reset_ok", status.split(": ", 1)[-1]), "ok"
+    if status.startswith("Reset Failed"):
+        return i18n.tr("status_reset_failed", status.split(": ", 1)[-1]), "error"
+    if status == "Relay Lost":
+        return i18n.tr("status_relay_lost"), "pending"
+    if status == "Stalled":
+        return i18n.tr("status_stalled"), "pending"
+    if status.startswith("Recovered"):
+        return i18n.tr("status_recovered", status.split(": ", 1)[-1]), "ok"
+    if status == "Recovery Failed":
+        return i18n.tr("status_recovery_failed"), "error"
+    return status, "pending"
+
 
 class ScorePanel(QFrame):
-    def __init__(self, referee):
+    """
+    单个裁判的计分卡片。
+    面板可复用：看板切换场次时调用 bind() 换绑新的裁判，不必销毁重建。
+    """
+
+    def __init__(self, referee=None):
         super().__init__()
-        self.referee = referee
+        self.referee = None
+        self._devices = (None, None)  # 绑定时的 (主, 副) 设备，解绑时据此断开信号
         self.curr_total = 0
         self.curr_plus = 0
         self.curr_minus = 0
+        self._detail_labels = ("", "")  # (正分, 负分) 文案，语言切换时更新
+        self._last_status = {}  # label -> 设备上报的原始状态，语言切换时重新渲染
 
         self.init_ui()
+        i18n.language_changed.connect(self.retranslate_ui)
+        if referee is not None:
+            self.bind(referee)
+
+    def bind(self, referee):
+        self.unbind()
+        self.referee = referee
+        self.curr_total = referee.last_total
+        self.curr_plus = referee.last_plus
+        self.curr_minus = referee.last_minus
+        self.lbl_score.setText(str(self.curr_total))
+        self._last_status.clear()
 
         # 信号连接
-        self.referee.score_updated.connect(self.update_score, Qt.ConnectionType.QueuedConnection)
-        if self.referee.primary_device:
-            self.referee.primary_device.status_changed.connect(self.update_status_primary,
-                                                               Qt.ConnectionType.QueuedConnection)
-        if self.referee.secondary_device:
-            self.referee.secondary_device.status_changed.connect(self.update_status_secondary,
-                                                                 Qt.ConnectionType.QueuedConnection)
-        i18n.language_changed.connect(self.retranslate_ui)
+        referee.score_updated.connect(self.update_score, Qt.ConnectionType.QueuedConnection)
+        self._devices = (referee.primary_device, referee.secondary_device)
+        if referee.primary_device:
+            referee.primary_device.status_changed.connect(self.update_status_primary,
+                                                          Qt.ConnectionType.QueuedConnection)
+        if referee.secondary_device:
+            referee.secondary_device.status_changed.connect(self.update_status_secondary,
+                                                            Qt.ConnectionType.QueuedConnection)
+        self.retranslate_ui()
+
+    def unbind(self):
+        """断开与裁判/设备的信号 (设备节点在会话池中复用，必须显式断开)"""
+        if self.referee is None: return
+        pairs = [(self.referee.score_updated, self.update_score)]
+        primary, secondary = self._devices
+        if primary: pairs.append((primary.status_changed, self.update_status_primary))
+        if secondary: pairs.append((secondary.status_changed, self.update_status_secondary))
+        for signal, slot in pairs:
+            try:
+                signal.disconnect(slot)
+            except TypeError:
+                pass
+        self.referee = None
+        self._devices = (None, None)
 
     def init_ui(self):
         # 优化样式：浅灰背景，柔和阴影，圆角
@@ -34,7 +101,7 @@ class ScorePanel(QFrame):
                 border-radius: 12px; 
                 border: 1px solid #E4E7ED;
             }
-        """)
+        """ + STATUS_STYLE)
 
         # 添加阴影
         shadow = QGraphicsDropShadowEffect()
@@ -89,7 +156,7 @@ class ScorePanel(QFrame):
                 border-color: #c0392b;
             }
         """)
-        self.btn_reset.clicked.connect(self.referee.request_reset)
+        self.btn_reset.clicked.connect(self.on_reset_clicked)
 
         btn_layout.addStretch()
         btn_layout.addWidget(self.btn_reset)
@@ -102,9 +169,11 @@ class ScorePanel(QFrame):
         status_layout.setSpacing(2)
 
         self.lbl_status_pri = QLabel()
+        self.lbl_status_pri.setObjectName("status")
         self.lbl_status_pri.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
         self.lbl_status_sec = QLabel()
+        self.lbl_status_sec.setObjectName("status")
         self.lbl_status_sec.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
         status_layout.addWidget(self.lbl_status_pri)
@@ -117,36 +186,52 @@ class ScorePanel(QFrame):
         layout.addWidget(status_container)
 
         self.setLayout(layout)
-        self.retranslate_ui()
+
+    def on_reset_clicked(self):
+        if self.referee: self.referee.request_reset()
 
     def retranslate_ui(self):
-        # ... (保持原逻辑不变) ...
+        """绑定裁判与切换语言时调用；分数变化只走 update_score"""
+        if self.referee is None: return
         mode_str = i18n.tr("mode_single") if self.referee.mode == "SINGLE" else i18n.tr("mode_dual")
         ref_title = i18n.tr("referee_name")
         self.lbl_name.setText(f"{ref_title} {self.referee.name} ({mode_str})")
 
-        p_str = i18n.tr("score_plus")
-        m_str = i18n.tr("score_minus")
-        self.lbl_detail.setText(f"{p_str}: {self.curr_plus} | {m_str}: {self.curr_minus}")
+        self._detail_labels = (i18n.tr("score_plus"), i18n.tr("score_minus"))
+        self.lbl_detail.setText(self.detail_text())
 
         self.btn_reset.setText("RESET 0")
 
-        if not self.referee.primary_device or not self.referee.primary_device.is_connected:
-            self.update_status_text(self.lbl_status_pri, "device_primary", i18n.tr("status_waiting"), "#f39c12")
-
+        self.refresh_status(self.lbl_status_pri, "device_primary", self.referee.primary_device)
         if self.referee.mode == "DUAL":
             self.lbl_status_sec.setVisible(True)
-            if not self.referee.secondary_device or not self.referee.secondary_device.is_connected:
-                self.update_status_text(self.lbl_status_sec, "device_secondary", i18n.tr("status_waiting"), "#f39c12")
+            self.refresh_status(self.lbl_status_sec, "device_secondary", self.referee.secondary_device)
         else:
             self.lbl_status_sec.setVisible(False)
 
+    def refresh_status(self, label, prefix_key, device):
+        # 总是重新渲染：复用的面板换绑到已连接的设备时，不能留着上一位裁判的状态文字
+        last = self._last_status.get(label)
+        if last is not None:
+            self.handle_status_update(label, prefix_key, last)
+        elif device is not None and device.is_connected:
+            self.handle_status_update(label, prefix_key, "Connected")
+        else:
+            self.update_status_text(label, prefix_key, i18n.tr("status_waiting"), "pending")
+
+    def detail_text(self):
+        p_str, m_str = self._detail_labels
+        return f"{p_str}: {self.curr_plus} | {m_str}: {self.curr_minus}"
+
     def update_score(self, total, plus, minus):
-        self.curr_total = total
-        self.curr_plus = plus
-        self.curr_minus = minus
-        self.lbl_score.setText(str(total))
-        self.retranslate_ui()
+        # 只更新变化了的标签
+        if total != self.curr_total:
+            self.curr_total = total
+            self.lbl_score.setText(str(total))
+        if plus != self.curr_plus or minus != self.curr_minus:
+            self.curr_plus = plus
+            self.curr_minus = minus
+            self.lbl_detail.setText(self.detail_text())
 
     def update_status_primary(self, status):
         self.handle_status_update(self.lbl_status_pri, "device_primary", status)
@@ -155,22 +240,16 @@ class ScorePanel(QFrame):
         self.handle_status_update(self.lbl_status_sec, "device_secondary", status)
 
     def handle_status_update(self, label, prefix_key, status):
-        color = "#f39c12"  # orange
-        text = status
-
-        if "Connected" in status and "Dis" not in status:
-            text = i18n.tr("status_connected")
-            color = "#27ae60"  # green
-        elif "Disconnected" in status:
-            text = i18n.tr("status_disconnected")
-            color = "#c0392b"  # red
-        elif "Connecting" in status:
-            text = i18n.tr("status_waiting")
-            color = "#f39c12"
-
-        self.update_status_text(label, prefix_key, text, color)
-
-    def update_status_text(self, label, prefix_key, status_text, color):
-        prefix = i18n.tr(prefix_key)
-        label.setText(f"{prefix}: {status_text}")
-        label.setStyleSheet(f"color: {color}; font-size: 11px; font-weight: bold;")
\ No newline at end of file
+        self._last_status[label] = status
+        text, level = describe_status(status)
+        self.update_status_text(label, prefix_key, text, level)
+
+    def update_status_text(self, label, prefix_key, status_text, level):
+        text = f"{i18n.tr(prefix_key)}: {status_text}"
+        if label.text() != text:
+            label.setText(text)
+        if label.property("statusLevel") != level:
+            # 切换到预置样式：只对该标签重新 polish
+            label.setProperty("statusLevel", level)
+            label.style().unpolish(label)
+            label.style().polish(label)
\ No newline at end of file
@@ -9,8 +9,12 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QDialog, QDialogButtonBox, QPlainTextEdit)
 from PyQt6.QtCore import Qt, pyqtSignal
 from logic.referee import Referee
-from core.device_node import DeviceNode
+from logic.contestant_queue import roster_ids, reconcile_ids
+from core.ble_thread import ble_thread
+from core.ble_manager import ble_manager
+from core.relay import relay_hub, parse_sources
 from config import DEVICE_NAME_PREFIX
+from utils.app_settings import app_settings
 from utils.i18n import i18n
 
 
@@ -49,7 +53,7 @@ class NamesEditorDialog(QDialog):
 class GroupManagerWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
-        # 数据结构: { "GroupA": {"ref_count": 3, "names": ["P1", "P2"]} }
+        # 数据结构: { "GroupA": {"ref_count": 3, "names": ["P1", "P2"], "ids": ["P1", "P2"]} }
         self.groups_config = {}
         self.init_ui()
         # 监听语言切换
@@ -120,7 +124,8 @@ class GroupManagerWidget(QWidget):
         # 3. 保存并刷新
         self.groups_config[group_name] = {
             "ref_count": count,
-            "names": []
+            "names": [],
+            "ids": []
         }
         self.refresh_table()
         self.table.selectRow(self.table.rowCount() - 1)
@@ -143,6 +148,8 @@ class GroupManagerWidget(QWidget):
         dialog = NamesEditorDialog(group_name, current_names, self)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             new_names = dialog.get_names()
+            # 按旧名单对齐分配 id，保留原有选手的 id (成绩与日志按 id 记录)
+            self.groups_config[group_name]["ids"] = reconcile_ids(current_names, current_data.get("ids"), new_names)
             self.groups_config[group_name]["names"] = new_names
             self.refresh_table()
             # 保持选中状态
@@ -192,6 +199,8 @@ class SetupWizard(QWidget):
         self.scan_task = None
         self.ref_cards = []
         self._temp_ref_configs = []
+        self.warm_future = None
+        self.warm_addrs = set()
 
         self.init_ui()
         # 连接语言切换信号
@@ -276,6 +285,10 @@ class SetupWizard(QWidget):
         self.group_manager.groups_config = {}
         self.group_manager.refresh_table()
         self.stop_scan_safe()
+        self._temp_ref_configs = []
+        self.warm_future = None
+        self.warm_addrs = set()
+        ble_manager.release_warm()
         self.update_mode_ui()
         self.retranslate_ui()
 
@@ -286,16 +299,18 @@ class SetupWizard(QWidget):
         grp_configs = t_data.get("group_configs", {})
 
         # 恢复名单和裁判数配置
-        # 注意：save时 group_configs 结构为 {name: {ref_count: N}}, groups 为 {name: [p1, p2]}
-        # 这里我们需要合并回 group_manager 的数据结构 {name: {ref_count: N, names: []}}
+        # 注意：save时 group_configs 结构为 {name: {ref_count: N, ids: []}}, groups 为 {name: [p1, p2]}
+        # 这里我们需要合并回 group_manager 的数据结构 {name: {ref_count: N, names: [], ids: []}}
         names_data = t_data.get("groups", {})
 
         merged_config = {}
         # 先合并配置
         for name, cfg in grp_configs.items():
+            names = names_data.get(name, [])
             merged_config[name] = {
                 "ref_count": cfg.get("ref_count", 2),
-                "names": names_data.get(name, [])
+                "names": names,
+                "ids": roster_ids(names, cfg.get("ids"))  # 旧项目没有 ids：按位置生成
             }
 
         if merged_config:
@@ -311,6 +326,18 @@ class SetupWizard(QWidget):
         self._temp_ref_configs = config_data.get("referees", [])
         self.update_mode_ui()
 
+    def warm_start(self):
+        """打开已有项目时立即并行直连保存的设备地址，扫描只用于连不上的设备"""
+        known = []
+        for r in self._temp_ref_configs:
+            for key in ("primary", "secondary"):
+                addr = r.get(f"{key}_device")
+                if addr and addr != "N/A":
+                    known.append((addr, r.get(f"{key}_name")))
+
+        self.warm_addrs = {addr for addr, _ in known}
+        self.warm_future = asyncio.wrap_future(ble_manager.warm_start(known)) if known else None
+
     def create_page1_settings(self):
         page = QWidget()
         layout = QVBoxLayout(page)
@@ -430,8 +457,11 @@ class SetupWizard(QWidget):
             if item.widget(): item.widget().deleteLater()
 
         self.ref_cards = []
+        saved = {r.get("index"): r for r in self._temp_ref_configs}
         for i in range(count):
             card = RefereeConfigCard(i + 1)
+            if i + 1 in saved:
+                card.apply_saved(saved[i + 1])
             self.cards_layout.insertWidget(i, card)
             self.ref_cards.append(card)
 
@@ -444,16 +474,22 @@ class SetupWizard(QWidget):
                 self.show_error(i18n.tr("msg_select_all"))
                 return
 
-            ref = card.get_configured_referee()
-
-            # 简单的地址查重
-            p = ref.primary_device.ble_device.address
+            # 简单的地址查重 (在租用设备前完成校验)
+            p = card.combo_pri.currentData().address
             if p in used_addrs:
                 self.show_error(i18n.tr("msg_duplicate_dev", p))
                 return
             used_addrs.add(p)
 
-            final_referees.append(ref)
+            # 多赛场：设备已被其他赛场占用
+            for addr in card.selected_addresses():
+                if ble_manager.is_leased(addr):
+                    self.show_error(i18n.tr("msg_device_in_use", addr))
+                    return
+
+        for card in self.ref_cards:
+            final_referees.append(card.get_configured_referee())
+        ble_manager.release_warm()  # 未被选用的预连接设备按空闲会话回收
 
         tournament_data = {}
         if self.rb_mode_free.isChecked():
@@ -468,7 +504,8 @@ class SetupWizard(QWidget):
             configs_map = {}
             for name, data in raw_configs.items():
                 groups_map[name] = data.get("names", [])
-                configs_map[name] = {"ref_count": data.get("ref_count", 2)}
+                configs_map[name] = {"ref_count": data.get("ref_count", 2),
+                                     "ids": roster_ids(groups_map[name], data.get("ids"))}
 
             tournament_data = {
                 "groups": groups_map,
@@ -489,6 +526,7 @@ class SetupWizard(QWidget):
             self.retranslate_ui()
             self.stop_scan_safe()
         else:
+            ble_manager.release_warm()
             self.back_to_home_requested.emit()
 
     def start_scan(self):
@@ -506,8 +544,34 @@ class SetupWizard(QWidget):
 
     async def run_ble_scan(self):
         try:
-            devs = await BleakScanner.discover(timeout=4.0)
+            if self.warm_future:
+                self.lbl_scan_status.setText(i18n.tr("status_warm_connecting"))
+                # shield: 返回上一页取消扫描时不中断后台直连
+                await asyncio.shield(self.warm_future)
+                self.warm_future = None
+
+            # 直连结束后会话仍可能断开：逐个确认仍在池中且已连接，缺任何一个都走完整扫描
+            if self.warm_addrs and all(ble_manager.is_connected(a) for a in self.warm_addrs):
+                devs = []  # 保存的设备全部直连成功，无需扫描
+            else:
+                # 扫描在 BLE 线程执行，这里只等待结果；同时查询各采集端 (事件中继) 的设备
+                sources = parse_sources(app_settings.get("relay_sources"))
+                jobs = [ble_thread.run(BleakScanner.discover(timeout=4.0), name="scan")]
+                if sources:
+                    jobs.append(ble_thread.run(relay_hub.discover(sources), name="relay-discover"))
+                results = await asyncio.gather(*jobs, return_exceptions=True)
+                local = results[0]
+                remote = results[1] if len(results) > 1 and not isinstance(results[1], BaseException) else []
+                if isinstance(local, BaseException):
+                    if not remote: raise local
+                    print(f"BLE scan failed, using relay devices only: {local!r}")  # 界面主机可以没有蓝牙
+                    local = []
+                devs = list(local) + remote
+            self.warm_addrs = set()  # 之后的“重新扫描”走完整扫描
             self.scanned_devices = [d for d in devs if d.name and DEVICE_NAME_PREFIX in d.name]
+            # 池中仍连接的设备不再广播，补回列表以便直接复用
+            found = {d.address for d in self.scanned_devices}
+            self.scanned_devices += [d for d in ble_manager.connected_devices() if d.address not in found]
             for card in self.ref_cards: card.update_devices(self.scanned_devices)
         except Exception as e:
             self.lbl_scan_status.setText(f"Error: {e}")
@@ -524,6 +588,8 @@ class RefereeConfigCard(QGroupBox):
         super().__init__()
         self.index = index
         self.devices = []
+        self.saved_pri_addr = None  # 项目配置中保存的设备，设备列表就绪后自动选中
+        self.saved_sec_addr = None
         self.init_ui()
         self.retranslate_ui()
 
@@ -565,9 +631,16 @@ class RefereeConfigCard(QGroupBox):
         self.combo_sec.setVisible(is_dual)
         if is_dual: self.update_secondary_list()
 
+    def apply_saved(self, cfg):
+        """按项目配置预填模式与设备"""
+        mode_idx = self.combo_mode.findData(cfg.get("mode", "SINGLE"))
+        if mode_idx >= 0: self.combo_mode.setCurrentIndex(mode_idx)
+        self.saved_pri_addr = cfg.get("primary_device") if cfg.get("primary_device") != "N/A" else None
+        self.saved_sec_addr = cfg.get("secondary_device") if cfg.get("secondary_device") != "N/A" else None
+
     def update_devices(self, devices):
         self.devices = devices
-        cur_pri_addr = self.combo_pri.currentData().address if self.combo_pri.currentData() else None
+        cur_pri_addr = self.combo_pri.currentData().address if self.combo_pri.currentData() else self.saved_pri_addr
         self.combo_pri.blockSignals(True)
         self.combo_pri.clear()
         self.combo_pri.addItem(i18n.tr("placeholder_select"), None)
@@ -578,7 +651,7 @@ class RefereeConfigCard(QGroupBox):
 
     def update_secondary_list(self):
         if not self.combo_sec.isVisible(): return
-        cur_sec_addr = self.combo_sec.currentData().address if self.combo_sec.currentData() else None
+        cur_sec_addr = self.combo_sec.currentData().address if self.combo_sec.currentData() else self.saved_sec_addr
         pri_addr = self.combo_pri.currentData().address if self.combo_pri.currentData() else None
         self.combo_sec.blockSignals(True)
         self.combo_sec.clear()
@@ -604,16 +677,22 @@ class RefereeConfigCard(QGroupBox):
     def is_dual_mode(self):
         return self.combo_mode.currentData() == "DUAL"
 
+    def selected_addresses(self):
+        addrs = [self.combo_pri.currentData().address]
+        if self.is_dual_mode():
+            addrs.append(self.combo_sec.currentData().address)
+        return addrs
+
     def get_configured_referee(self):
         name = f"{i18n.tr('referee_name')} {self.index}"
         mode = self.combo_mode.currentData()
         ref = Referee(self.index, name, mode)
         d_pri = self.combo_pri.currentData()
-        node_pri = DeviceNode(d_pri)
+        node_pri = ble_manager.lease(d_pri)
         node_sec = None
         if mode == "DUAL":
             d_sec = self.combo_sec.currentData()
             if d_sec:
-                node_sec = DeviceNode(d_sec)
+                node_sec = ble_manager.lease(d_sec)
         ref.set_devices(primary=node_pri, secondary=node_sec)
         return ref
\ No newline at end of file
@@ -1,5 +1,4 @@
 # ui/window_selector.py
-import pygetwindow as gw
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QListWidget, QPushButton,
                              QLabel, QHBoxLayout, QMessageBox)
 from PyQt6.QtCore import pyqtSignal, Qt
@@ -28,8 +27,9 @@ class WindowSelectorDialog(QDialog):
         self.list_widget.itemDoubleClicked.connect(self.accept_selection)
         layout.addWidget(self.list_widget)
 
-        # 获取窗口列表
+        # 获取窗口列表 (pygetwindow 首次打开选择框时才导入)
         try:
+            import pygetwindow as gw
             windows = gw.getAllTitles()
             my_title = self.parent().windowTitle() if self.parent() else ""
             for title in windows:
@@ -57,6 +57,7 @@ class WindowSelectorDialog(QDialog):
 
         title = current_item.text()
         try:
+            import pygetwindow as gw
             wins = gw.getWindowsWithTitle(title)
             if wins:
                 # 发射信号并关闭
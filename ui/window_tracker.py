@@ -0,0 +1,81 @@
+# ui/window_tracker.py
+from abc import ABC, abstractmethod
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+
+# ============================================================================
+# 窗口几何信息提供者 (可插拔)
+# ============================================================================
+class WindowProvider(ABC):
+    """
+    目标窗口几何信息的提供者接口。
+    geometry() 返回 (x, y, w, h)；目标窗口已不存在时抛出异常。
+    """
+
+    @abstractmethod
+    def geometry(self):
+        ...
+
+
+class PyGetWindowProvider(WindowProvider):
+    """基于 pygetwindow 窗口对象的提供者 (WindowSelectorDialog 返回的对象)"""
+
+    def __init__(self, window):
+        self.window = window
+
+    def geometry(self):
+        w = self.window
+        return (w.left, w.top, w.width, w.height)
+
+
+# ============================================================================
+# 自适应轮询跟踪器
+# ============================================================================
+class WindowTracker(QObject):
+    """
+    变化检测 + 自适应轮询：
+    1. 目标窗口移动中：以 fast_interval 快速轮询，跟随无延迟
+    2. 连续静止时：轮询间隔逐步翻倍，直到 slow_interval
+    3. 几何信息不变时不发射信号，上层不会重复 setGeometry
+    """
+    geometry_changed = pyqtSignal(int, int, int, int)
+    target_lost = pyqtSignal()
+
+    def __init__(self, provider, fast_interval=16, slow_interval=500, parent=None):
+        super().__init__(parent)
+        self.provider = provider
+        self.fast_interval = fast_interval
+        self.slow_interval = slow_interval
+        self.last_geometry = None
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.poll)
+        self.interval = fast_interval
+
+    def start(self):
+        self.interval = self.fast_interval
+        self.timer.start(0)
+
+    def stop(self):
+        self.timer.stop()
+
+    def is_active(self):
+        return self.timer.isActive()
+
+    def poll(self):
+        try:
+            geo = tuple(int(v) for v in self.provider.geometry())
+        except Exception:
+            self.stop()
+            self.target_lost.emit()
+            return
+
+        if geo != self.last_geometry:
+            self.last_geometry = geo
+            self.interval = self.fast_interval
+            self.geometry_changed.emit(*geo)
+        else:
+            self.interval = min(self.interval * 2, self.slow_interval)
+
+        self.timer.start(self.interval)
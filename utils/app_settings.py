@@ -1,47 +1,152 @@
 # utils/app_settings.py
+import atexit
 import json
 import os
+import threading
+from dataclasses import dataclass
 
 SETTINGS_FILE = "app_settings.json"
 
-# 默认配置
-DEFAULT_SETTINGS = {
-    "language": "zh",
-    "reset_shortcut": "Ctrl+G",
-    "suppress_reset_confirm": False  # 【新增】默认开启提醒
+
+@dataclass(frozen=True)
+class Setting:
+    """配置项定义：类型、默认值与取值约束"""
+    type: type
+    default: object
+    choices: tuple = None
+    min: int = None
+    max: int = None
+
+    def coerce(self, value):
+        """校验并转换为声明的类型，不合法时抛出 ValueError"""
+        if self.type is bool:
+            if not isinstance(value, bool):
+                raise ValueError(f"expected bool, got {value!r}")
+        elif self.type is int:
+            if isinstance(value, bool):
+                raise ValueError(f"expected int, got {value!r}")
+            value = int(value)
+            if (self.min is not None and value < self.min) or (self.max is not None and value > self.max):
+                raise ValueError(f"{value} out of range [{self.min}, {self.max}]")
+        else:
+            value = self.type(value)
+        if self.choices is not None and value not in self.choices:
+            raise ValueError(f"{value!r} not in {self.choices}")
+        return value
+
+
+# 配置项 schema (默认值也在这里，只定义一次)
+SETTINGS_SCHEMA = {
+    "language": Setting(str, "zh"),
+    "reset_shortcut": Setting(str, "Ctrl+G"),
+    "suppress_reset_confirm": Setting(bool, False),  # 【新增】默认开启提醒
+    "curve_history_cap": Setting(int, 2000, min=100),  # 曲线每位裁判最多保留的点数 (环形缓冲区容量)
+    "broadcast_enabled": Setting(bool, False),  # 本地直播输出服务 (OBS 浏览器源)
+    "broadcast_port": Setting(int, 8765, min=1024, max=65535),
+    "shared_scores_enabled": Setting(bool, False),  # 共享内存实时分数表 (utils.score_table)
+    "dashboard_mode": Setting(str, "auto", choices=("auto", "panels", "compact")),  # 计分看板布局
+    "relay_sources": Setting(str, ""),  # 远端采集端 (事件中继)，"host:port" 逗号分隔
+    "results_server": Setting(str, ""),  # 成绩汇总服务 "host:port"，空为不推送
+    "station_name": Setting(str, ""),  # 推送成绩时的赛场名称，空则使用计算机名
 }
 
+# 默认配置
+DEFAULT_SETTINGS = {key: spec.default for key, spec in SETTINGS_SCHEMA.items()}
+
+
 class AppSettings:
-    def __init__(self):
+    """
+    应用配置。set() 只改内存并启动防抖定时器，
+    由后台定时器线程把短时间内的多次修改合并为一次写入：
+    先写临时文件再 os.replace 原子替换，写到一半崩溃也不会损坏原文件。
+    """
+
+    SAVE_DELAY = 0.5  # 防抖间隔 (秒)
+
+    def __init__(self, path=SETTINGS_FILE):
+        self.path = path
         self.settings = DEFAULT_SETTINGS.copy()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # 串行化整个写文件过程 (set() 不等待它)
+        self._timer = None
+        self._dirty = False
         self.load()
+        atexit.register(self.flush)
 
     def load(self):
-        """加载配置文件，如果不存在则使用默认值"""
-        if os.path.exists(SETTINGS_FILE):
+        """加载配置文件，如果不存在则使用默认值；类型不符的项回退为默认值"""
+        if not os.path.exists(self.path): return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Failed to load settings: {e}")
+            return
+
+        for key, value in data.items():
+            spec = SETTINGS_SCHEMA.get(key)
+            if spec is None:
+                self.settings[key] = value  # 未知项原样保留，避免丢失新版本写入的配置
+                continue
             try:
-                with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.settings.update(data)
-            except Exception as e:
-                print(f"Failed to load settings: {e}")
+                self.settings[key] = spec.coerce(value)
+            except (TypeError, ValueError) as e:
+                print(f"Invalid setting '{key}' ({e}), using default")
 
     def save(self):
-        """保存当前配置到文件"""
-        try:
-            with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.settings, f, indent=4, ensure_ascii=False)
-        except Exception as e:
-            print(f"Failed to save settings: {e}")
+        """
+        立即 (在调用线程) 写入配置文件。
+        定时器线程与 flush() 可能同时保存：快照在写锁内获取，后写入的一定是较新的快照，
+        也不会两个线程同时写同一个临时文件。
+        """
+        with self._write_lock:
+            with self._lock:
+                snapshot = dict(self.settings)
+                self._dirty = False
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(snapshot, f, indent=4, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                print(f"Failed to save settings: {e}")
+
+    def flush(self):
+        """取消等待中的定时器并写入未保存的修改 (退出前调用)"""
+        with self._lock:
+            timer, self._timer = self._timer, None
+            dirty = self._dirty
+        if timer: timer.cancel()
+        if dirty: self.save()
+
+    def _schedule_save(self):
+        with self._lock:
+            self._dirty = True
+            if self._timer: self._timer.cancel()
+            self._timer = threading.Timer(self.SAVE_DELAY, self._on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+        self.save()
 
     def get(self, key):
         """获取配置项"""
         return self.settings.get(key, DEFAULT_SETTINGS.get(key))
 
     def set(self, key, value):
-        """设置配置项并立即保存"""
-        self.settings[key] = value
-        self.save()
+        """设置配置项 (按 schema 校验)，稍后在后台合并写入"""
+        spec = SETTINGS_SCHEMA.get(key)
+        if spec is not None:
+            value = spec.coerce(value)
+        with self._lock:
+            if key in self.settings and self.settings[key] == value: return
+            self.settings[key] = value
+        self._schedule_save()
 
 # 全局单例
-app_settings = AppSettings()
\ No newline at end of file
+app_settings = AppSettings()
@@ -0,0 +1,75 @@
+# utils/csv_writer.py
+import csv
+import queue
+import threading
+
+
+class CsvAppender:
+    """
+    全进程共享的 CSV 追加写入线程。
+
+    多个赛场同时计分时，每条 BLE 事件都在 GUI 线程里打开/追加/关闭文件会放大磁盘抖动；
+    这里改为 append() 只入队，由单个后台线程按文件分批写入：
+    - 队列积压时一次 open 写入多行，CPU 与系统调用次数随赛场数平稳增长
+    - flush() 等待已入队的行全部落盘，读取 CSV 之前调用，保证能读到刚写入的数据
+    """
+
+    def __init__(self, name="CSV-Writer"):
+        self.name = name
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive(): return
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def append(self, path, row):
+        self._ensure_started()
+        self._queue.put((path, row))
+
+    def flush(self):
+        """阻塞直到已入队的行全部写入 (可在任意线程调用)"""
+        if self._thread is None: return
+        self._queue.join()
+
+    def shutdown(self):
+        """退出前写完剩余数据并停止线程"""
+        if self._thread is None: return
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            # 取走当前积压的所有行，一起写
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in batch
+            self._write_batch([b for b in batch if b is not None])
+            for _ in batch:
+                self._queue.task_done()
+            if stop: return
+
+    def _write_batch(self, batch):
+        rows_by_path = {}
+        for path, row in batch:
+            rows_by_path.setdefault(path, []).append(row)
+        for path, rows in rows_by_path.items():
+            try:
+                with open(path, 'a', newline='', encoding='utf-8') as f:
+                    csv.writer(f).writerows(rows)
+            except Exception as e:
+                print(f"CSV Write Error ({path}): {e}")
+
+
+# 全局单例
+csv_writer = CsvAppender()
@@ -1 +1,178 @@
-# 导出 Excel/CSV/SRT字幕 (预留)
\ No newline at end of file
+# utils/exporter.py
+"""
+离线批量渲染：读取项目原始裁判日志，为每位选手生成得分曲线 PNG 或帧序列。
+无需打开 GUI，渲染任务分发到进程池并行执行。
+
+用法:
+    python -m utils.exporter <项目文件夹> [--group 组名] [--out 目录]
+                             [--fps 25] [--size 1280x540] [--bg "#2b2b2b"] [--workers N]
+"""
+import argparse
+import bisect
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from utils.history_loader import parse_contestant_history
+from logic.contestant_queue import roster_ids
+
+_qt_app = None
+
+
+def _init_worker():
+    """进程池初始化：每个工作进程创建一个离屏 QGuiApplication (文字渲染需要)"""
+    global _qt_app
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtGui import QGuiApplication
+    if QGuiApplication.instance() is None:
+        _qt_app = QGuiApplication([])
+
+
+def _safe_filename(name):
+    return "".join([c for c in name if c.isalnum() or c in (' ', '_', '-')]).strip() or "unnamed"
+
+
+def _render_image(series, title, width, height, background):
+    from PyQt6.QtCore import Qt, QRect
+    from PyQt6.QtGui import QImage, QPainter, QColor, QFont
+    from ui.curve_painter import paint_score_curve
+
+    image = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(QColor(background) if background else QColor(0, 0, 0, 0))
+
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+    margin = 20
+    top = margin
+    if title:
+        painter.setPen(QColor("white"))
+        painter.setFont(QFont("Microsoft YaHei", 14, QFont.Weight.Bold))
+        painter.drawText(QRect(margin, 0, width - 2 * margin, 40),
+                         Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, title)
+        top = 40
+
+    # 右侧多留空间给末端分值标签
+    rect = QRect(margin, top, width - 3 * margin - 30, height - top - margin)
+    paint_score_curve(painter, rect, series)
+    painter.end()
+    return image
+
+
+def render_contestant(job):
+    """
+    工作进程入口：渲染单个选手。
+    返回 (选手名, 写出的文件数)
+    """
+    start_time, curves = parse_contestant_history(job["project_path"], job["ref_indices"], job["contestant_id"])
+    if start_time is None:
+        return job["contestant"], 0
+
+    series = [(idx, [p[0] for p in pts], [p[1] for p in pts]) for idx, pts in sorted(curves.items())]
+    width, height = job["size"]
+    title = job["contestant"] if job["title"] else ""
+    fps = job["fps"]
+
+    if not fps:
+        image = _render_image(series, title, width, height, job["background"])
+        image.save(job["out_path"] + ".png")
+        return job["contestant"], 1
+
+    # 帧序列：逐帧截取 t 时刻之前的数据，与实时曲线的生长方式一致
+    os.makedirs(job["out_path"], exist_ok=True)
+    end_time = max(times[-1] for _, times, _ in series)
+    frame_count = int(end_time * fps) + 1
+    for frame in range(frame_count):
+        t = frame / fps
+        partial = []
+        for idx, times, values in series:
+            n = bisect.bisect_right(times, t)
+            if n:
+                partial.append((idx, times[:n], values[:n]))
+        image = _render_image(partial, title, width, height, job["background"])
+        image.save(os.path.join(job["out_path"], f"frame_{frame:05d}.png"))
+    return job["contestant"], frame_count
+
+
+def collect_jobs(project_path, out_dir, group=None, fps=0, size=(1280, 540), background=None, title=True):
+    """按项目配置为每个组别的每位选手生成渲染任务"""
+    with open(os.path.join(project_path, "config.json"), 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    ref_indices = [r["index"] for r in config.get("referees", [])]
+
+    groups = dict(config.get("tournament_data", {}).get("groups", {}))
+    group_configs = config.get("tournament_data", {}).get("group_configs", {})
+    if not groups:
+        # 自由模式：选手名单来自 results.csv
+        from utils.storage import storage
+        storage.current_project_path = project_path
+        for r in storage.get_project_results():
+            names = groups.setdefault(r["group"] or "Free Mode", [])
+            if r["contestant"] not in names:
+                names.append(r["contestant"])
+
+    jobs = []
+    for group_name, names in groups.items():
+        if group and group_name != group:
+            continue
+        group_dir = os.path.join(out_dir, _safe_filename(group_name))
+        os.makedirs(group_dir, exist_ok=True)
+        used = set()
+        # 按稳定 id 区分同名选手 (与原始日志中的 Contestant 一致)
+        for name, cid in zip(names, roster_ids(names, group_configs.get(group_name, {}).get("ids"))):
+            base = _safe_filename(cid)
+            file_name, n = base, 2
+            while file_name in used:  # 同名选手加序号区分
+                file_name = f"{base}_{n}"
+                n += 1
+            used.add(file_name)
+            jobs.append({
+                "project_path": project_path,
+                "ref_indices": ref_indices,
+                "contestant": name,
+                "contestant_id": cid,
+                "out_path": os.path.join(group_dir, file_name),
+                "fps": fps,
+                "size": size,
+                "background": background,
+                "title": title,
+            })
+    return jobs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch render score curves for every contestant")
+    parser.add_argument("project", help="项目文件夹名 (projects/ 下) 或完整路径")
+    parser.add_argument("--group", help="只渲染该组别")
+    parser.add_argument("--out", default="renders", help="输出目录")
+    parser.add_argument("--fps", type=int, default=0, help="大于 0 时输出帧序列")
+    parser.add_argument("--size", default="1280x540", help="图片尺寸 WxH")
+    parser.add_argument("--bg", default=None, help="背景色，缺省为透明")
+    parser.add_argument("--no-title", action="store_true", help="不绘制选手名")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，缺省为 CPU 核数")
+    args = parser.parse_args(argv)
+
+    project_path = args.project
+    if not os.path.isdir(project_path):
+        project_path = os.path.join(os.getcwd(), "projects", args.project)
+    width, height = (int(v) for v in args.size.lower().split('x'))
+
+    jobs = collect_jobs(project_path, args.out, args.group, args.fps, (width, height), args.bg, not args.no_title)
+    print(f"Rendering {len(jobs)} contestants...")
+
+    total_files = 0
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(render_contestant, job) for job in jobs]
+        for fut in as_completed(futures):
+            try:
+                name, count = fut.result()
+                total_files += count
+                print(f"  {name}: {count} file(s)" if count else f"  {name}: no data, skipped")
+            except Exception as e:
+                print(f"  Render error: {e}")
+
+    print(f"Done. {total_files} file(s) written to {os.path.abspath(args.out)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# utils/history_loader.py
+import asyncio
+import csv
+import datetime
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from utils.csv_writer import csv_writer
+
+
+def parse_contestant_history(project_path, ref_indices, contestant_name):
+    """
+    读取各裁判原始日志中某位选手的记录 (不涉及 Qt，可在工作线程执行)。
+    返回 (start_time, {ref_index: [(elapsed, score), ...]})；
+    没有记录或全部为 0 分时 start_time 为 None。
+    """
+    # 1. 读取所有原始数据 (先等待共享写入线程落盘)
+    csv_writer.flush()
+    raw_data_map = {}  # { ref_index: [(ts, score), ...] }
+    for ref_index in ref_indices:
+        csv_path = os.path.join(project_path, f"referee_{ref_index}.csv")
+        if not os.path.exists(csv_path):
+            continue
+        pts = []
+        try:
+            with open(csv_path, 'r', encoding='utf-8') as f:
+                reader = csv.DictReader(f)
+                for row in reader:
+                    if row.get("Contestant") == contestant_name:
+                        # 优先使用校正后的点击时刻，旧日志没有该列时退回收到时刻
+                        ts_str = row.get("ClickTime") or row.get("SystemTime")
+                        score_str = row.get("CurrentTotal")
+                        if ts_str and score_str:
+                            try:
+                                if '.' in ts_str and len(ts_str.split('.')[1]) == 3:
+                                    ts_str += "000"
+                                dt = datetime.datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S.%f")
+                                pts.append((dt.timestamp(), int(score_str)))
+                            except:
+                                pass
+        except:
+            pass
+        if pts:
+            raw_data_map[ref_index] = pts
+
+    # 2. 寻找全局最早的“非零”时间点作为 0 秒
+    min_non_zero_ts = None
+    for pts in raw_data_map.values():
+        for (ts, score) in pts:
+            if score != 0:
+                if min_non_zero_ts is None or ts < min_non_zero_ts:
+                    min_non_zero_ts = ts
+
+    if min_non_zero_ts is None:
+        return None, {}
+
+    # 3. 过滤掉起点之前的 0 分记录，时间换算为相对秒数
+    curves = {}
+    for ref_index, pts in raw_data_map.items():
+        clean_pts = [(ts - min_non_zero_ts, score) for (ts, score) in pts if ts >= min_non_zero_ts]
+        if clean_pts:
+            curves[ref_index] = clean_pts
+
+    return min_non_zero_ts, curves
+
+
+class HistoryLoader:
+    """
+    选手曲线历史加载器：
+    1. CSV 解析在后台线程执行，不阻塞 GUI 线程和 qasync 循环 (BLE 数据照常处理)
+    2. 最近访问选手的解析结果保存在 LRU 缓存中，前后切换直接命中
+    3. 同一选手的并发请求 (前台加载 + 预取) 共享同一次解析
+    """
+
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._pending = {}  # key -> asyncio.Future
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="history")
+
+    @staticmethod
+    def _key(project_path, ref_indices, contestant_name):
+        return (project_path, tuple(ref_indices), contestant_name)
+
+    def get_cached(self, project_path, ref_indices, contestant_name):
+        key = self._key(project_path, ref_indices, contestant_name)
+        result = self._cache.get(key)
+        if result is not None:
+            self._cache.move_to_end(key)
+        return result
+
+    def invalidate(self, contestant_name):
+        """该选手产生了新数据，丢弃缓存及进行中的解析结果"""
+        for key in [k for k in self._cache if k[2] == contestant_name]:
+            del self._cache[key]
+        for key in [k for k in self._pending if k[2] == contestant_name]:
+            del self._pending[key]
+
+    def clear(self):
+        self._cache.clear()
+        self._pending.clear()
+
+    async def load(self, project_path, ref_indices, contestant_name):
+        cached = self.get_cached(project_path, ref_indices, contestant_name)
+        if cached is not None:
+            return cached
+
+        key = self._key(project_path, ref_indices, contestant_name)
+        fut = self._pending.get(key)
+        if fut is None:
+            loop = asyncio.get_running_loop()
+            fut = loop.run_in_executor(self._executor, parse_contestant_history,
+                                       project_path, list(ref_indices), contestant_name)
+            self._pending[key] = fut
+            fut.add_done_callback(lambda f, k=key: self._on_parsed(k, f))
+
+        # shield: 取消等待方不会中断共享的解析任务，结果仍写入缓存
+        return await asyncio.shield(fut)
+
+    def prefetch(self, project_path, ref_indices, contestant_name):
+        key = self._key(project_path, ref_indices, contestant_name)
+        if key in self._cache or key in self._pending:
+            return
+        task = asyncio.create_task(self.load(project_path, ref_indices, contestant_name))
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    def _on_parsed(self, key, fut):
+        # 已被 invalidate 的解析结果直接丢弃
+        if self._pending.get(key) is not fut:
+            return
+        del self._pending[key]
+        if fut.cancelled() or fut.exception():
+            return
+
+        self._cache[key] = fut.result()
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+
+# 全局单例
+history_loader = HistoryLoader()
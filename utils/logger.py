@@ -1 +1,96 @@
-# 日志记录
\ No newline at end of file
+# utils/logger.py
+import asyncio
+import time
+
+
+class Instrumentation:
+    """
+    轻量运行时指标 (只做计数与计时，开销可忽略)：
+    - count():   各类事件计数，如 "ble_events"
+    - prompt_*:  确认框打开时长，以及期间照常处理的事件数与最大循环延迟
+    - loop lag:  事件循环延迟，由 LoopLagMonitor 采样
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.prompts = []  # 最近关闭的确认框记录
+        self.max_prompt_records = 50
+        self.last_loop_lag_ms = 0.0
+        self.max_loop_lag_ms = 0.0
+        self._open_prompts = {}
+        self._next_token = 0
+
+    def count(self, key, n=1):
+        self.counters[key] = self.counters.get(key, 0) + n
+
+    def record_loop_lag(self, lag_ms):
+        self.last_loop_lag_ms = lag_ms
+        if lag_ms > self.max_loop_lag_ms:
+            self.max_loop_lag_ms = lag_ms
+        for rec in self._open_prompts.values():
+            if lag_ms > rec["max_lag_ms"]:
+                rec["max_lag_ms"] = lag_ms
+
+    def prompt_opened(self, name):
+        self._next_token += 1
+        self._open_prompts[self._next_token] = {
+            "name": name,
+            "start": time.perf_counter(),
+            "events_at_open": self.counters.get("ble_events", 0),
+            "max_lag_ms": 0.0,
+        }
+        return self._next_token
+
+    def prompt_closed(self, token):
+        rec = self._open_prompts.pop(token, None)
+        if rec is None: return None
+
+        result = {
+            "name": rec["name"],
+            "duration_ms": (time.perf_counter() - rec["start"]) * 1000,
+            "events_during": self.counters.get("ble_events", 0) - rec["events_at_open"],
+            "max_lag_ms": rec["max_lag_ms"],
+        }
+        self.prompts.append(result)
+        if len(self.prompts) > self.max_prompt_records:
+            del self.prompts[0]
+        print(f"[Perf] prompt '{result['name']}' open {result['duration_ms']:.0f} ms, "
+              f"{result['events_during']} events processed, max loop lag {result['max_lag_ms']:.1f} ms")
+        return result
+
+
+class LoopLagMonitor:
+    """
+    事件循环延迟采样：每 interval 秒调度一次回调，
+    实际触发时间与预期时间之差即为循环被阻塞的时长。
+    """
+
+    def __init__(self, stats, interval=0.1):
+        self.stats = stats
+        self.interval = interval
+        self._loop = None
+        self._handle = None
+        self._expected = 0.0
+
+    def start(self, loop=None):
+        self.stop()
+        self._loop = loop or asyncio.get_event_loop()
+        self._schedule()
+
+    def stop(self):
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+
+    def _schedule(self):
+        self._expected = time.perf_counter() + self.interval
+        self._handle = self._loop.call_later(self.interval, self._tick)
+
+    def _tick(self):
+        lag_ms = max(0.0, (time.perf_counter() - self._expected) * 1000)
+        self.stats.record_loop_lag(lag_ms)
+        self._schedule()
+
+
+# 全局单例
+instrumentation = Instrumentation()
@@ -0,0 +1,231 @@
+# utils/result_sync.py
+import json
+import os
+import queue
+import socket
+import threading
+from utils.app_settings import app_settings
+
+SENT, REJECTED, FAILED = range(3)  # _post 的结果：已确认 / 服务端拒收 (400) / 网络或服务端错误
+
+
+def parse_server(text, default_port=8767):
+    """设置项 results_server ("host:port" 或 "host") -> (host, port)，未设置返回 None"""
+    text = (text or "").strip()
+    if not text: return None
+    host, sep, port = text.rpartition(":")
+    if not sep: return text, default_port
+    try:
+        return host, int(port)
+    except ValueError:
+        print(f"Invalid results server: {text}")
+        return None
+
+
+class ResultUploader:
+    """
+    把各赛场 save_result 写入的成绩增量推送到成绩汇总服务 (core.results_server)。
+
+    与 CsvAppender 一样，调用方只入队，由后台线程批量 POST：
+    - 每行带 ResultId，服务端按 id 去重，失败重试或打开项目时整体补传都不会产生重复成绩
+    - 汇总服务不可达时按退避间隔重试，待发送的行留在内存中；
+      程序退出时仍未发出的行已在 results.csv 中，下次打开项目时补传
+    - 服务端以 400 拒收一批时对半拆分重发，最终只丢弃被拒收的那一条记录 (并打印其 id)
+    未设置 results_server 时不启动线程，对单机使用没有任何开销。
+    """
+
+    RETRY_DELAYS = (1, 2, 5, 10, 30)  # 秒
+    MAX_BATCH = 200
+
+    def __init__(self, name="Result-Sync"):
+        self.name = name
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._idle = threading.Condition()
+        self._unsent = 0  # 已入队但尚未被服务端确认的任务数
+        self._names = {}  # 项目路径 -> 项目名
+        self._conn = None
+        self._last_error = ""  # 最近一次 400 的响应内容
+        self.accepted = 0
+        self.duplicates = 0
+
+    @property
+    def enabled(self):
+        return parse_server(app_settings.get("results_server")) is not None
+
+    @property
+    def station(self):
+        return app_settings.get("station_name") or socket.gethostname()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive(): return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _put(self, item):
+        with self._idle:
+            self._unsent += 1
+        self._ensure_started()
+        self._queue.put(item)
+
+    def push(self, project_path, row):
+        """推送 results.csv 中新写入的一行 (按表头的 dict)"""
+        if not self.enabled: return
+        self._put(("row", project_path, row))
+
+    def sync_project(self, project_path):
+        """补传整个项目的成绩 (在后台线程读取 results.csv)"""
+        if not self.enabled: return
+        self._put(("project", project_path, None))
+
+    def flush(self, timeout=None):
+        """等待已入队的成绩全部被服务端确认，返回是否在超时前完成"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._unsent == 0, timeout)
+
+    def shutdown(self):
+        """退出前尽量发完剩余成绩 (最多等待 2 秒) 并停止线程"""
+        if self._thread is None: return
+        self.flush(timeout=2.0)
+        self._stop.set()
+        self._queue.put(None)
+        self._thread.join(timeout=2.0)
+        self._thread = None
+
+    # --- 后台线程 ---
+    def _project_name(self, project_path):
+        name = self._names.get(project_path)
+        if name is None:
+            name = os.path.basename(project_path)
+            try:
+                with open(os.path.join(project_path, "config.json"), 'r', encoding='utf-8') as f:
+                    name = json.load(f).get("project_name", name)
+            except Exception:
+                pass
+            self._names[project_path] = name
+        return name
+
+    def _records(self, item):
+        from utils.storage import result_record, read_result_rows
+        kind, project_path, row = item
+        rows = [row] if kind == "row" else read_result_rows(project_path)
+        project_name = self._project_name(project_path)
+        folder = os.path.basename(project_path)
+        records = []
+        for r in rows:
+            if not r.get("ResultId"): continue  # 未升级的旧行，升级后补传
+            try:
+                record = result_record(project_name, folder, r)
+            except ValueError as e:
+                print(f"Result sync: skipping malformed row {r.get('ResultId')}: {e}")  # 例如手工改坏的 FinalScore
+                continue
+            record["station"] = self.station
+            records.append(record)
+        return records
+
+    def _run(self):
+        pending = []  # [(任务数, 记录列表)]
+        attempt = 0
+        while not self._stop.is_set():
+            if not pending:
+                item = self._queue.get()
+                if item is None: break
+                pending.append((1, self._safe_records(item)))
+            # 取走当前积压的任务，一起发
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._stop.set()
+                    break
+                pending.append((1, self._safe_records(item)))
+
+            records = [r for _, recs in pending for r in recs]
+            if self._post_all(records):
+                attempt = 0
+                done = sum(n for n, _ in pending)
+                pending = []
+                with self._idle:
+                    self._unsent -= done
+                    self._idle.notify_all()
+            else:
+                delay = self.RETRY_DELAYS[min(attempt, len(self.RETRY_DELAYS) - 1)]
+                attempt += 1
+                self._stop.wait(delay)
+
+    def _safe_records(self, item):
+        try:
+            return self._records(item)
+        except Exception as e:
+            print(f"Result sync: failed to read {item[1]}: {e}")
+            return []
+
+    def _post_all(self, records):
+        for i in range(0, len(records), self.MAX_BATCH):
+            if not self._post_split(records[i:i + self.MAX_BATCH]):
+                return False
+        return True
+
+    def _post_split(self, records):
+        """
+        发送一批记录；被拒收时对半拆分，同一批里的有效记录照常送达。
+        返回 False 表示网络错误 (整批稍后重试，已送达的部分由服务端按 id 去重)。
+        """
+        result = self._post(records)
+        if result != REJECTED:
+            return result == SENT
+        if len(records) == 1:
+            record = records[0]
+            print(f"Result sync: server rejected record {record.get('id')} "
+                  f"({record.get('project')} / {record.get('contestant')}): {self._last_error}")
+            return True  # 重试也不会被接受：丢弃这一条 (仍在 results.csv 中)
+        mid = len(records) // 2
+        return self._post_split(records[:mid]) and self._post_split(records[mid:])
+
+    def _post(self, records):
+        if not records: return SENT
+        import http.client  # 只在启用推送时加载 (启动时不导入 email/http 一系列模块)
+        server = parse_server(app_settings.get("results_server"))
+        if server is None:
+            return SENT  # 已在设置中关闭：丢弃，不再重试
+        body = json.dumps({"records": records}, ensure_ascii=False).encode('utf-8')
+        if self._conn is not None and (self._conn.host, self._conn.port) != server:
+            self._close()
+        # 复用的长连接可能已被服务端关闭 (例如服务重启)，失败时立即用新连接再试一次
+        for reused in (self._conn is not None, False):
+            try:
+                if self._conn is None:
+                    self._conn = http.client.HTTPConnection(*server, timeout=5)
+                self._conn.request("POST", "/results", body, {"Content-Type": "application/json"})
+                response = self._conn.getresponse()
+                data = response.read()
+                if response.status == 400:
+                    self._last_error = data[:200].decode('utf-8', 'replace')
+                    return REJECTED
+                if response.status != 200:
+                    raise ConnectionError(f"HTTP {response.status}: {data[:200]!r}")
+                reply = json.loads(data)
+                self.accepted += reply.get("accepted", 0)
+                self.duplicates += reply.get("duplicates", 0)
+                return SENT
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                self._close()
+                if not reused:
+                    print(f"Result sync to {server[0]}:{server[1]} failed: {e}")
+                    return FAILED
+        return FAILED
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+# 全局单例
+result_uploader = ResultUploader()
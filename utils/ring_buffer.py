@@ -0,0 +1,65 @@
+# utils/ring_buffer.py
+from array import array
+
+
+class RingBuffer:
+    """
+    定长环形缓冲区，用于存储曲线点 (elapsed, score)。
+    1. 两个 array('d') 在构造时一次性预分配，运行期不再产生元组/列表对象
+    2. 写满后覆盖最旧的点，内存占用恒定
+    3. clear() 只重置游标，缓冲区可在选手之间复用
+    """
+
+    def __init__(self, capacity):
+        self.capacity = max(2, int(capacity))
+        self._times = array('d', bytes(8 * self.capacity))
+        self._values = array('d', bytes(8 * self.capacity))
+        self._head = 0  # 最旧元素的位置
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def append(self, t, value):
+        if self._size < self.capacity:
+            pos = (self._head + self._size) % self.capacity
+            self._size += 1
+        else:
+            # 已满：覆盖最旧的点，头指针后移
+            pos = self._head
+            self._head = (self._head + 1) % self.capacity
+        self._times[pos] = t
+        self._values[pos] = value
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
+
+    def _ordered(self, buf):
+        end = self._head + self._size
+        if end <= self.capacity:
+            return buf[self._head:end]
+        return buf[self._head:] + buf[:end - self.capacity]
+
+    def times(self):
+        """按时间顺序返回所有时间值 (array 切片拷贝)"""
+        return self._ordered(self._times)
+
+    def values(self):
+        """按时间顺序返回所有分值 (array 切片拷贝)"""
+        return self._ordered(self._values)
+
+    def __iter__(self):
+        return zip(self.times(), self.values())
+
+    def first(self):
+        if not self._size: return None
+        return self._times[self._head], self._values[self._head]
+
+    def last(self):
+        if not self._size: return None
+        pos = (self._head + self._size - 1) % self.capacity
+        return self._times[pos], self._values[pos]
@@ -0,0 +1,293 @@
+# utils/score_table.py
+"""
+共享内存实时分数表：供本机其他程序 (图文包装、统计脚本、记录工具) 直接读取实时分数，无需解析正在写入的 CSV。
+
+块名：赛场 1 为 "clicker_scores"，赛场 n 为 "clicker_scores_n"，无界面采集端为 "clicker_scores_headless"。
+同名块正被另一个写入方使用时不会接管，而是改用 "块名-2"、"块名-3"... (启动时打印实际块名)；
+写入方已退出的遗留块 (POSIX) 会先删除再重新创建。每个写入方只删除自己创建的块。
+
+布局固定 (小端)：
+
+  头部 128 字节
+    0   magic     4s   b"CSCR"
+    4   version   u16
+    6   capacity  u16  记录槽位数 (MAX_REFEREES)
+    8   seq       u64  序号锁：写入期间为奇数，写完为偶数，每次更新 +2
+    16  count     u16  有效裁判数
+    24  updated   f64  最后更新时刻 (time.time())
+    32  contestant 64s 当前选手 id (utf-8，\\0 填充)
+    96  writer_pid u32 写入方进程号，用于判断同名块是否仍在使用
+  之后每位裁判 64 字节
+    0   index     i32  裁判编号
+    4   total     i32
+    8   plus      i32
+    12  minus     i32
+    16  pri_state u8   主设备连接状态 (STATE_*)
+    17  sec_state u8   副设备连接状态
+    20  updates   u32  该裁判的分数更新次数
+    24  click     f64  最近一次点击的校正时刻，0 表示无
+    32  name      32s  裁判名 (utf-8，\\0 填充)
+
+读取方 (无锁、零拷贝)：读 seq，为奇数则重试；拷贝所需字段；再读 seq，与第一次相同即为一致快照。
+ScoreTableReader 即按此实现，python -m utils.score_table [块名] 可实时打印分数表。
+"""
+import os
+import struct
+import sys
+import time
+from multiprocessing import shared_memory
+from PyQt6.QtCore import QObject, Qt
+
+BLOCK_NAME = "clicker_scores"
+HEADLESS_BLOCK_NAME = "clicker_scores_headless"
+MAX_SUFFIX = 16
+VERSION = 1
+MAX_REFEREES = 32
+
+HEADER = struct.Struct("<4sHHQH6xd64sI28x")
+SEQ = struct.Struct("<Q")
+SEQ_OFFSET = 8
+RECORD = struct.Struct("<iiiiBBxxId32s")
+RECORD_VALUES = struct.Struct("<iiiiBBxxId")  # RECORD 去掉名称：每次更新只写这一段
+UPDATED = struct.Struct("<d")
+UPDATED_OFFSET = 24
+TABLE_SIZE = HEADER.size + RECORD.size * MAX_REFEREES
+
+STATE_NONE, STATE_CONNECTED, STATE_CONNECTING, STATE_DISCONNECTED = range(4)
+
+
+def block_name(court_no=1):
+    return BLOCK_NAME if court_no <= 1 else f"{BLOCK_NAME}_{court_no}"
+
+
+def _writer_alive(pid):
+    """同名块的写入方进程是否仍在运行 (无法判断时按仍在运行处理)"""
+    if not pid or pid == os.getpid() or sys.platform == "win32":
+        # Windows 上最后一个句柄关闭时块即被释放，块存在就说明仍有进程在使用
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def _remove_stale(name):
+    """同名块是写入方已退出后遗留的分数表则删除，返回是否已删除"""
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return True
+    try:
+        magic, version = struct.unpack_from("<4sH", shm.buf, 0)
+        pid = struct.unpack_from("<I", shm.buf, 96)[0] if shm.size >= HEADER.size else 0
+        stale = magic == b"CSCR" and pid and not _writer_alive(pid)
+    finally:
+        shm.close()
+    if stale:
+        print(f"Removing stale shared score table '{name}' (writer {pid} exited)")
+        shm.unlink()
+        return True
+    if sys.platform != "win32" and pid != os.getpid():
+        # 只附加检查、不删除：撤销 resource_tracker 的登记，否则退出时会删掉别人的块
+        # (本进程自己创建的块登记只有一份，不能撤销)
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return False
+
+
+def _device_state(node, status=None):
+    if node is None: return STATE_NONE
+    if node.is_connected: return STATE_CONNECTED
+    if status and "Connecting" in status: return STATE_CONNECTING
+    return STATE_DISCONNECTED
+
+
+def _fixed(text, size):
+    data = (text or "").encode('utf-8')[:size]
+    # 截断时不留半个 utf-8 字符
+    return data.decode('utf-8', 'ignore').encode('utf-8')
+
+
+class SharedScoreTable(QObject):
+    """
+    分数表的写入方 (每个赛场一个，只在 GUI 线程写入)。
+    Referee._update_score_output 调用 update_score()，设备状态经排队信号回到 GUI 线程后写入，
+    因此始终只有一个写入者，读取方靠 seq 判断快照是否一致。
+    """
+
+    def __init__(self, name=BLOCK_NAME):
+        super().__init__()
+        self.shm = None
+        self.name = self._create(name)
+        self.buf = self.shm.buf
+        self._seq = 0
+        self._slots = {}  # 裁判编号 -> 槽位
+        self._updates = []  # 槽位 -> 更新次数
+        self._states = []  # 槽位 -> [主设备状态, 副设备状态]
+        self._connections = []  # [(signal, connection)]
+        self._contestant = b""
+        self._count = 0
+        self.buf[:TABLE_SIZE] = bytes(TABLE_SIZE)
+        self._write_header()
+
+    def _create(self, name):
+        """创建 (而不是接管) 共享内存块，返回实际块名；同名块仍在使用时依次尝试带后缀的名字"""
+        for n in range(1, MAX_SUFFIX + 1):
+            candidate = name if n == 1 else f"{name}-{n}"
+            for _ in range(2):
+                try:
+                    self.shm = shared_memory.SharedMemory(name=candidate, create=True, size=TABLE_SIZE)
+                except FileExistsError:
+                    if _remove_stale(candidate): continue  # 遗留块已删除，再创建一次
+                    break
+                if candidate != name:
+                    print(f"Shared score table '{name}' is in use by another writer, using '{candidate}'")
+                return candidate
+        raise FileExistsError(f"Shared score table '{name}' and its alternatives are all in use")
+
+    # --- 序号锁 ---
+    def _begin(self):
+        self._seq += 1  # 奇数：写入中
+        SEQ.pack_into(self.buf, SEQ_OFFSET, self._seq)
+
+    def _end(self):
+        self._seq += 1
+        SEQ.pack_into(self.buf, SEQ_OFFSET, self._seq)
+
+    def _write_header(self):
+        self._begin()
+        HEADER.pack_into(self.buf, 0, b"CSCR", VERSION, MAX_REFEREES, self._seq, self._count, time.time(),
+                         self._contestant, os.getpid())
+        self._end()
+
+    # --- 写入接口 ---
+    def set_referees(self, referees):
+        """换绑一组裁判 (空列表即清空)，订阅各设备的连接状态"""
+        for signal, conn in self._connections:
+            try:
+                signal.disconnect(conn)
+            except TypeError:
+                pass
+        self._connections.clear()
+
+        referees = referees[:MAX_REFEREES]
+        self._slots = {ref.index: i for i, ref in enumerate(referees)}
+        self._updates = [0] * len(referees)
+        self._states = [[_device_state(ref.primary_device), _device_state(ref.secondary_device)] for ref in referees]
+        self._count = len(referees)
+
+        self._begin()
+        self.buf[HEADER.size:TABLE_SIZE] = bytes(TABLE_SIZE - HEADER.size)
+        for i, ref in enumerate(referees):
+            RECORD.pack_into(self.buf, HEADER.size + i * RECORD.size, ref.index, ref.last_total, ref.last_plus,
+                             ref.last_minus, *self._states[i], 0, ref.last_click_time or 0.0, _fixed(ref.name, 32))
+        HEADER.pack_into(self.buf, 0, b"CSCR", VERSION, MAX_REFEREES, self._seq, self._count, time.time(),
+                         self._contestant, os.getpid())
+        self._end()
+
+        for i, ref in enumerate(referees):
+            for role, dev in enumerate((ref.primary_device, ref.secondary_device)):
+                if dev is None: continue
+                conn = dev.status_changed.connect(
+                    lambda s, i=i, role=role, dev=dev: self.update_state(i, role, _device_state(dev, s)),
+                    Qt.ConnectionType.QueuedConnection)
+                self._connections.append((dev.status_changed, conn))
+
+    def set_contestant(self, contestant_id):
+        self._contestant = _fixed(contestant_id, 64)
+        self._write_header()
+
+    def update_score(self, ref):
+        slot = self._slots.get(ref.index)
+        if slot is None: return
+        self._updates[slot] += 1
+        self._write_values(slot, ref)
+
+    def update_state(self, slot, role, state):
+        if slot >= self._count: return
+        self._states[slot][role] = state
+        self._begin()
+        self.buf[HEADER.size + slot * RECORD.size + 16 + role] = state
+        UPDATED.pack_into(self.buf, UPDATED_OFFSET, time.time())
+        self._end()
+
+    def _write_values(self, slot, ref):
+        # 热路径：一次 pack_into 写入记录的数值部分 (名称不变)，写入窗口尽量短
+        buf = self.buf
+        self._seq += 1
+        SEQ.pack_into(buf, SEQ_OFFSET, self._seq)
+        RECORD_VALUES.pack_into(buf, HEADER.size + slot * RECORD.size, ref.index, ref.last_total, ref.last_plus,
+                                ref.last_minus, *self._states[slot], self._updates[slot], ref.last_click_time or 0.0)
+        UPDATED.pack_into(buf, UPDATED_OFFSET, time.time())
+        self._seq += 1
+        SEQ.pack_into(buf, SEQ_OFFSET, self._seq)
+
+    def close(self):
+        # 块总是由本实例创建 (见 _create)，关闭时删除
+        self.set_referees([])
+        self.buf = None
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class ScoreTableReader:
+    """分数表的读取方 (可在任意进程中使用，不加锁、不写入)"""
+
+    def __init__(self, name=BLOCK_NAME):
+        self.shm = shared_memory.SharedMemory(name=name)
+        if sys.platform != "win32":
+            # Python 3.13 之前只读附加也会登记到 resource_tracker，退出时会把写入方的块删掉
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        self.buf = self.shm.buf
+        magic, version = struct.unpack_from("<4sH", self.buf, 0)
+        if magic != b"CSCR" or version != VERSION:
+            raise ValueError(f"Not a score table: {magic!r} v{version}")
+
+    def snapshot(self, retries=1000):
+        """返回一致的快照 dict；写入方持续写入导致多次重试失败时返回 None"""
+        for _ in range(retries):
+            seq1 = SEQ.unpack_from(self.buf, SEQ_OFFSET)[0]
+            if seq1 & 1: continue
+            count = struct.unpack_from("<H", self.buf, 16)[0]
+            raw = bytes(self.buf[:HEADER.size + RECORD.size * min(count, MAX_REFEREES)])
+            if SEQ.unpack_from(self.buf, SEQ_OFFSET)[0] != seq1: continue
+
+            _, _, _, seq, count, updated, contestant, _ = HEADER.unpack_from(raw)
+            referees = []
+            for i in range(count):
+                index, total, plus, minus, pri, sec, updates, click, name = \
+                    RECORD.unpack_from(raw, HEADER.size + i * RECORD.size)
+                referees.append({"index": index, "name": name.rstrip(b"\0").decode('utf-8'), "total": total,
+                                 "plus": plus, "minus": minus, "primary_state": pri, "secondary_state": sec,
+                                 "updates": updates, "click_time": click or None})
+            return {"seq": seq, "updated": updated, "contestant": contestant.rstrip(b"\0").decode('utf-8'),
+                    "referees": referees}
+        return None
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+
+
+if __name__ == "__main__":
+    # python -m utils.score_table [块名]：每 0.5 秒打印一次分数表
+    reader = ScoreTableReader(sys.argv[1] if len(sys.argv) > 1 else BLOCK_NAME)
+    states = "-CcX"  # 无设备 / 已连接 / 连接中 / 断开
+    try:
+        while True:
+            snap = reader.snapshot()
+            if snap:
+                refs = " | ".join(f"{r['name']}={r['total']}:{r['plus']}:{r['minus']} "
+                                  f"[{states[r['primary_state']]}{states[r['secondary_state']]}]"
+                                  for r in snap["referees"])
+                print(f"#{snap['seq']} {snap['contestant']}: {refs}")
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        reader.close()
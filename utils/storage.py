@@ -2,7 +2,87 @@
 import os
 import json
 import csv
+import uuid
 from datetime import datetime
+from utils.csv_writer import csv_writer
+from utils.result_sync import result_uploader
+
+RESULT_HEADERS = ["Group", "Contestant", "FinalScore", "Details", "Timestamp", "ContestantId", "ResultId"]
+RAW_LOG_HEADERS = ["SystemTime", "BLE_Timestamp", "DeviceRole", "Contestant", "CurrentTotal", "EventType", "TotalPlus",
+                   "TotalMinus", "ClickTime"]
+
+
+def parse_details(details_str):
+    """
+    解析成绩行的 Details 字段 "Ref1=Total:Plus:Minus | Ref2=..."，返回
+    {"Referee 1": {"total": 100, "plus": 120, "minus": 20}, ...}
+    """
+    ref_scores = {}
+    if not details_str: return ref_scores
+    # 分割每个裁判的数据 "Ref1=... | Ref2=..."
+    parts = details_str.split('|')
+    for p in parts:
+        p = p.strip()
+        if not p: continue
+
+        # 解析逻辑
+        r_name = "Unknown"
+        r_total = 0
+        r_plus = 0
+        r_minus = 0
+
+        try:
+            # 新格式: Name=Total:Plus:Minus
+            if '=' in p:
+                r_name, vals = p.split('=', 1)
+                val_parts = vals.split(':')
+                r_total = int(val_parts[0])
+                if len(val_parts) >= 3:
+                    r_plus = int(val_parts[1])
+                    r_minus = int(val_parts[2])
+                else:
+                    # 兼容中间过渡格式
+                    r_plus = r_total
+                    r_minus = 0
+            # 旧格式: Name:Total (可能会有bug如果名字里有冒号，但先这样兼容)
+            elif ':' in p:
+                r_name, val = p.rsplit(':', 1)  # 从右边分，防止名字里有冒号
+                r_total = int(val)
+                r_plus = r_total
+                r_minus = 0
+
+            ref_scores[r_name.strip()] = {
+                "total": r_total,
+                "plus": r_plus,
+                "minus": r_minus
+            }
+        except Exception as e:
+            print(f"Parse error for part '{p}': {e}")
+    return ref_scores
+
+
+def result_record(project_name, folder, row):
+    """results.csv 的一行 (按表头的 dict) -> 推送给成绩汇总服务的记录"""
+    return {
+        "id": row.get("ResultId"),
+        "project": project_name,
+        "folder": folder,
+        "group": row.get("Group") or "",
+        "contestant": row.get("Contestant") or "",
+        "contestant_id": (row.get("ContestantId") or row.get("Contestant") or "").strip(),
+        "final_score": int(row.get("FinalScore") or 0),
+        "ref_scores": parse_details(row.get("Details", "")),
+        "timestamp": row.get("Timestamp") or "",
+    }
+
+
+def read_result_rows(project_path):
+    """读取项目 results.csv 的全部行 (dict 列表)"""
+    csv_path = os.path.join(project_path, "results.csv")
+    if not os.path.exists(csv_path): return []
+    csv_writer.flush()
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
 
 
 class ProjectStorage:
@@ -68,58 +148,108 @@ class ProjectStorage:
             csv_path = os.path.join(self.current_project_path, f"referee_{ref['index']}.csv")
             if not os.path.exists(csv_path):
                 self._init_raw_log_csv(ref['index'])
+            else:
+                self._upgrade_raw_log_csv(csv_path)
         if not os.path.exists(os.path.join(self.current_project_path, "results.csv")):
             self._init_results_csv()
+        else:
+            self._upgrade_results_csv()
 
     def _init_raw_log_csv(self, ref_index):
         if not self.current_project_path: return
         file_path = os.path.join(self.current_project_path, f"referee_{ref_index}.csv")
-        headers = ["SystemTime", "BLE_Timestamp", "DeviceRole", "Contestant", "CurrentTotal", "EventType", "TotalPlus",
-                   "TotalMinus"]
         with open(file_path, 'w', newline='', encoding='utf-8') as f:
-            csv.writer(f).writerow(headers)
+            csv.writer(f).writerow(RAW_LOG_HEADERS)
+
+    def _upgrade_raw_log_csv(self, file_path):
+        """
+        旧项目的 referee_N.csv 只有 8 列，而 log_data 现在写 9 列 (末尾 ClickTime)：补上表头，旧行留空。
+        注意 SystemTime 仍是 GUI 线程记录该行时的 datetime.now()，
+        因此 SystemTime - ClickTime 包含链路延迟与 GUI 排队延迟，并非单纯的传输延迟。
+        """
+        csv_writer.flush()
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            rows = list(csv.reader(f))
+        if not rows: return
+        missing = [h for h in RAW_LOG_HEADERS if h not in rows[0]]
+        if not missing: return
+        header = rows[0] + missing
+        for row in rows[1:]:
+            row += [""] * (len(header) - len(row))
+        self._replace_csv(file_path, [header] + rows[1:])
+
+    @staticmethod
+    def _replace_csv(file_path, rows):
+        """整体重写 CSV：先写临时文件并 fsync，再原子替换，中途崩溃不会留下半个文件"""
+        tmp_path = file_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            csv.writer(f).writerows(rows)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
 
     def _init_results_csv(self):
         if not self.current_project_path: return
         file_path = os.path.join(self.current_project_path, "results.csv")
-        headers = ["Group", "Contestant", "FinalScore", "Details", "Timestamp"]
         with open(file_path, 'w', newline='', encoding='utf-8') as f:
-            csv.writer(f).writerow(headers)
+            csv.writer(f).writerow(RESULT_HEADERS)
+
+    def _upgrade_results_csv(self):
+        """
+        旧项目的 results.csv 缺少 ContestantId / ResultId 列：补上表头。
+        旧行的 ContestantId 留空 (读取时按选手名处理)，ResultId 补发一个新 id，之后保持不变，
+        向汇总服务补传时按该 id 去重。
+        """
+        file_path = os.path.join(self.current_project_path, "results.csv")
+        csv_writer.flush()
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            rows = list(csv.reader(f))
+        if not rows: return
+        missing = [h for h in RESULT_HEADERS if h not in rows[0]]
+        if not missing: return
+        header = rows[0] + missing
+        id_col = header.index("ResultId")
+        for row in rows[1:]:
+            row += [""] * (len(header) - len(row))
+            if not row[id_col]: row[id_col] = uuid.uuid4().hex
+        self._replace_csv(file_path, [header] + rows[1:])
 
-    def log_data(self, ref_index, role, event_data, contestant_name=""):
+    def log_data(self, ref_index, role, event_data, contestant_name="", click_time=None):
         if not self.current_project_path: return
         file_path = os.path.join(self.current_project_path, f"referee_{ref_index}.csv")
         current, evt_type, plus, minus, ble_ts = event_data
+        # ClickTime: 按设备时钟模型校正后的点击时刻
+        # SystemTime: GUI 线程记录该行的时刻，与 ClickTime 之差 = 链路延迟 + GUI 排队延迟
+        click_str = datetime.fromtimestamp(click_time).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3] if click_time else ""
         row = [datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3], ble_ts, role, contestant_name, current, evt_type,
-               plus, minus]
-        try:
-            with open(file_path, 'a', newline='', encoding='utf-8') as f:
-                csv.writer(f).writerow(row)
-        except Exception as e:
-            print(f"CSV Log Error: {e}")
+               plus, minus, click_str]
+        # 交给共享写入线程，多个赛场的日志合并批量落盘
+        csv_writer.append(file_path, row)
 
-    def save_result(self, group, contestant, total_score, details):
+    def save_result(self, group, contestant, total_score, details, contestant_id=None):
         if not self.current_project_path: return
         file_path = os.path.join(self.current_project_path, "results.csv")
-        row = [group, contestant, total_score, details, datetime.now().strftime("%Y-%m-%d %H:%M:%S")]
-        try:
-            with open(file_path, 'a', newline='', encoding='utf-8') as f:
-                csv.writer(f).writerow(row)
-        except Exception as e:
-            print(f"Save Result Error: {e}")
+        # ResultId 在写入时生成并随行保存，重复推送到汇总服务也只算一条
+        row = [group, contestant, total_score, details, datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+               contestant_id or contestant, uuid.uuid4().hex]
+        csv_writer.append(file_path, row)
+        result_uploader.push(self.current_project_path, dict(zip(RESULT_HEADERS, map(str, row))))
 
     # --- 数据读取方法 ---
-    def get_existing_contestants(self):
+    def get_existing_contestants(self, group=None):
+        """已有成绩的选手 id 集合；指定 group 时只统计该组别"""
         scored_set = set()
         if not self.current_project_path: return scored_set
+        csv_writer.flush()
         try:
             file_path = os.path.join(self.current_project_path, "results.csv")
             if os.path.exists(file_path):
                 with open(file_path, 'r', encoding='utf-8') as f:
                     reader = csv.DictReader(f)
                     for row in reader:
-                        name = row.get("Contestant", "").strip()
-                        if name: scored_set.add(name)
+                        if group is not None and row.get("Group") != group: continue
+                        cid = (row.get("ContestantId") or row.get("Contestant") or "").strip()
+                        if cid: scored_set.add(cid)
         except Exception:
             pass
         return scored_set
@@ -140,63 +270,15 @@ class ProjectStorage:
         results = []
         if not self.current_project_path: return results
 
-        csv_path = os.path.join(self.current_project_path, "results.csv")
-        if not os.path.exists(csv_path): return results
-
         try:
-            with open(csv_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    details_str = row.get("Details", "")
-                    ref_scores = {}
-                    if details_str:
-                        # 分割每个裁判的数据 "Ref1=... | Ref2=..."
-                        parts = details_str.split('|')
-                        for p in parts:
-                            p = p.strip()
-                            if not p: continue
-
-                            # 解析逻辑
-                            r_name = "Unknown"
-                            r_total = 0
-                            r_plus = 0
-                            r_minus = 0
-
-                            try:
-                                # 新格式: Name=Total:Plus:Minus
-                                if '=' in p:
-                                    r_name, vals = p.split('=', 1)
-                                    val_parts = vals.split(':')
-                                    r_total = int(val_parts[0])
-                                    if len(val_parts) >= 3:
-                                        r_plus = int(val_parts[1])
-                                        r_minus = int(val_parts[2])
-                                    else:
-                                        # 兼容中间过渡格式
-                                        r_plus = r_total
-                                        r_minus = 0
-                                # 旧格式: Name:Total (可能会有bug如果名字里有冒号，但先这样兼容)
-                                elif ':' in p:
-                                    r_name, val = p.rsplit(':', 1)  # 从右边分，防止名字里有冒号
-                                    r_total = int(val)
-                                    r_plus = r_total
-                                    r_minus = 0
-
-                                ref_scores[r_name.strip()] = {
-                                    "total": r_total,
-                                    "plus": r_plus,
-                                    "minus": r_minus
-                                }
-                            except Exception as e:
-                                print(f"Parse error for part '{p}': {e}")
-
-                    results.append({
-                        "group": row.get("Group"),
-                        "contestant": row.get("Contestant"),
-                        "total_score": int(row.get("FinalScore", 0)),
-                        "ref_scores": ref_scores,  # 现在包含 dict 结构
-                        "timestamp": row.get("Timestamp")
-                    })
+            for row in read_result_rows(self.current_project_path):
+                results.append({
+                    "group": row.get("Group"),
+                    "contestant": row.get("Contestant"),
+                    "total_score": int(row.get("FinalScore", 0)),
+                    "ref_scores": parse_details(row.get("Details", "")),  # 现在包含 dict 结构
+                    "timestamp": row.get("Timestamp")
+                })
         except Exception as e:
             print(f"Error reading results: {e}")
 
@@ -235,6 +317,9 @@ class ProjectStorage:
         path = os.path.join(self.base_dir, folder_name)
         if os.path.exists(path):
             self.current_project_path = path
+            if os.path.exists(os.path.join(path, "results.csv")):
+                self._upgrade_results_csv()  # 补传前保证每行都有 ResultId
+            result_uploader.sync_project(path)
 
 
 storage = ProjectStorage()
\ No newline at end of file